@@ -1,12 +1,45 @@
-from flask import Flask, request, jsonify, send_file
+from flask import Flask, Response, request, jsonify, send_file, g
 import mysql.connector
-from mysql.connector import Error, IntegrityError, Binary
-import random, smtplib, io, os, datetime, jwt
+from mysql.connector import Error, IntegrityError
+from mysql.connector.errors import PoolError
+import asyncio
+import atexit
+import base64
+import bisect
+import csv
+import datetime
+import hashlib
+import heapq
+import hmac
+import io
+import itertools
+import json
+import math
+import multiprocessing
+import os
+import random
+import re
+import signal
+import socket
+import sys
+import tempfile
+import threading
+import time
+import unicodedata
+import zipfile
+import zlib
+import click
+import jwt
+from collections import deque, OrderedDict
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
 from email.mime.text import MIMEText
-from twilio.rest import Client
-from twilio.base.exceptions import TwilioRestException
 from functools import wraps
 from dotenv import load_dotenv
+from werkzeug.exceptions import RequestEntityTooLarge
+from werkzeug.serving import BaseWSGIServer
+from werkzeug.utils import secure_filename
+from werkzeug.sansio.multipart import MultipartDecoder, Field, File, Data, Epilogue, NeedData
 
 load_dotenv()
 app = Flask(__name__)
@@ -20,112 +53,2757 @@ db_config = {
 "database": os.getenv("DATABASE")
 }
 
+DB_POOL_ENABLED = os.getenv("DB_POOL_ENABLED", "1") == "1"
+DB_POOL_MIN_SIZE = int(os.getenv("DB_POOL_MIN_SIZE", 2))
+DB_POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX_SIZE", 10))
+DB_POOL_TIMEOUT_SECONDS = float(os.getenv("DB_POOL_TIMEOUT_SECONDS", 5))
+DB_POOL_IDLE_SECONDS = int(os.getenv("DB_POOL_IDLE_SECONDS", 300))
+
 app.config["SECRET_KEY"] = os.getenv("SECRET_KEY")
 
-ADMIN_ID, ADMIN_PASSWORD = os.getenv("ADMIN_ID"), os.getenv("ADMIN_PASSWORD")
+ADMIN_ID, ADMIN_PASSWORD = os.getenv("ADMIN_ID"), os.getenv("ADMIN_PASSWORD")
+
+OTP_EXPIRY_MINUTES = int(os.getenv("OTP_EXPIRY_MINUTES", 10))
+OTP_MAX_ATTEMPTS = int(os.getenv("OTP_MAX_ATTEMPTS", 5))
+# memory keeps OTPs inside this process, so run a single worker with it; use redis for anything larger.
+OTP_STORE = os.getenv("OTP_STORE", "memory")
+OTP_STORE_URL = os.getenv("OTP_STORE_URL", "redis://localhost:6379/0")
+OTP_STORE_SHARDS = int(os.getenv("OTP_STORE_SHARDS", 16))
+OTP_STORE_WHEEL_SLOTS = int(os.getenv("OTP_STORE_WHEEL_SLOTS", 64))
+
+# Rate limiting of the OTP-sending routes. Each rule is "<requests>/<seconds>" per phone, email or client IP.
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "1") == "1"
+RATE_LIMIT_STORE = os.getenv("RATE_LIMIT_STORE", "memory")
+RATE_LIMIT_STORE_URL = os.getenv("RATE_LIMIT_STORE_URL", OTP_STORE_URL)
+RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", 100000))
+RATE_LIMIT_RULES = json.loads(os.getenv("RATE_LIMIT_RULES", "null")) or {
+    "register_jobseeker_unverified": {"phone": "3/600", "email": "3/600", "ip": "20/600"},
+    "register_employer_unverified": {"phone": "3/600", "email": "3/600", "ip": "20/600"},
+    "login_unverified": {"phone": "5/600", "ip": "30/600"}
+}
+# Read-through cache of the employer dashboard listings. memory only sees invalidations made by its own
+# process, so use redis when serving with more than one worker.
+LISTING_CACHE_ENABLED = os.getenv("LISTING_CACHE_ENABLED", "1") == "1"
+LISTING_CACHE_STORE = os.getenv("LISTING_CACHE_STORE", "memory")
+LISTING_CACHE_STORE_URL = os.getenv("LISTING_CACHE_STORE_URL", OTP_STORE_URL)
+LISTING_CACHE_SECONDS = int(os.getenv("LISTING_CACHE_SECONDS", 300))
+LISTING_CACHE_SIZE = int(os.getenv("LISTING_CACHE_SIZE", 10000))
+SESSION_EXPIRY_HOURS = int(os.getenv("SESSION_EXPIRY_HOURS", 2))
+TOKEN_CACHE_SECONDS = int(os.getenv("TOKEN_CACHE_SECONDS", 60))
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", 10000))
+TOKEN_REVOCATION_REFRESH_SECONDS = int(os.getenv("TOKEN_REVOCATION_REFRESH_SECONDS", 5))
+BULK_MAX_ROWS = int(os.getenv("BULK_MAX_ROWS", 5000))
+BULK_CHUNK_SIZE = int(os.getenv("BULK_CHUNK_SIZE", 500))
+EXPORT_CHUNK_SIZE = int(os.getenv("EXPORT_CHUNK_SIZE", 1000))
+PAGE_DEFAULT_LIMIT = int(os.getenv("PAGE_DEFAULT_LIMIT", 50))
+PAGE_MAX_LIMIT = int(os.getenv("PAGE_MAX_LIMIT", 200))
+
+# Twilio / Email
+TWILIO_SID, TWILIO_AUTH_TOKEN = os.getenv("TWILIO_SID"), os.getenv("TWILIO_AUTH_TOKEN")
+TWILIO_PHONE = os.getenv("TWILIO_PHONE")
+SMTP_SERVER, SMTP_PORT = os.getenv("SMTP_SERVER"), int(os.getenv("SMTP_PORT"))
+EMAIL_ADDRESS, EMAIL_PASSWORD = os.getenv("EMAIL_ADDRESS"), os.getenv("EMAIL_PASSWORD")
+SMTP_IDLE_SECONDS = int(os.getenv("SMTP_IDLE_SECONDS", 60))
+
+# Outbound notification queue
+NOTIFY_TRANSPORT = os.getenv("NOTIFY_TRANSPORT", "live")
+NOTIFY_WORKERS = int(os.getenv("NOTIFY_WORKERS", 2))
+NOTIFY_BATCH_SIZE = int(os.getenv("NOTIFY_BATCH_SIZE", 20))
+NOTIFY_CONCURRENCY = int(os.getenv("NOTIFY_CONCURRENCY", 10))
+NOTIFY_POLL_SECONDS = float(os.getenv("NOTIFY_POLL_SECONDS", 1))
+NOTIFY_LEASE_SECONDS = int(os.getenv("NOTIFY_LEASE_SECONDS", 60))
+NOTIFY_MAX_ATTEMPTS = int(os.getenv("NOTIFY_MAX_ATTEMPTS", 5))
+NOTIFY_BACKOFF_SECONDS = float(os.getenv("NOTIFY_BACKOFF_SECONDS", 2))
+NOTIFY_BACKOFF_MAX_SECONDS = float(os.getenv("NOTIFY_BACKOFF_MAX_SECONDS", 300))
+
+# Resume storage
+RESUME_STORAGE_BACKEND = os.getenv("RESUME_STORAGE_BACKEND", "local")
+RESUME_STORAGE_DIR = os.getenv("RESUME_STORAGE_DIR", "resumes")
+RESUME_CHUNK_SIZE = int(os.getenv("RESUME_CHUNK_SIZE", 64 * 1024))
+RESUME_MAX_BYTES = int(os.getenv("RESUME_MAX_BYTES", 5 * 1024 * 1024))
+# Room for the multipart boundaries, part headers and the job_id field on top of the resume itself.
+RESUME_FORM_OVERHEAD_BYTES = int(os.getenv("RESUME_FORM_OVERHEAD_BYTES", 16 * 1024))
+# A stored resume no application points at is deleted once it has not been published or touched for this long.
+RESUME_SWEEP_GRACE_SECONDS = int(os.getenv("RESUME_SWEEP_GRACE_SECONDS", 3600))
+
+# Schema
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+SCHEMA_FILE = os.path.join(BASE_DIR, "schema.sql")
+MIGRATIONS_DIR = os.path.join(BASE_DIR, "migrations")
+MIGRATION_LOCK_TIMEOUT_SECONDS = int(os.getenv("MIGRATION_LOCK_TIMEOUT_SECONDS", 60))
+
+# Reaper
+REAPER_ENABLED = os.getenv("REAPER_ENABLED", "1") == "1"
+REAPER_INTERVAL_SECONDS = int(os.getenv("REAPER_INTERVAL_SECONDS", 600))
+REAPER_UNVERIFIED_HOURS = int(os.getenv("REAPER_UNVERIFIED_HOURS", 24))
+REAPER_NOTIFICATION_RETENTION_DAYS = int(os.getenv("REAPER_NOTIFICATION_RETENTION_DAYS", 7))
+REAPER_BATCH_SIZE = int(os.getenv("REAPER_BATCH_SIZE", 500))
+REAPER_BATCH_PAUSE_SECONDS = float(os.getenv("REAPER_BATCH_PAUSE_SECONDS", 0.05))
+
+# Account deletion: delete_user soft-deletes the account at once; its applications, jobs and finally the account row
+# are then removed in the background, USER_DELETE_BATCH_SIZE rows per transaction.
+USER_DELETE_BATCH_SIZE = int(os.getenv("USER_DELETE_BATCH_SIZE", 200))
+USER_DELETE_BATCH_PAUSE_SECONDS = float(os.getenv("USER_DELETE_BATCH_PAUSE_SECONDS", 0.05))
+USER_DELETE_POLL_SECONDS = float(os.getenv("USER_DELETE_POLL_SECONDS", 5))
+
+# New-job alerts: every interval, each matching jobseeker gets one digest email of the jobs posted since the last one.
+JOB_ALERTS_ENABLED = os.getenv("JOB_ALERTS_ENABLED", "1") == "1"
+JOB_ALERT_INTERVAL_SECONDS = int(os.getenv("JOB_ALERT_INTERVAL_SECONDS", 900))
+JOB_ALERT_BATCH_SIZE = int(os.getenv("JOB_ALERT_BATCH_SIZE", 500))
+JOB_ALERT_MAX_JOBS_PER_DIGEST = int(os.getenv("JOB_ALERT_MAX_JOBS_PER_DIGEST", 20))
+JOB_ALERT_EMAILS_PER_MINUTE = int(os.getenv("JOB_ALERT_EMAILS_PER_MINUTE", 600))
+
+# Job search
+SEARCH_INDEX_MAX_AGE_SECONDS = int(os.getenv("SEARCH_INDEX_MAX_AGE_SECONDS", 300))
+SEARCH_REBUILD_BATCH_SIZE = int(os.getenv("SEARCH_REBUILD_BATCH_SIZE", 10000))
+SEARCH_MAX_PREFIX_EXPANSIONS = int(os.getenv("SEARCH_MAX_PREFIX_EXPANSIONS", 50))
+SEARCH_FACET_LIMIT = int(os.getenv("SEARCH_FACET_LIMIT", 20))
+SEARCH_SALARY_BUCKETS = [int(x) for x in os.getenv("SEARCH_SALARY_BUCKETS", "0,250000,500000,1000000,2000000").split(",")]
+
+# Job recommendations (needs numpy). Specializations are compared as character trigram vectors after synonyms
+# are folded in, so "CSE", "Computer Sci." and "computer science" land close together. That only ranks: applying
+# still takes the job's exact specialization, as in the listings.
+MATCH_FEATURE_DIM = int(os.getenv("MATCH_FEATURE_DIM", 512))
+MATCH_MIN_SIMILARITY = float(os.getenv("MATCH_MIN_SIMILARITY", 0.3))
+MATCH_EXPERIENCE_SCALE = float(os.getenv("MATCH_EXPERIENCE_SCALE", 3))
+MATCH_WEIGHTS = json.loads(os.getenv("MATCH_WEIGHTS", "null")) or {
+    "specialization": 0.6, "degree": 0.15, "experience": 0.15, "location": 0.1
+}
+MATCH_SYNONYMS = json.loads(os.getenv("MATCH_SYNONYMS", "null")) or {
+    "cs": "computer science", "cse": "computer science", "sci": "science", "it": "information technology",
+    "ece": "electronics and communication", "eee": "electrical and electronics", "ee": "electrical",
+    "me": "mechanical", "mech": "mechanical", "ce": "civil", "ai": "artificial intelligence",
+    "ml": "machine learning", "ds": "data science", "engg": "engineering", "eng": "engineering"
+}
+
+# Resume text index (needs pypdf). Uploaded resumes are parsed in a process pool off the request path and their
+# terms stored per job in RESUME_TERMS, so employers can search applicants without reading the files.
+RESUME_INDEX_ENABLED = os.getenv("RESUME_INDEX_ENABLED", "1") == "1"
+RESUME_INDEX_PROCESSES = int(os.getenv("RESUME_INDEX_PROCESSES", 2))
+RESUME_INDEX_BATCH_SIZE = int(os.getenv("RESUME_INDEX_BATCH_SIZE", 20))
+RESUME_INDEX_POLL_SECONDS = float(os.getenv("RESUME_INDEX_POLL_SECONDS", 5))
+RESUME_INDEX_MAX_PAGES = int(os.getenv("RESUME_INDEX_MAX_PAGES", 20))
+RESUME_INDEX_MAX_TERMS = int(os.getenv("RESUME_INDEX_MAX_TERMS", 2000))
+RESUME_INDEX_TIMEOUT_SECONDS = float(os.getenv("RESUME_INDEX_TIMEOUT_SECONDS", 30))
+APPLICANT_SEARCH_MAX_TERMS = int(os.getenv("APPLICANT_SEARCH_MAX_TERMS", 10))
+
+# Metrics
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+SLOW_REQUEST_SECONDS = float(os.getenv("SLOW_REQUEST_SECONDS", 0))
+SLOW_REQUEST_LOG_PARAMS = os.getenv("SLOW_REQUEST_LOG_PARAMS", "0") == "1"
+
+# Serving
+SERVE_HOST = os.getenv("SERVE_HOST", "127.0.0.1")
+SERVE_PORT = int(os.getenv("SERVE_PORT", 5000))
+SERVE_WORKERS = int(os.getenv("SERVE_WORKERS", 1))
+SERVE_THREADS = int(os.getenv("SERVE_THREADS", 16))
+SERVE_DRAIN_SECONDS = float(os.getenv("SERVE_DRAIN_SECONDS", 30))
+# Outbox, reaper, alert, indexer and deletion threads. Started by `flask serve` and otherwise on a process's first
+# request, so flask run, gunicorn and other WSGI servers deliver OTPs too; 0 leaves them to a separate process.
+BACKGROUND_WORKERS_ENABLED = os.getenv("BACKGROUND_WORKERS_ENABLED", "1") == "1"
+
+
+# ---------------- METRICS ----------------
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+def format_labels(names, values):
+    if not names:
+        return ""
+    pairs = []
+    for name, value in zip(names, values):
+        value = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        pairs.append(f'{name}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+class Counter:
+    def __init__(self, name, help_text, label_names=()):
+        self.name, self.help_text, self.label_names = name, help_text, label_names
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def inc(self, labels=(), amount=1):
+        with self.lock:
+            self.values[labels] = self.values.get(labels, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self.lock:
+            for labels, value in sorted(self.values.items()):
+                lines.append(f"{self.name}{format_labels(self.label_names, labels)} {value}")
+        return lines
+
+class Histogram:
+    def __init__(self, name, help_text, label_names=(), buckets=LATENCY_BUCKETS):
+        self.name, self.help_text, self.label_names, self.buckets = name, help_text, label_names, buckets
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def observe(self, labels, value):
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            series = self.values.get(labels)
+            if series is None:
+                series = self.values[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self.lock:
+            for labels, (counts, total, count) in sorted(self.values.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets + ("+Inf",), counts):
+                    cumulative += bucket_count
+                    lines.append(f"{self.name}_bucket{format_labels(self.label_names + ('le',), labels + (bound,))} {cumulative}")
+                lines.append(f"{self.name}_sum{format_labels(self.label_names, labels)} {total}")
+                lines.append(f"{self.name}_count{format_labels(self.label_names, labels)} {count}")
+        return lines
+
+class Gauges:
+    # Values read from a callback at scrape time, e.g. the pool's own counters.
+    def __init__(self, name, help_text, collect):
+        self.name, self.help_text, self.collect = name, help_text, collect
+
+    def render(self):
+        lines = []
+        for key, value in self.collect().items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                lines.append(f"# TYPE {self.name}_{key} gauge")
+                lines.append(f"{self.name}_{key} {value}")
+        return lines
+
+request_latency = Histogram("http_request_duration_seconds", "Request latency by route.", ("route", "method", "status"))
+db_connect_latency = Histogram("db_connect_duration_seconds", "Time to obtain a database connection.")
+db_query_latency = Histogram("db_query_duration_seconds", "SQL execution time by route and statement.", ("route", "statement"))
+external_call_latency = Histogram("external_call_duration_seconds", "Twilio and SMTP call latency.", ("service", "outcome"))
+route_errors = Counter("route_errors_total", "Exceptions handled by each route, by exception type.", ("route", "error"))
+metrics_registry = [request_latency, db_connect_latency, db_query_latency, external_call_latency, route_errors]
+
+statement_names = {}
+STATEMENT_TABLE = re.compile(r"\b(?:FROM|INTO|UPDATE|TABLE)\s+`?(\w+)", re.IGNORECASE)
+
+def statement_name(query):
+    # "SELECT JOBS", "INSERT JOB_APPLICATIONS", ...: coarse enough to keep label cardinality fixed.
+    name = statement_names.get(query)
+    if name is None:
+        words = query.split(None, 1)
+        verb = words[0].upper() if words else "?"
+        match = STATEMENT_TABLE.search(query)
+        name = f"{verb} {match.group(1).upper()}" if match else verb
+        if len(statement_names) < 1000:
+            statement_names[query] = name
+    return name
+
+def current_route():
+    try:
+        return request.endpoint or "unknown"
+    except RuntimeError:
+        return "background"
+
+def record_query(query, params, elapsed):
+    db_query_latency.observe((current_route(), statement_name(query)), elapsed)
+    if SLOW_REQUEST_SECONDS:
+        try:
+            queries = g.setdefault("queries", [])
+        except RuntimeError:
+            return
+        queries.append((" ".join(query.split()), params if SLOW_REQUEST_LOG_PARAMS else None, elapsed))
+
+def record_error():
+    # Called first thing in a route's except branch, while sys.exc_info() still holds the exception.
+    route_errors.inc((current_route(), sys.exc_info()[0].__name__))
+
+class TimedCursor:
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def execute(self, query, params=()):
+        start = time.perf_counter()
+        try:
+            return self._cursor.execute(query, params)
+        finally:
+            record_query(query, params, time.perf_counter() - start)
+
+    def executemany(self, query, seq_params):
+        start = time.perf_counter()
+        try:
+            return self._cursor.executemany(query, seq_params)
+        finally:
+            record_query(query, None, time.perf_counter() - start)
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+@app.after_request
+def observe_request(response):
+    started = g.pop("request_started", None)
+    if started is None:
+        return response
+    elapsed = time.perf_counter() - started
+    request_latency.observe((request.endpoint or "unknown", request.method, str(response.status_code)), elapsed)
+    if SLOW_REQUEST_SECONDS and elapsed >= SLOW_REQUEST_SECONDS:
+        lines = [f"Slow request: {request.method} {request.path} {response.status_code} {elapsed * 1000:.1f} ms"]
+        for query, params, query_elapsed in g.get("queries", []):
+            lines.append(f"  {query_elapsed * 1000:.1f} ms  {query}" + (f"  {params}" if params is not None else ""))
+        app.logger.warning("\n".join(lines))
+    return response
+
+@app.route("/metrics", methods=["GET"])
+def metrics():
+    if METRICS_TOKEN and request.headers.get("Authorization") != f"Bearer {METRICS_TOKEN}":
+        return jsonify({"error": "Access denied!"}), 401
+    lines = []
+    for metric in metrics_registry:
+        lines.extend(metric.render())
+    return Response("\n".join(lines) + "\n", mimetype="text/plain; version=0.0.4")
+
+
+# ---------------- HELPERS ----------------
+twilio_client = None
+twilio_client_lock = threading.Lock()
+smtp_sessions = threading.local()
+# Every thread's session, so shutdown can QUIT the ones thread-local storage would otherwise just drop.
+all_smtp_sessions = []
+all_smtp_sessions_lock = threading.Lock()
+
+def get_twilio_client():
+    global twilio_client
+    if twilio_client is None:
+        with twilio_client_lock:
+            if twilio_client is None:
+                # Imported here: twilio is slow to import and most workers only need it once an OTP is sent.
+                from twilio.rest import Client
+                twilio_client = Client(TWILIO_SID, TWILIO_AUTH_TOKEN)
+    return twilio_client
+
+class SmtpSession:
+    # One logged-in SMTP connection reused for many messages by the thread that owns it.
+    def __init__(self):
+        self.server = None
+        self.last_used = 0.0
+
+    def open(self):
+        import smtplib
+        server = smtplib.SMTP(SMTP_SERVER, SMTP_PORT)
+        server.starttls()
+        server.login(EMAIL_ADDRESS, EMAIL_PASSWORD)
+        self.server = server
+
+    def send(self, msg):
+        import smtplib
+        if self.server is not None and time.monotonic() - self.last_used > SMTP_IDLE_SECONDS:
+            self.close()
+        for attempt in range(2):
+            if self.server is None:
+                self.open()
+            try:
+                self.server.send_message(msg)
+                self.last_used = time.monotonic()
+                return
+            except smtplib.SMTPServerDisconnected:
+                self.server = None
+                if attempt:
+                    raise
+
+    def close(self):
+        if self.server is not None:
+            try:
+                self.server.quit()
+            except Exception:
+                pass
+            self.server = None
+
+def get_smtp_session():
+    session = getattr(smtp_sessions, "session", None)
+    if session is None:
+        session = smtp_sessions.session = SmtpSession()
+        with all_smtp_sessions_lock:
+            all_smtp_sessions.append(session)
+    return session
+
+def close_smtp_sessions():
+    # Only safe once the threads that own the sessions have stopped sending.
+    with all_smtp_sessions_lock:
+        sessions = list(all_smtp_sessions)
+    for session in sessions:
+        session.close()
+
+def timed_external_call(service, call, *args):
+    start = time.perf_counter()
+    outcome = "error"
+    try:
+        result = call(*args)
+        outcome = "ok"
+        return result
+    finally:
+        external_call_latency.observe((service, outcome), time.perf_counter() - start)
+
+def send_sms(phone_number, message):
+    timed_external_call("twilio", lambda: get_twilio_client().messages.create(
+        body=message,
+        from_=TWILIO_PHONE,
+        to=phone_number
+    ))
+
+def send_email(to_email, subject, message):
+    msg = MIMEText(message)
+    msg["Subject"] = subject
+    msg["From"] = EMAIL_ADDRESS
+    msg["To"] = to_email
+    timed_external_call("smtp", get_smtp_session().send, msg)
+
+def validate_json(required_fields):
+    if not request.is_json:
+        return None, (jsonify({"error": "Invalid JSON format!"}), 400)
+    data = request.get_json(silent=True)
+    if data is None:
+        return None, (jsonify({"error": "Malformed JSON!"}), 400)
+    for f in required_fields:
+        if f not in data:
+            return None, (jsonify({"error": f"Missing required field: {f}!"}), 400)
+    return data, None
+
+def validate_bulk_rows():
+    # A JSON array, or NDJSON (one object per line) read off the request stream.
+    if request.mimetype in ("application/x-ndjson", "application/ndjson"):
+        rows = []
+        for number, line in enumerate(request.stream, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                rows.append(json.loads(line))
+            except ValueError:
+                return None, (jsonify({"error": f"Malformed JSON on line {number}!"}), 400)
+            if len(rows) > BULK_MAX_ROWS:
+                break
+    else:
+        if not request.is_json:
+            return None, (jsonify({"error": "Invalid JSON format!"}), 400)
+        rows = request.get_json(silent=True)
+        if not isinstance(rows, list):
+            return None, (jsonify({"error": "Expected a JSON array!"}), 400)
+    if not rows:
+        return None, (jsonify({"error": "No rows given!"}), 400)
+    if len(rows) > BULK_MAX_ROWS:
+        return None, (jsonify({"error": f"At most {BULK_MAX_ROWS} rows per request!"}), 413)
+    return rows, None
+
+def chunked(items, size):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+def release_once(conn, cursor):
+    # A streamed response closes its cursor and connection from two places: the generator's finally once the body has
+    # run, and response.call_on_close when the generator never starts (HEAD, client gone before the first chunk).
+    # Only a generator that read every row passes drained=True. Otherwise the unbuffered cursor still has rows on the
+    # wire, so closing it fails with "Unread result found" and the connection is dropped instead of reused.
+    released = False
+    def release(drained=False):
+        nonlocal released
+        if released:
+            return
+        released = True
+        if not drained:
+            conn.discard()
+            return
+        try:
+            cursor.close()
+        finally:
+            conn.close()
+    return release
+
+def stream_rows(cursor, release, columns, export_format):
+    # Rows are pulled off the unbuffered cursor EXPORT_CHUNK_SIZE at a time; release() hands the connection back.
+    drained = False
+    try:
+        if export_format == "csv":
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(columns)
+        while True:
+            rows = cursor.fetchmany(EXPORT_CHUNK_SIZE)
+            if not rows:
+                break
+            if export_format == "csv":
+                writer.writerows(rows)
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+            else:
+                yield "".join(json.dumps(dict(zip(columns, row)), default=str) + "\n" for row in rows)
+        drained = True
+        if export_format == "csv" and buffer.tell():
+            yield buffer.getvalue()
+    finally:
+        release(drained)
+
+def encode_cursor(values):
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip("=")
+
+def decode_cursor(cursor):
+    return json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+
+def validate_page(sort, size):
+    # Returns (limit, after) where after is the list of keyset values from the "after" cursor, or None on the first page.
+    try:
+        limit = int(request.args.get("limit", PAGE_DEFAULT_LIMIT))
+    except ValueError:
+        return None, (jsonify({"error": "Invalid limit!"}), 400)
+    if limit < 1 or limit > PAGE_MAX_LIMIT:
+        return None, (jsonify({"error": f"Limit must be between 1 and {PAGE_MAX_LIMIT}!"}), 400)
+    after = request.args.get("after")
+    if not after:
+        return (limit, None), None
+    try:
+        values = decode_cursor(after)
+    except Exception:
+        return None, (jsonify({"error": "Invalid cursor!"}), 400)
+    if not isinstance(values, list) or len(values) != size + 1 or values[0] != sort:
+        return None, (jsonify({"error": "Invalid cursor!"}), 400)
+    return (limit, values[1:]), None
+
+def generate_otp():
+    return str(random.randint(100000, 999999))
+
+def get_server_connection():
+    return mysql.connector.connect(
+        host=db_config["host"],
+        user=db_config["user"],
+        password=db_config["password"]
+    )
+
+class TimedConnection:
+    # Hands out cursors that time every statement for the metrics.
+    def __init__(self, conn):
+        self._conn = conn
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def cursor(self, *args, **kwargs):
+        return TimedCursor(self._conn.cursor(*args, **kwargs))
+
+    def discard(self):
+        # Drops a connection that may still have a result pending; whatever close() raises is of no interest.
+        try:
+            self._conn.close()
+        except Exception:
+            pass
+
+class PooledConnection(TimedConnection):
+    # Proxy handed out to routes; close() gives the connection back to the pool.
+    def __init__(self, pool, conn):
+        super().__init__(conn)
+        self._pool = pool
+
+    def close(self):
+        if self._conn is not None:
+            self._pool.release(self._conn)
+            self._conn = None
+
+    def discard(self):
+        # Closed and taken out of the pool rather than handed to the next borrower.
+        if self._conn is not None:
+            self._pool._discard(self._conn)
+            self._conn = None
+
+class ConnectionPool:
+    def __init__(self, connect, min_size=DB_POOL_MIN_SIZE, max_size=DB_POOL_MAX_SIZE,
+                 timeout=DB_POOL_TIMEOUT_SECONDS, idle_seconds=DB_POOL_IDLE_SECONDS):
+        if min_size < 0 or max_size < 1 or min_size > max_size:
+            raise ValueError("Invalid pool size!")
+        self.connect = connect
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.idle_seconds = idle_seconds
+        self.size = 0
+        self.idle = deque()
+        self.cond = threading.Condition()
+        self.stats = {
+            "created": 0, "closed": 0, "acquired": 0, "released": 0, "waits": 0,
+            "exhausted": 0, "health_check_failures": 0, "recycled": 0
+        }
+
+    def _open(self):
+        try:
+            conn = self.connect()
+        except Exception:
+            with self.cond:
+                self.size -= 1
+                self.cond.notify()
+            raise
+        with self.cond:
+            self.stats["created"] += 1
+        return conn
+
+    def _discard(self, conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+        with self.cond:
+            self.size -= 1
+            self.stats["closed"] += 1
+            self.cond.notify()
+
+    def _healthy(self, conn):
+        try:
+            conn.ping(reconnect=False)
+            return True
+        except Exception:
+            return False
+
+    def warm_up(self):
+        while True:
+            with self.cond:
+                if self.size >= self.min_size:
+                    return
+                self.size += 1
+            conn = self._open()
+            with self.cond:
+                self.idle.append((conn, time.monotonic()))
+                self.cond.notify()
+
+    def acquire(self):
+        deadline = time.monotonic() + self.timeout
+        while True:
+            conn = None
+            with self.cond:
+                while not self.idle and self.size >= self.max_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self.stats["exhausted"] += 1
+                        raise PoolError("Database connection pool exhausted!")
+                    self.stats["waits"] += 1
+                    self.cond.wait(remaining)
+                if self.idle:
+                    conn, last_used = self.idle.pop()
+                    stale = time.monotonic() - last_used > self.idle_seconds
+                else:
+                    self.size += 1
+            if conn is None:
+                conn = self._open()
+            elif stale:
+                with self.cond:
+                    self.stats["recycled"] += 1
+                self._discard(conn)
+                continue
+            elif not self._healthy(conn):
+                with self.cond:
+                    self.stats["health_check_failures"] += 1
+                self._discard(conn)
+                continue
+            with self.cond:
+                self.stats["acquired"] += 1
+            return PooledConnection(self, conn)
+
+    def release(self, conn):
+        # Routes may return early without commit/rollback; never hand a dirty transaction to the next borrower.
+        try:
+            conn.rollback()
+        except Exception:
+            self._discard(conn)
+            return
+        with self.cond:
+            self.stats["released"] += 1
+            self.idle.append((conn, time.monotonic()))
+            self.cond.notify()
+        self.prune()
+
+    def prune(self):
+        now = time.monotonic()
+        expired = []
+        with self.cond:
+            while self.idle and self.size - len(expired) > self.min_size and now - self.idle[0][1] > self.idle_seconds:
+                expired.append(self.idle.popleft()[0])
+        for conn in expired:
+            with self.cond:
+                self.stats["recycled"] += 1
+            self._discard(conn)
+
+    def close_all(self):
+        with self.cond:
+            conns = [conn for conn, _ in self.idle]
+            self.idle.clear()
+        for conn in conns:
+            self._discard(conn)
+
+    def get_stats(self):
+        with self.cond:
+            stats = dict(self.stats)
+            stats.update({"size": self.size, "idle": len(self.idle), "in_use": self.size - len(self.idle),
+                          "min_size": self.min_size, "max_size": self.max_size})
+        return stats
+
+db_pool = None
+db_pool_lock = threading.Lock()
+
+def get_db_pool():
+    global db_pool
+    if db_pool is None:
+        with db_pool_lock:
+            if db_pool is None:
+                db_pool = ConnectionPool(lambda: mysql.connector.connect(**db_config))
+    return db_pool
+
+def close_db_pool():
+    global db_pool
+    with db_pool_lock:
+        if db_pool is not None:
+            db_pool.close_all()
+            db_pool = None
+
+metrics_registry.append(Gauges("db_pool", "Connection pool state.", lambda: get_db_pool().get_stats() if DB_POOL_ENABLED else {}))
+
+def get_db_connection():
+    start = time.perf_counter()
+    if not DB_POOL_ENABLED:
+        conn = TimedConnection(mysql.connector.connect(**db_config))
+    else:
+        conn = get_db_pool().acquire()
+    db_connect_latency.observe((), time.perf_counter() - start)
+    return conn
+
+def split_sql(script):
+    statements, current, quote = [], [], None
+    for ch in script:
+        if quote:
+            if ch == quote:
+                quote = None
+        elif ch in ("'", '"', "`"):
+            quote = ch
+        elif ch == ";":
+            statements.append("".join(current).strip())
+            current = []
+            continue
+        current.append(ch)
+    statements.append("".join(current).strip())
+    return [stmt for stmt in statements if stmt]
+
+def list_migrations():
+    # schema.sql is version 1; later changes live in migrations/<version>_<name>.sql and are never edited once shipped.
+    migrations = [(1, "schema", SCHEMA_FILE)]
+    if os.path.isdir(MIGRATIONS_DIR):
+        for filename in sorted(os.listdir(MIGRATIONS_DIR)):
+            if filename.endswith(".sql"):
+                version, _, name = filename[:-4].partition("_")
+                migrations.append((int(version), name, os.path.join(MIGRATIONS_DIR, filename)))
+    migrations.sort()
+    return migrations
+
+def init_db():
+    conn = get_server_connection()
+    cursor = conn.cursor()
+    cursor.execute(f"CREATE DATABASE IF NOT EXISTS {db_config['database']}")
+    cursor.close()
+    conn.close()
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT GET_LOCK('schema_migrations', %s)", (MIGRATION_LOCK_TIMEOUT_SECONDS,))
+        if cursor.fetchone()[0] != 1:
+            raise RuntimeError("Timed out waiting for another process to finish migrating the database!")
+        try:
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS SCHEMA_MIGRATIONS (
+                    VERSION INT PRIMARY KEY,
+                    NAME VARCHAR(255) NOT NULL,
+                    APPLIED_AT DATETIME NOT NULL
+                )
+            """)
+            cursor.execute("SELECT VERSION FROM SCHEMA_MIGRATIONS")
+            applied = {row[0] for row in cursor.fetchall()}
+            for version, name, path in list_migrations():
+                if version in applied:
+                    continue
+                with open(path, "r") as f:
+                    script = f.read()
+                # MySQL commits DDL implicitly, so a migration that fails halfway has to be fixed up by hand.
+                for stmt in split_sql(script):
+                    cursor.execute(stmt)
+                cursor.execute("""
+                    INSERT INTO SCHEMA_MIGRATIONS 
+                    (VERSION, NAME, APPLIED_AT) 
+                    VALUES (%s, %s, %s)
+                """, (version, name, datetime.datetime.now()))
+                conn.commit()
+        finally:
+            cursor.execute("SELECT RELEASE_LOCK('schema_migrations')")
+            cursor.fetchone()
+    finally:
+        cursor.close()
+        conn.close()
+
+token_cache = OrderedDict()
+token_cache_lock = threading.Lock()
+token_revocations = {}
+token_revocations_lock = threading.Lock()
+token_revocations_refreshing = threading.Lock()
+token_revocations_state = {"last_id": 0, "checked_at": 0.0}
+
+def generate_token(claims):
+    now = datetime.datetime.now(datetime.timezone.utc)
+    claims = dict(claims, iat=now, exp=now + datetime.timedelta(hours=SESSION_EXPIRY_HOURS))
+    return jwt.encode(claims, app.config["SECRET_KEY"], algorithm="HS256")
+
+def decode_token(token):
+    # Repeated tokens skip the HMAC check; a cached entry never outlives the token's own exp.
+    now = time.time()
+    with token_cache_lock:
+        entry = token_cache.get(token)
+        if entry is not None:
+            if entry[1] > now:
+                token_cache.move_to_end(token)
+                return entry[0]
+            del token_cache[token]
+    claims = jwt.decode(token, app.config["SECRET_KEY"], algorithms=["HS256"])
+    with token_cache_lock:
+        token_cache[token] = (claims, min(now + TOKEN_CACHE_SECONDS, claims["exp"]))
+        if len(token_cache) > TOKEN_CACHE_SIZE:
+            token_cache.popitem(last=False)
+    return claims
+
+def revoke_tokens(cursor, role, user_id):
+    revoked_at = time.time()
+    cursor.execute("""
+        INSERT INTO TOKEN_REVOCATIONS 
+        (ROLE, USER_ID, REVOKED_AT) 
+        VALUES (%s, %s, %s)
+    """, (role, user_id, revoked_at))
+    return revoked_at
+
+def refresh_token_revocations():
+    # Other processes' revocations are picked up within TOKEN_REVOCATION_REFRESH_SECONDS, at the cost of one query per interval.
+    # One thread runs the query while the rest carry on with the revocations already loaded (only the first load is
+    # waited for); token_revocations_lock is held just to merge the result in, so a slow query or a pool wait does not
+    # block the other requests.
+    if time.monotonic() - token_revocations_state["checked_at"] < TOKEN_REVOCATION_REFRESH_SECONDS:
+        return
+    if not token_revocations_refreshing.acquire(blocking=not token_revocations_state["checked_at"]):
+        return
+    try:
+        if time.monotonic() - token_revocations_state["checked_at"] < TOKEN_REVOCATION_REFRESH_SECONDS:
+            return
+        cutoff = time.time() - SESSION_EXPIRY_HOURS * 3600
+        rows = []
+        try:
+            conn = get_db_connection()
+            cursor = conn.cursor()
+            try:
+                cursor.execute("""
+                    SELECT ID, ROLE, USER_ID, REVOKED_AT FROM TOKEN_REVOCATIONS 
+                    WHERE ID > %s AND REVOKED_AT > %s 
+                    ORDER BY ID
+                """, (token_revocations_state["last_id"], cutoff))
+                rows = cursor.fetchall()
+            finally:
+                cursor.close()
+                conn.close()
+        except Error as e:
+            app.logger.error(f"Token revocation refresh failed: {str(e)}")
+        with token_revocations_lock:
+            for revocation_id, role, user_id, revoked_at in rows:
+                token_revocations[(role, user_id)] = max(revoked_at, token_revocations.get((role, user_id), 0))
+                token_revocations_state["last_id"] = revocation_id
+            # Every token issued before the cutoff has expired, so older revocations can be forgotten.
+            for key in [key for key, revoked_at in token_revocations.items() if revoked_at <= cutoff]:
+                del token_revocations[key]
+        token_revocations_state["checked_at"] = time.monotonic()
+    finally:
+        token_revocations_refreshing.release()
+
+def is_token_revoked(claims):
+    refresh_token_revocations()
+    revoked_at = token_revocations.get((claims["role"], claims["id"]))
+    return revoked_at is not None and claims["iat"] <= revoked_at
+
+def token_required(f):
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        token = None
+        if "Authorization" in request.headers:
+            try:
+                token = request.headers["Authorization"].split(" ")[1]
+            except:
+                return jsonify({"error": "Invalid token header!"}), 401
+        if not token:
+            return jsonify({"error": "Token is missing!"}), 401
+        try:
+            current_user = decode_token(token)
+            role = current_user["role"]
+            if role != "admin" and is_token_revoked(current_user):
+                return jsonify({"error": "Access denied!"}), 401
+        except jwt.ExpiredSignatureError:
+            return jsonify({"error": "Access denied!"}), 401
+        except Exception:
+            return jsonify({"error": "Access denied!"}), 401
+        return f(current_user, role, *args, **kwargs)
+    return decorated
+
+
+# ---------------- OTP STORE ----------------
+OTP_OK, OTP_INVALID, OTP_MISSING, OTP_LOCKED = "ok", "invalid", "missing", "locked"
+
+class MemoryOtpStore:
+    # Entries live in lock-striped shards as [value, expires_at, attempts]. A timing wheel of one-second slots
+    # records which keys fall due when, so expiry drops a slot's worth of keys instead of scanning the shards.
+    def __init__(self, shards=OTP_STORE_SHARDS, wheel_slots=OTP_STORE_WHEEL_SLOTS, tick_seconds=1.0):
+        self.shards = [({}, threading.Lock()) for _ in range(shards)]
+        self.wheel = [set() for _ in range(wheel_slots)]
+        self.wheel_lock = threading.Lock()
+        self.tick_seconds = tick_seconds
+        self.last_tick = int(time.monotonic() / tick_seconds)
+
+    def shard(self, key):
+        return self.shards[hash(key) % len(self.shards)]
+
+    def schedule(self, key, expires_at):
+        with self.wheel_lock:
+            self.wheel[int(expires_at / self.tick_seconds) % len(self.wheel)].add(key)
+
+    def sweep(self):
+        now_tick = int(time.monotonic() / self.tick_seconds)
+        with self.wheel_lock:
+            if now_tick == self.last_tick:
+                return
+            if now_tick - self.last_tick >= len(self.wheel):
+                ticks = range(len(self.wheel))
+            else:
+                ticks = range(self.last_tick + 1, now_tick + 1)
+            due = []
+            for tick in ticks:
+                slot = self.wheel[tick % len(self.wheel)]
+                due.extend(slot)
+                slot.clear()
+            self.last_tick = now_tick
+        now = time.monotonic()
+        for key in due:
+            entries, lock = self.shard(key)
+            with lock:
+                entry = entries.get(key)
+                if entry is None:
+                    continue
+                if entry[1] <= now:
+                    del entries[key]
+                else:
+                    # TTLs longer than one turn of the wheel come round again.
+                    self.schedule(key, entry[1])
+
+    def put(self, key, value, ttl_seconds):
+        self.sweep()
+        expires_at = time.monotonic() + ttl_seconds
+        entries, lock = self.shard(key)
+        with lock:
+            entries[key] = [value, expires_at, 0]
+            self.schedule(key, expires_at)
+
+    def verify(self, key, value):
+        self.sweep()
+        entries, lock = self.shard(key)
+        with lock:
+            entry = entries.get(key)
+            if entry is None or entry[1] <= time.monotonic():
+                entries.pop(key, None)
+                return OTP_MISSING
+            entry[2] += 1
+            if hmac.compare_digest(entry[0], value):
+                del entries[key]
+                return OTP_OK
+            if entry[2] >= OTP_MAX_ATTEMPTS:
+                del entries[key]
+                return OTP_LOCKED
+            return OTP_INVALID
+
+    def delete(self, key):
+        entries, lock = self.shard(key)
+        with lock:
+            entries.pop(key, None)
+
+class RedisOtpStore:
+    # Compare, count the attempt and consume in one server-side step so two concurrent guesses cannot both pass.
+    VERIFY_SCRIPT = """
+        local stored = redis.call('HGET', KEYS[1], 'value')
+        if not stored then return 'missing' end
+        local attempts = redis.call('HINCRBY', KEYS[1], 'attempts', 1)
+        if stored == ARGV[1] then
+            redis.call('DEL', KEYS[1])
+            return 'ok'
+        end
+        if attempts >= tonumber(ARGV[2]) then
+            redis.call('DEL', KEYS[1])
+            return 'locked'
+        end
+        return 'invalid'
+    """
+
+    def __init__(self, url):
+        import redis
+        self.client = redis.Redis.from_url(url)
+        self.verify_script = self.client.register_script(self.VERIFY_SCRIPT)
+
+    def put(self, key, value, ttl_seconds):
+        pipe = self.client.pipeline()
+        pipe.delete(key)
+        pipe.hset(key, mapping={"value": value, "attempts": 0})
+        pipe.expire(key, ttl_seconds)
+        pipe.execute()
+
+    def verify(self, key, value):
+        result = self.verify_script(keys=[key], args=[value, OTP_MAX_ATTEMPTS])
+        return result.decode() if isinstance(result, bytes) else result
+
+    def delete(self, key):
+        self.client.delete(key)
+
+otp_store = None
+otp_store_lock = threading.Lock()
+
+def get_otp_store():
+    global otp_store
+    if otp_store is None:
+        with otp_store_lock:
+            if otp_store is None:
+                if OTP_STORE == "memory":
+                    otp_store = MemoryOtpStore()
+                elif OTP_STORE == "redis":
+                    otp_store = RedisOtpStore(OTP_STORE_URL)
+                else:
+                    raise ValueError(f"Unsupported OTP store: {OTP_STORE}")
+    return otp_store
+
+def registration_otp_key(role, phone_number):
+    return f"otp:register:{role}:{phone_number}"
+
+def registration_otp_value(phone_otp, email_otp, email):
+    # Both OTPs and the email they were sent to live under one key, so they are checked and consumed together.
+    return f"{phone_otp}:{email_otp}:{email.lower()}"
+
+def login_otp_key(role, phone_number):
+    return f"otp:login:{role}:{phone_number}"
+
+
+# ---------------- RATE LIMITING ----------------
+def parse_rate(rule):
+    count, _, seconds = rule.partition("/")
+    return int(count), float(seconds)
+
+class MemoryRateLimiter:
+    # Token buckets of [tokens, updated_at], striped over shards; each shard is an LRU capped at its share of
+    # RATE_LIMIT_MAX_KEYS. An evicted bucket was the least recently hit, so at worst it restarts full.
+    def __init__(self, shards=16, max_keys=RATE_LIMIT_MAX_KEYS):
+        self.shards = [(OrderedDict(), threading.Lock()) for _ in range(shards)]
+        self.max_keys_per_shard = max(1, max_keys // shards)
+
+    def hit(self, key, capacity, period):
+        return self.hit_all([(key, capacity, period)])
+
+    def hit_all(self, limits):
+        # limits is a list of (key, capacity, period). Every bucket is refilled and checked before any is charged, so
+        # a request turned away by one bucket costs nothing in the others. Shard locks are taken in index order.
+        now = time.monotonic()
+        shard_ids = sorted({hash(key) % len(self.shards) for key, _, _ in limits})
+        for shard_id in shard_ids:
+            self.shards[shard_id][1].acquire()
+        try:
+            checked, retry_after = [], 0
+            for key, capacity, period in limits:
+                rate = capacity / period
+                buckets = self.shards[hash(key) % len(self.shards)][0]
+                bucket = buckets.get(key)
+                if bucket is None:
+                    bucket = buckets[key] = [float(capacity), now]
+                    if len(buckets) > self.max_keys_per_shard:
+                        buckets.popitem(last=False)
+                else:
+                    buckets.move_to_end(key)
+                    bucket[0] = min(capacity, bucket[0] + (now - bucket[1]) * rate)
+                    bucket[1] = now
+                if bucket[0] < 1:
+                    retry_after = max(retry_after, math.ceil((1 - bucket[0]) / rate))
+                checked.append(bucket)
+            if retry_after:
+                return False, retry_after
+            for bucket in checked:
+                bucket[0] -= 1
+            return True, 0
+        finally:
+            for shard_id in reversed(shard_ids):
+                self.shards[shard_id][1].release()
+
+class RedisRateLimiter:
+    # Same token buckets, evaluated inside Redis so every worker shares them. Keys expire once they would be full again.
+    # ARGV is now followed by a capacity and a rate per key; as in memory, nothing is charged unless every bucket allows.
+    HIT_SCRIPT = """
+        local now = tonumber(ARGV[1])
+        local tokens = {}
+        local retry_after = 0
+        for i, key in ipairs(KEYS) do
+            local capacity = tonumber(ARGV[2 * i])
+            local rate = tonumber(ARGV[2 * i + 1])
+            local bucket = redis.call('HMGET', key, 'tokens', 'updated_at')
+            local updated_at = tonumber(bucket[2]) or now
+            tokens[i] = math.min(capacity, (tonumber(bucket[1]) or capacity) + math.max(0, now - updated_at) * rate)
+            if tokens[i] < 1 then
+                retry_after = math.max(retry_after, math.ceil((1 - tokens[i]) / rate))
+            end
+        end
+        for i, key in ipairs(KEYS) do
+            local capacity = tonumber(ARGV[2 * i])
+            local rate = tonumber(ARGV[2 * i + 1])
+            if retry_after == 0 then
+                tokens[i] = tokens[i] - 1
+            end
+            redis.call('HSET', key, 'tokens', tostring(tokens[i]), 'updated_at', tostring(now))
+            redis.call('EXPIRE', key, math.ceil(capacity / rate) + 1)
+        end
+        if retry_after == 0 then return {1, 0} end
+        return {0, retry_after}
+    """
+
+    def __init__(self, url):
+        import redis
+        self.client = redis.Redis.from_url(url)
+        self.hit_script = self.client.register_script(self.HIT_SCRIPT)
+
+    def hit(self, key, capacity, period):
+        return self.hit_all([(key, capacity, period)])
+
+    def hit_all(self, limits):
+        args = [time.time()]
+        for _, capacity, period in limits:
+            args += [capacity, capacity / period]
+        allowed, retry_after = self.hit_script(keys=[f"ratelimit:{key}" for key, _, _ in limits], args=args)
+        return allowed == 1, int(retry_after)
+
+rate_limiter = None
+rate_limiter_lock = threading.Lock()
+
+def get_rate_limiter():
+    global rate_limiter
+    if rate_limiter is None:
+        with rate_limiter_lock:
+            if rate_limiter is None:
+                if RATE_LIMIT_STORE == "memory":
+                    rate_limiter = MemoryRateLimiter()
+                elif RATE_LIMIT_STORE == "redis":
+                    rate_limiter = RedisRateLimiter(RATE_LIMIT_STORE_URL)
+                else:
+                    raise ValueError(f"Unsupported rate limit store: {RATE_LIMIT_STORE}")
+    return rate_limiter
+
+def rate_limited(f):
+    # Rules are looked up by the view's name in RATE_LIMIT_RULES. All of a request's buckets are charged together or
+    # not at all, so a flood from one address does not drain the per-phone buckets of the numbers it is targeting,
+    # and a number that is over its own limit does not use up the caller's IP allowance either.
+    rules = RATE_LIMIT_RULES.get(f.__name__, {})
+    parsed = [(kind, *parse_rate(rule)) for kind, rule in rules.items()]
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        if not RATE_LIMIT_ENABLED or not parsed:
+            return f(*args, **kwargs)
+        data = request.get_json(silent=True) if request.is_json else None
+        data = data if isinstance(data, dict) else {}
+        limits = []
+        for kind, capacity, period in parsed:
+            value = request.remote_addr if kind == "ip" else data.get(f"{kind}_number" if kind == "phone" else kind)
+            if value is not None:
+                limits.append((f"{f.__name__}:{kind}:{str(value).lower()}", capacity, period))
+        if not limits:
+            return f(*args, **kwargs)
+        try:
+            allowed, retry_after = get_rate_limiter().hit_all(limits)
+        except Exception as e:
+            # An unreachable limiter store must not take the login routes down with it.
+            app.logger.error(f"Rate limiter error: {str(e)}")
+            return f(*args, **kwargs)
+        if not allowed:
+            response = jsonify({"error": "Too many requests. Please try again later!"})
+            response.headers["Retry-After"] = str(max(1, retry_after))
+            return response, 429
+        return f(*args, **kwargs)
+    return decorated
+
+
+# ---------------- LISTING CACHE ----------------
+class MemoryListingCache:
+    # LRU of rendered listings with a TTL. get() hands out the current generation; an invalidation bumps it,
+    # so a read that started before a write cannot put its stale result back after the write's invalidation.
+    def __init__(self, max_size=LISTING_CACHE_SIZE, ttl=LISTING_CACHE_SECONDS):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.invalidated = OrderedDict()
+        self.generation = 0
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        now = time.monotonic()
+        with self.lock:
+            item = self.entries.get(key)
+            if item is not None:
+                if item[0] > now:
+                    self.entries.move_to_end(key)
+                    return item[1], None
+                del self.entries[key]
+            return None, self.generation
+
+    def put(self, key, entry, token):
+        now = time.monotonic()
+        with self.lock:
+            mark = self.invalidated.get(key)
+            if mark is not None and mark[0] > token:
+                return
+            self.entries[key] = (now + self.ttl, entry)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def invalidate(self, *keys):
+        now = time.monotonic()
+        with self.lock:
+            self.generation += 1
+            for key in keys:
+                self.entries.pop(key, None)
+                self.invalidated[key] = (self.generation, now)
+                self.invalidated.move_to_end(key)
+            # Only reads still running from before the mark can race it; a TTL is far longer than any of them.
+            while self.invalidated and next(iter(self.invalidated.values()))[1] < now - self.ttl:
+                self.invalidated.popitem(last=False)
+
+class RedisListingCache:
+    # Same contract shared by every worker: the generation is a per-key counter next to the entry.
+    PUT_SCRIPT = """
+        if (redis.call('GET', KEYS[2]) or '0') ~= ARGV[1] then return 0 end
+        redis.call('SET', KEYS[1], ARGV[2], 'EX', ARGV[3])
+        return 1
+    """
+
+    def __init__(self, url, ttl=LISTING_CACHE_SECONDS):
+        import redis
+        self.client = redis.Redis.from_url(url)
+        self.ttl = ttl
+        self.put_script = self.client.register_script(self.PUT_SCRIPT)
+
+    def get(self, key):
+        pipe = self.client.pipeline(transaction=False)
+        pipe.get(f"listing:{key}")
+        pipe.get(f"listing:gen:{key}")
+        value, generation = pipe.execute()
+        if value is not None:
+            return json.loads(value), None
+        return None, (generation or b"0").decode()
+
+    def put(self, key, entry, token):
+        self.put_script(keys=[f"listing:{key}", f"listing:gen:{key}"], args=[token, json.dumps(entry), self.ttl])
+
+    def invalidate(self, *keys):
+        pipe = self.client.pipeline(transaction=False)
+        for key in keys:
+            pipe.delete(f"listing:{key}")
+            pipe.incr(f"listing:gen:{key}")
+            pipe.expire(f"listing:gen:{key}", self.ttl * 2)
+        pipe.execute()
+
+listing_cache = None
+listing_cache_lock = threading.Lock()
+
+def get_listing_cache():
+    global listing_cache
+    if listing_cache is None:
+        with listing_cache_lock:
+            if listing_cache is None:
+                if LISTING_CACHE_STORE == "memory":
+                    listing_cache = MemoryListingCache()
+                elif LISTING_CACHE_STORE == "redis":
+                    listing_cache = RedisListingCache(LISTING_CACHE_STORE_URL)
+                else:
+                    raise ValueError(f"Unsupported listing cache store: {LISTING_CACHE_STORE}")
+    return listing_cache
+
+def cached_listing(key):
+    # Returns (entry, token). A token of None means "do not store", e.g. when the cache is off or unreachable.
+    if not LISTING_CACHE_ENABLED:
+        return None, None
+    try:
+        return get_listing_cache().get(key)
+    except Exception as e:
+        app.logger.error(f"Listing cache error: {str(e)}")
+        return None, None
+
+def invalidate_listings(*keys):
+    if not LISTING_CACHE_ENABLED or not keys:
+        return
+    try:
+        get_listing_cache().invalidate(*keys)
+    except Exception as e:
+        app.logger.error(f"Listing cache invalidation failed, entries stay stale for up to {LISTING_CACHE_SECONDS}s: {str(e)}")
+
+def listing_response(entry):
+    if request.if_none_match.contains(entry["etag"]):
+        response = Response(status=304)
+    else:
+        response = Response(entry["body"], mimetype="application/json")
+    response.set_etag(entry["etag"])
+    return response
+
+def store_listing(key, token, payload, **extra):
+    body = jsonify(payload).get_data(as_text=True)
+    entry = {"etag": hashlib.sha1(body.encode()).hexdigest(), "body": body, **extra}
+    if token is not None:
+        try:
+            get_listing_cache().put(key, entry, token)
+        except Exception as e:
+            app.logger.error(f"Listing cache error: {str(e)}")
+    return listing_response(entry)
+
+
+# ---------------- NOTIFICATIONS ----------------
+fake_outbox = []
+fake_outbox_lock = threading.Lock()
+notify_wakeup = threading.Event()
+notify_stop = threading.Event()
+notify_workers = []
+
+def enqueue_notification(cursor, channel, recipient, message, subject=None):
+    # Written in the caller's transaction, so a message exists if and only if the row it belongs to was committed.
+    enqueue_notifications(cursor, channel, [(recipient, subject, message)])
+
+def enqueue_notifications(cursor, channel, messages, spacing_seconds=0.0):
+    # spacing_seconds schedules the messages that far apart. Workers claim in NEXT_ATTEMPT_AT order, so anything
+    # enqueued for now, an OTP say, goes ahead of the part of a bulk send that is not due yet.
+    now = datetime.datetime.now()
+    cursor.executemany("""
+        INSERT INTO NOTIFICATIONS 
+        (CHANNEL, RECIPIENT, SUBJECT, BODY, STATUS, ATTEMPTS, NEXT_ATTEMPT_AT) 
+        VALUES (%s, %s, %s, %s, 'PENDING', 0, %s)
+    """, [(channel, recipient, subject, message, now + datetime.timedelta(seconds=i * spacing_seconds))
+          for i, (recipient, subject, message) in enumerate(messages)])
+
+def wake_notification_workers():
+    notify_wakeup.set()
+
+def deliver_notification(channel, recipient, subject, message):
+    if channel not in ("sms", "email"):
+        raise ValueError(f"Unknown notification channel: {channel}")
+    if NOTIFY_TRANSPORT == "fake":
+        with fake_outbox_lock:
+            fake_outbox.append({"channel": channel, "recipient": recipient, "subject": subject, "message": message})
+    elif channel == "sms":
+        send_sms(recipient, message)
+    else:
+        send_email(recipient, subject, message)
+
+def notification_backoff(attempts):
+    delay = min(NOTIFY_BACKOFF_SECONDS * (2 ** (attempts - 1)), NOTIFY_BACKOFF_MAX_SECONDS)
+    return delay * random.uniform(0.5, 1.0)
+
+def claim_notifications(batch_size):
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        now = datetime.datetime.now()
+        # A SENDING row whose lease has run out belongs to a worker that died mid-send, so it is picked up again.
+        cursor.execute("""
+            SELECT ID, CHANNEL, RECIPIENT, SUBJECT, BODY, ATTEMPTS FROM NOTIFICATIONS 
+            WHERE STATUS IN ('PENDING', 'SENDING') AND NEXT_ATTEMPT_AT <= %s 
+            ORDER BY NEXT_ATTEMPT_AT 
+            LIMIT %s 
+            FOR UPDATE SKIP LOCKED
+        """, (now, batch_size))
+        rows = cursor.fetchall()
+        if rows:
+            lease = now + datetime.timedelta(seconds=NOTIFY_LEASE_SECONDS)
+            cursor.executemany("""
+                UPDATE NOTIFICATIONS 
+                SET STATUS = 'SENDING', ATTEMPTS = ATTEMPTS + 1, NEXT_ATTEMPT_AT = %s 
+                WHERE ID = %s
+            """, [(lease, row[0]) for row in rows])
+        conn.commit()
+        return rows
+    finally:
+        cursor.close()
+        conn.close()
+
+def finish_notifications(sent, failed):
+    if not sent and not failed:
+        return
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        if sent:
+            cursor.executemany("""
+                UPDATE NOTIFICATIONS 
+                SET STATUS = 'SENT', LAST_ERROR = NULL 
+                WHERE ID = %s
+            """, [(notification_id,) for notification_id in sent])
+        now = datetime.datetime.now()
+        for notification_id, attempts, error in failed:
+            if attempts >= NOTIFY_MAX_ATTEMPTS:
+                cursor.execute("""
+                    UPDATE NOTIFICATIONS 
+                    SET STATUS = 'FAILED', LAST_ERROR = %s 
+                    WHERE ID = %s
+                """, (error[:255], notification_id))
+            else:
+                cursor.execute("""
+                    UPDATE NOTIFICATIONS 
+                    SET STATUS = 'PENDING', LAST_ERROR = %s, NEXT_ATTEMPT_AT = %s 
+                    WHERE ID = %s
+                """, (error[:255], now + datetime.timedelta(seconds=notification_backoff(attempts)), notification_id))
+        conn.commit()
+    finally:
+        cursor.close()
+        conn.close()
+
+async def deliver_batch(rows):
+    # Twilio and SMTP clients are blocking, so each send runs on the loop's executor; gather() overlaps
+    # the round trips, e.g. a registration's SMS and email go out together instead of one after the other.
+    loop = asyncio.get_running_loop()
+
+    async def deliver(notification_id, channel, recipient, subject, message, attempts):
+        try:
+            await loop.run_in_executor(None, deliver_notification, channel, recipient, subject, message)
+            return notification_id, attempts, None
+        except Exception as e:
+            return notification_id, attempts, str(e)
+
+    return await asyncio.gather(*(deliver(*row) for row in rows))
+
+def new_delivery_loop(concurrency=NOTIFY_CONCURRENCY):
+    loop = asyncio.new_event_loop()
+    # Long-lived threads, so each keeps its SMTP session between batches.
+    loop.set_default_executor(ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="notify-send"))
+    return loop
+
+def process_notifications(batch_size=NOTIFY_BATCH_SIZE, loop=None):
+    rows = claim_notifications(batch_size)
+    if not rows:
+        return 0
+    if loop is None:
+        results = asyncio.run(deliver_batch(rows))
+    else:
+        results = loop.run_until_complete(deliver_batch(rows))
+    sent, failed = [], []
+    for notification_id, attempts, error in results:
+        if error is None:
+            sent.append(notification_id)
+        else:
+            failed.append((notification_id, attempts + 1, error))
+    finish_notifications(sent, failed)
+    return len(rows)
+
+def notification_worker():
+    loop = new_delivery_loop()
+    try:
+        while not notify_stop.is_set():
+            try:
+                processed = process_notifications(loop=loop)
+            except Exception as e:
+                app.logger.error(f"Notification worker error: {str(e)}")
+                processed = 0
+            if processed < NOTIFY_BATCH_SIZE:
+                notify_wakeup.wait(NOTIFY_POLL_SECONDS)
+                notify_wakeup.clear()
+    finally:
+        loop.run_until_complete(loop.shutdown_default_executor())
+        loop.close()
+
+def start_notification_workers(count=NOTIFY_WORKERS):
+    notify_stop.clear()
+    for i in range(count):
+        worker = threading.Thread(target=notification_worker, name=f"notification-worker-{i}", daemon=True)
+        worker.start()
+        notify_workers.append(worker)
+
+def stop_notification_workers(timeout=None):
+    notify_stop.set()
+    notify_wakeup.set()
+    for worker in notify_workers:
+        worker.join(timeout)
+    # A worker still stuck in a send keeps its session; the others get a clean QUIT instead of a dropped socket.
+    if not any(worker.is_alive() for worker in notify_workers):
+        close_smtp_sessions()
+    notify_workers.clear()
+
+
+# ---------------- RESUME STORAGE ----------------
+class UploadRejected(Exception):
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+class ResumeUpload:
+    # A resume arriving chunk by chunk: written to a temp file under the store root and hashed as it goes, so memory
+    # use is one chunk whatever the file size. The size limit and the magic bytes are checked on every write.
+    PDF_MAGIC = b"%PDF-"
+
+    def __init__(self, store, max_bytes=None, magic=None):
+        self.store = store
+        self.max_bytes = max_bytes
+        self.magic = magic
+        self.head = b""
+        self.digest = hashlib.sha256()
+        self.size = 0
+        fd, self.tmp_path = tempfile.mkstemp(dir=store.root, prefix=".upload-")
+        self.file = os.fdopen(fd, "wb")
+
+    def write(self, chunk):
+        self.size += len(chunk)
+        if self.max_bytes is not None and self.size > self.max_bytes:
+            raise UploadRejected(f"Resume must not be larger than {self.max_bytes // 1024} KB!", 413)
+        if self.magic and len(self.head) < len(self.magic):
+            self.head += chunk[:len(self.magic) - len(self.head)]
+            if not self.magic.startswith(self.head):
+                raise UploadRejected("Only PDF files are allowed")
+        self.digest.update(chunk)
+        self.file.write(chunk)
+
+    def finish(self):
+        # The key is known once the last chunk is in; the file stays in its temp path until publish().
+        self.file.close()
+        if self.magic and self.head != self.magic:
+            raise UploadRejected("Only PDF files are allowed")
+        self.key = self.digest.hexdigest()
+        return self.key, self.size
+
+    def publish(self):
+        # An existing copy is touched instead, so the sweep leaves it alone while this application commits.
+        target = self.store.path(self.key)
+        try:
+            os.utime(target)
+            os.remove(self.tmp_path)
+            self.created = False
+        except FileNotFoundError:
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            os.replace(self.tmp_path, target)
+            self.created = True
+        self.published_at = os.stat(target).st_mtime
+
+    def commit(self):
+        result = self.finish()
+        self.publish()
+        return result
+
+    def discard(self):
+        self.file.close()
+        if os.path.exists(self.tmp_path):
+            os.remove(self.tmp_path)
+
+def multipart_events(stream, boundary, chunk_size=RESUME_CHUNK_SIZE):
+    # Decodes a multipart/form-data body straight off the request stream, one chunk at a time. Yields
+    # ("field", name, value), ("file", name, filename) and ("data", chunk, more_data); a caller that stops
+    # iterating leaves the rest of the body unread. Data is only fed in when the decoder asks for more, so its buffer
+    # never holds more than about one chunk.
+    decoder = MultipartDecoder(boundary, max_parts=16)
+    part, value = None, []
+    try:
+        while True:
+            event = decoder.next_event()
+            if isinstance(event, NeedData):
+                decoder.receive_data(stream.read(chunk_size) or None)
+            elif isinstance(event, Epilogue):
+                return
+            elif isinstance(event, Field):
+                part, value = event, []
+            elif isinstance(event, File):
+                part = event
+                yield "file", event.name, event.filename
+            elif isinstance(event, Data):
+                if isinstance(part, Field):
+                    value.append(event.data)
+                    if sum(len(piece) for piece in value) > RESUME_FORM_OVERHEAD_BYTES:
+                        raise UploadRejected("Form field too large!", 413)
+                    if not event.more_data:
+                        yield "field", part.name, b"".join(value).decode("utf-8", "replace")
+                else:
+                    yield "data", event.data, event.more_data
+    except RequestEntityTooLarge:
+        raise UploadRejected("Too many form parts!", 413)
+    except ValueError:
+        raise UploadRejected("Malformed upload!")
+
+class ZipSink:
+    # Write end of a streamed ZIP. zipfile sees an unseekable file and writes data descriptors after each entry;
+    # the response generator drains whatever was written after every chunk.
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        if not self.chunks:
+            return []
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return [data]
+
+RESUME_EXPORT_COLUMNS = ["APPLICATION_ID", "NAME", "EMAIL", "PHONE_NUMBER", "DOB", "HIGHEST_DEGREE", "SPECIALIZATION", "WORK_EXPERIENCE", "RESUME_FILE"]
+
+def stream_resume_zip(cursor, release):
+    # Closes up through release(), like stream_rows, which drops the connection unless every row was read. Rows, and
+    # any resume still held in RESUME_DATA, come off the unbuffered cursor one at a time and every file goes into the
+    # archive RESUME_CHUNK_SIZE at a time. The manifest is spooled to a temp file and added last, so memory stays flat
+    # however many applicants there are.
+    store = get_resume_store()
+    sink = ZipSink()
+    manifest = tempfile.TemporaryFile(mode="w+", newline="")
+    writer = csv.writer(manifest)
+    writer.writerow(RESUME_EXPORT_COLUMNS)
+    drained = False
+    try:
+        with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=1) as archive:
+            for application_id, resume_name, resume_key, resume_data, *profile in iter(cursor.fetchone, None):
+                entry = f"resumes/{application_id}_{secure_filename(resume_name) or 'resume.pdf'}"
+                if resume_key and store.exists(resume_key):
+                    source = open(store.path(resume_key), "rb")
+                elif resume_data is not None:
+                    source = io.BytesIO(resume_data)
+                else:
+                    entry, source = "", None
+                writer.writerow([application_id, *profile, entry])
+                if source is None:
+                    continue
+                with source, archive.open(entry, "w", force_zip64=True) as target:
+                    while True:
+                        chunk = source.read(RESUME_CHUNK_SIZE)
+                        if not chunk:
+                            break
+                        target.write(chunk)
+                        yield from sink.drain()
+                yield from sink.drain()
+            drained = True
+            manifest.seek(0)
+            with archive.open("manifest.csv", "w") as target:
+                while True:
+                    text = manifest.read(RESUME_CHUNK_SIZE)
+                    if not text:
+                        break
+                    target.write(text.encode())
+        yield from sink.drain()
+    except Exception as e:
+        # The status line is long gone; the client gets a truncated archive.
+        app.logger.error(f"Resume export failed: {str(e)}")
+        raise
+    finally:
+        manifest.close()
+        release(drained)
+
+class LocalResumeStore:
+    # Content-addressed: a resume lives at <root>/<sha[:2]>/<sha[2:4]>/<sha>, so identical uploads share one file.
+    def __init__(self, root, chunk_size=RESUME_CHUNK_SIZE):
+        self.root = os.path.abspath(root)
+        self.chunk_size = chunk_size
+        os.makedirs(self.root, exist_ok=True)
+
+    def path(self, key):
+        return os.path.join(self.root, key[:2], key[2:4], key)
+
+    def exists(self, key):
+        return os.path.isfile(self.path(key))
+
+    def open_upload(self, max_bytes=None, magic=None):
+        return ResumeUpload(self, max_bytes, magic)
+
+    def save(self, stream):
+        upload = self.open_upload()
+        try:
+            while True:
+                chunk = stream.read(self.chunk_size)
+                if not chunk:
+                    break
+                upload.write(chunk)
+            return upload.commit()
+        finally:
+            upload.discard()
+
+    def modified(self, key):
+        try:
+            return os.stat(self.path(key)).st_mtime
+        except FileNotFoundError:
+            return None
+
+    def delete(self, key):
+        if self.exists(key):
+            os.remove(self.path(key))
+
+    def keys(self):
+        for dirpath, _, filenames in os.walk(self.root):
+            for filename in filenames:
+                if not filename.startswith("."):
+                    yield filename
+
+    def send(self, key, filename):
+        # Served from disk in chunks by werkzeug; conditional=True answers Range and If-None-Match against the hash.
+        return send_file(
+            self.path(key),
+            download_name=filename,
+            as_attachment=True,
+            mimetype="application/pdf",
+            conditional=True,
+            etag=key
+        )
+
+resume_store = None
+resume_store_lock = threading.Lock()
+
+def get_resume_store():
+    global resume_store
+    if resume_store is None:
+        with resume_store_lock:
+            if resume_store is None:
+                if RESUME_STORAGE_BACKEND == "local":
+                    resume_store = LocalResumeStore(RESUME_STORAGE_DIR)
+                else:
+                    raise ValueError(f"Unsupported resume storage backend: {RESUME_STORAGE_BACKEND}")
+    return resume_store
+
+def delete_unreferenced_resumes(cursor, keys, touched_before):
+    # Deletes the stored files no application points at. A file published or touched after touched_before is kept:
+    # the upload that touched it may not have committed its row yet.
+    store = get_resume_store()
+    keys = iter(keys)
+    deleted = 0
+    while True:
+        batch = list(dict.fromkeys(itertools.islice(keys, REAPER_BATCH_SIZE)))
+        if not batch:
+            return deleted
+        cursor.execute(f"""
+            SELECT DISTINCT RESUME_SHA256 FROM JOB_APPLICATIONS 
+            WHERE RESUME_SHA256 IN ({", ".join(["%s"] * len(batch))})
+        """, batch)
+        referenced = {row[0] for row in cursor.fetchall()}
+        for key in batch:
+            modified = store.modified(key)
+            if key not in referenced and modified is not None and modified <= touched_before:
+                store.delete(key)
+                deleted += 1
+
+def delete_orphaned_upload(upload):
+    # A resume this upload published whose application then failed to commit.
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        try:
+            delete_unreferenced_resumes(cursor, [upload.key], upload.published_at)
+        finally:
+            cursor.close()
+            conn.close()
+    except Exception as e:
+        app.logger.error(f"Could not delete orphaned resume {upload.key}: {str(e)}")
+
+
+# ---------------- JOB SEARCH ----------------
+def tokenize(text):
+    return re.findall(r"[a-z0-9]+", text.lower())
+
+def load_jobs(cursor, index):
+    # Every live job, in ID order and SEARCH_REBUILD_BATCH_SIZE at a time.
+    last_id = 0
+    while True:
+        cursor.execute("""
+            SELECT J.ID, J.JOB_TITLE, J.SPECIALIZATION, J.LOCATION, J.SALARY, J.MINIMUM_WORK_EXPERIENCE 
+            FROM JOBS J INNER JOIN EMPLOYERS E ON E.ID = J.EMPLOYER_ID 
+            WHERE J.ID > %s AND E.DELETED_AT IS NULL 
+            ORDER BY J.ID 
+            LIMIT %s
+        """, (last_id, SEARCH_REBUILD_BATCH_SIZE))
+        rows = cursor.fetchall()
+        if not rows:
+            return
+        for row in rows:
+            index.add(*row)
+        last_id = rows[-1][0]
+
+class JobSearchIndex:
+    # BM25 over title, specialization and location. Postings map term -> {job_id: term frequency};
+    # terms is kept sorted so a query token expands to every term it prefixes with one bisect.
+    K1, B = 1.2, 0.75
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.docs = {}
+        self.lengths = {}
+        self.postings = {}
+        self.terms = []
+        self.total_length = 0
+        self.built_at = 0.0
+        # Adds and removes made while a rebuild is reading JOBS, replayed onto the new index before it is swapped in.
+        self.pending = None
+
+    def add(self, job_id, job_title, specialization, location, salary, minimum_work_experience):
+        with self.lock:
+            if self.pending is not None:
+                self.pending.append(("add", (job_id, job_title, specialization, location, salary, minimum_work_experience)))
+            if job_id in self.docs:
+                self.remove(job_id)
+            tokens = tokenize(job_title) + tokenize(specialization) + tokenize(location)
+            self.docs[job_id] = (job_title, specialization, location, salary, minimum_work_experience)
+            self.lengths[job_id] = len(tokens)
+            self.total_length += len(tokens)
+            counts = {}
+            for token in tokens:
+                counts[token] = counts.get(token, 0) + 1
+            for token, tf in counts.items():
+                postings = self.postings.get(token)
+                if postings is None:
+                    postings = self.postings[token] = {}
+                    bisect.insort(self.terms, token)
+                postings[job_id] = tf
+
+    def remove(self, job_id):
+        with self.lock:
+            if self.pending is not None:
+                self.pending.append(("remove", (job_id,)))
+            doc = self.docs.pop(job_id, None)
+            if doc is None:
+                return
+            self.total_length -= self.lengths.pop(job_id)
+            for token in set(tokenize(doc[0]) + tokenize(doc[1]) + tokenize(doc[2])):
+                postings = self.postings[token]
+                postings.pop(job_id, None)
+                if not postings:
+                    del self.postings[token]
+                    del self.terms[bisect.bisect_left(self.terms, token)]
+
+    def expand(self, prefix):
+        i = bisect.bisect_left(self.terms, prefix)
+        terms = []
+        while i < len(self.terms) and self.terms[i].startswith(prefix) and len(terms) < SEARCH_MAX_PREFIX_EXPANSIONS:
+            terms.append(self.terms[i])
+            i += 1
+        return terms
+
+    def score_token(self, token, candidates):
+        n = len(self.docs)
+        avgdl = self.total_length / n if n else 0.0
+        k1, b, lengths = self.K1, self.B, self.lengths
+        scores = {}
+        for term in self.expand(token):
+            postings = self.postings[term]
+            idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+            if candidates is not None and len(candidates) < len(postings):
+                items = ((job_id, postings[job_id]) for job_id in candidates if job_id in postings)
+            else:
+                items = postings.items()
+            for job_id, tf in items:
+                if candidates is not None and job_id not in candidates:
+                    continue
+                weight = idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * lengths[job_id] / avgdl))
+                scores[job_id] = scores.get(job_id, 0.0) + weight
+        return scores
+
+    def search(self, query, location=None, min_salary=None, max_salary=None, limit=20, offset=0):
+        with self.lock:
+            tokens = sorted(set(tokenize(query)), key=lambda t: sum(len(self.postings[x]) for x in self.expand(t)))
+            if tokens:
+                # Every query token has to match; start from the rarest so later tokens only touch survivors.
+                scores = None
+                for token in tokens:
+                    token_scores = self.score_token(token, scores)
+                    scores = token_scores if scores is None else {j: scores[j] + v for j, v in token_scores.items()}
+                    if not scores:
+                        break
+            else:
+                scores = dict.fromkeys(self.docs, 0.0)
+            location_key = location.lower() if location else None
+            location_counts, salary_counts, matched = {}, [0] * len(SEARCH_SALARY_BUCKETS), []
+            for job_id, score in scores.items():
+                job_title, specialization, job_location, salary, minimum_work_experience = self.docs[job_id]
+                salary_ok = (min_salary is None or salary >= min_salary) and (max_salary is None or salary <= max_salary)
+                location_ok = location_key is None or job_location.lower() == location_key
+                # Each facet is counted with every filter except its own applied.
+                if salary_ok:
+                    location_counts[job_location] = location_counts.get(job_location, 0) + 1
+                if location_ok:
+                    salary_counts[max(0, bisect.bisect_right(SEARCH_SALARY_BUCKETS, salary) - 1)] += 1
+                if salary_ok and location_ok:
+                    matched.append((score, -job_id))
+            top = heapq.nlargest(offset + limit, matched)[offset:]
+            results = []
+            for score, neg_id in top:
+                job_title, specialization, job_location, salary, minimum_work_experience = self.docs[-neg_id]
+                results.append({
+                    "id": -neg_id, "job_title": job_title, "specialization": specialization, "location": job_location,
+                    "salary": salary, "minimum_work_experience": minimum_work_experience, "score": round(score, 4)
+                })
+            bounds = SEARCH_SALARY_BUCKETS + [None]
+            return {
+                "total": len(matched),
+                "jobs": results,
+                "facets": {
+                    "location": dict(heapq.nlargest(SEARCH_FACET_LIMIT, location_counts.items(), key=lambda kv: kv[1])),
+                    "salary": [{"min": bounds[i], "max": bounds[i + 1], "count": c} for i, c in enumerate(salary_counts)]
+                }
+            }
+
+    def rebuild(self):
+        # Built off to the side and swapped in, so searches keep running against the old index meanwhile. Writes
+        # that land during the rebuild are logged from before the first read, so none of them is lost in the swap.
+        fresh = JobSearchIndex()
+        with self.lock:
+            self.pending = []
+        try:
+            conn = get_db_connection()
+            cursor = conn.cursor()
+            try:
+                load_jobs(cursor, fresh)
+            finally:
+                cursor.close()
+                conn.close()
+            with self.lock:
+                for method, args in self.pending:
+                    getattr(fresh, method)(*args)
+                self.docs, self.lengths, self.postings = fresh.docs, fresh.lengths, fresh.postings
+                self.terms, self.total_length = fresh.terms, fresh.total_length
+                self.built_at = time.monotonic()
+        finally:
+            with self.lock:
+                self.pending = None
+
+job_search_index = JobSearchIndex()
+job_search_rebuilding = threading.Lock()
+
+def fresh_index(index, rebuilding):
+    # Other workers' posts only reach this process's index through the periodic rebuild.
+    if not index.built_at:
+        with rebuilding:
+            if not index.built_at:
+                index.rebuild()
+    elif time.monotonic() - index.built_at > SEARCH_INDEX_MAX_AGE_SECONDS and rebuilding.acquire(blocking=False):
+        def refresh():
+            try:
+                index.rebuild()
+            except Exception as e:
+                app.logger.error(f"{type(index).__name__} rebuild failed: {str(e)}")
+            finally:
+                rebuilding.release()
+        threading.Thread(target=refresh, daemon=True).start()
+    return index
+
+def get_job_search_index():
+    return fresh_index(job_search_index, job_search_rebuilding)
+
+
+# ---------------- RECOMMENDATIONS ----------------
+def normalize_specialization(text):
+    return " ".join(MATCH_SYNONYMS.get(token, token) for token in tokenize(text or ""))
+
+def trigrams(text):
+    padded = f" {normalize_specialization(text)} "
+    return [padded[i:i + 3] for i in range(len(padded) - 2)]
+
+def specialization_matches(a, b):
+    # Who may apply is decided the way the listings and job alerts decide it, by SPEC_KEY (UPPER(SPECIALIZATION))
+    # equality; the trigram similarity only ranks recommendations.
+    return a.upper() == b.upper()
+
+def text_vector(text):
+    # Trigrams hashed into a fixed number of buckets and L2-normalised, so a dot product is a cosine.
+    import numpy as np
+    vector = np.zeros(MATCH_FEATURE_DIM, dtype=np.float32)
+    for gram in trigrams(text):
+        vector[zlib.crc32(gram.encode()) % MATCH_FEATURE_DIM] += 1.0
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+class JobMatchIndex:
+    # One row per job in preallocated numpy arrays: the specialization vector, minimum experience and a location
+    # id. A recommendation scores every row in a single vectorized pass; deleted rows are masked until compaction.
+    def __init__(self, capacity=1024):
+        import numpy as np
+        self.lock = threading.RLock()
+        self.vectors = np.zeros((capacity, MATCH_FEATURE_DIM), dtype=np.float32)
+        self.min_experience = np.zeros(capacity, dtype=np.int32)
+        self.locations = np.zeros(capacity, dtype=np.int32)
+        self.job_ids = np.zeros(capacity, dtype=np.int64)
+        self.alive = np.zeros(capacity, dtype=bool)
+        self.size = 0
+        self.dead = 0
+        self.rows = {}
+        self.docs = {}
+        self.location_ids = {}
+        self.built_at = 0.0
+        # Adds and removes made while a rebuild is reading JOBS, replayed onto the new index before it is swapped in.
+        self.pending = None
+
+    def grow(self, capacity):
+        import numpy as np
+        for name in ("vectors", "min_experience", "locations", "job_ids", "alive"):
+            old = getattr(self, name)
+            new = np.zeros((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:self.size] = old[:self.size]
+            setattr(self, name, new)
+
+    def compact(self):
+        keep = self.alive[:self.size].nonzero()[0]
+        for name in ("vectors", "min_experience", "locations", "job_ids", "alive"):
+            array = getattr(self, name)
+            array[:len(keep)] = array[keep]
+        self.alive[len(keep):self.size] = False
+        self.size, self.dead = len(keep), 0
+        self.rows = {int(job_id): row for row, job_id in enumerate(self.job_ids[:self.size])}
+
+    def add(self, job_id, job_title, specialization, location, salary, minimum_work_experience):
+        # Everything that can fail runs before a row is claimed, so a bad job never leaves a half-written row behind.
+        job_id, salary, minimum_work_experience = int(job_id), int(salary), int(minimum_work_experience)
+        location_key = location.strip().lower()
+        vector = text_vector(specialization)
+        with self.lock:
+            if self.pending is not None:
+                self.pending.append(("add", (job_id, job_title, specialization, location, salary, minimum_work_experience)))
+            if job_id in self.rows:
+                self.remove(job_id)
+            if self.size == len(self.alive):
+                self.grow(2 * len(self.alive))
+            row = self.size
+            self.size += 1
+            self.vectors[row] = vector
+            self.min_experience[row] = minimum_work_experience
+            self.locations[row] = self.location_ids.setdefault(location_key, len(self.location_ids))
+            self.job_ids[row] = job_id
+            self.alive[row] = True
+            self.rows[job_id] = row
+            self.docs[job_id] = (job_title, specialization, location, salary, minimum_work_experience)
+
+    def remove(self, job_id):
+        with self.lock:
+            if self.pending is not None:
+                self.pending.append(("remove", (job_id,)))
+            row = self.rows.pop(job_id, None)
+            if row is None:
+                return
+            del self.docs[job_id]
+            self.alive[row] = False
+            self.dead += 1
+            if self.dead > 1024 and self.dead * 2 > self.size:
+                self.compact()
+
+    def recommend(self, specialization, degree, work_experience, location=None, exclude=(), limit=20, offset=0):
+        import numpy as np
+        weights = MATCH_WEIGHTS
+        with self.lock:
+            n = self.size
+            vectors = self.vectors[:n]
+            spec_similarity = vectors @ text_vector(specialization)
+            # Whatever subject the degree names (e.g. "B.Tech Computer Science") is another hint at the field.
+            degree_similarity = vectors @ text_vector(degree) if degree else np.zeros(n, dtype=np.float32)
+            gap = work_experience - self.min_experience[:n]
+            eligible = self.alive[:n] & (gap >= 0) & (spec_similarity >= MATCH_MIN_SIMILARITY)
+            for job_id in exclude:
+                row = self.rows.get(job_id)
+                if row is not None:
+                    eligible[row] = False
+            # Jobs pitched at the candidate's level rank above ones they are far overqualified for.
+            scores = (weights["specialization"] * spec_similarity + weights["degree"] * degree_similarity
+                      + weights["experience"] * np.exp(-np.maximum(gap, 0) / MATCH_EXPERIENCE_SCALE))
+            location_id = self.location_ids.get(location.strip().lower()) if location else None
+            if location_id is not None:
+                scores += weights["location"] * (self.locations[:n] == location_id)
+            candidates = eligible.nonzero()[0]
+            k = min(offset + limit, len(candidates))
+            results = []
+            if k:
+                # Partition instead of a full sort; rows tied with the k-th score are all kept so pages stay stable.
+                candidate_scores = scores[candidates]
+                threshold = -np.partition(-candidate_scores, k - 1)[k - 1]
+                top = candidates[candidate_scores >= threshold]
+                top = top[np.lexsort((self.job_ids[top], -scores[top]))][offset:k]
+                for row in top:
+                    job_id = int(self.job_ids[row])
+                    job_title, job_specialization, job_location, salary, minimum_work_experience = self.docs[job_id]
+                    results.append({
+                        "id": job_id, "job_title": job_title, "specialization": job_specialization, "location": job_location,
+                        "salary": salary, "minimum_work_experience": minimum_work_experience,
+                        "score": round(float(scores[row]), 4), "can_apply": specialization_matches(job_specialization, specialization)
+                    })
+            return {"total": len(candidates), "jobs": results}
+
+    def rebuild(self):
+        # Same as JobSearchIndex.rebuild: writes made while JOBS is read are replayed before the swap.
+        fresh = JobMatchIndex()
+        with self.lock:
+            self.pending = []
+        try:
+            conn = get_db_connection()
+            cursor = conn.cursor()
+            try:
+                load_jobs(cursor, fresh)
+            finally:
+                cursor.close()
+                conn.close()
+            with self.lock:
+                for method, args in self.pending:
+                    getattr(fresh, method)(*args)
+                self.__dict__.update({k: v for k, v in fresh.__dict__.items() if k not in ("lock", "pending")})
+                self.built_at = time.monotonic()
+        finally:
+            with self.lock:
+                self.pending = None
+
+job_match_index = None
+job_match_rebuilding = threading.Lock()
+
+def get_job_match_index():
+    global job_match_index
+    if job_match_index is None:
+        with job_match_rebuilding:
+            if job_match_index is None:
+                job_match_index = JobMatchIndex()
+    return fresh_index(job_match_index, job_match_rebuilding)
+
+def index_jobs(jobs):
+    # Keeps this process's indexes in step with its own writes; rows are (id, title, specialization, location,
+    # salary, minimum experience). Indexes that were never built are left alone unless their first build is running,
+    # they load everything when first used.
+    # Called after the commit, so a failure is only logged: the job reaches the index with the next rebuild.
+    for index in (job_search_index, job_match_index):
+        if index is not None and (index.built_at or index.pending is not None):
+            try:
+                for job in jobs:
+                    index.add(*job)
+            except Exception as e:
+                app.logger.error(f"{type(index).__name__} update failed, jobs are picked up by the next rebuild: {str(e)}")
+
+def unindex_jobs(job_ids):
+    for index in (job_search_index, job_match_index):
+        if index is not None:
+            for job_id in job_ids:
+                index.remove(job_id)
+
+
+# ---------------- BACKGROUND JOBS ----------------
+class BackgroundJob:
+    # A periodic task on a thread of its own. GET_LOCK(name) is taken without waiting, so however many processes
+    # run the thread only one does the work at a time and the rest count the run as skipped. work(cursor, conn)
+    # returns counts that are added to the job's stats, and checks stop_event between batches.
+    def __init__(self, name, work, interval, counters, description, run_at_start=False):
+        self.name = name
+        self.label = name.replace("_", " ").capitalize()
+        self.work = work
+        self.interval = interval
+        self.run_at_start = run_at_start
+        self.stats = {"runs": 0, "errors": 0, "skipped": 0, "last_run_at": None, "last_duration_seconds": 0.0, **dict.fromkeys(counters, 0)}
+        self.stop_event = threading.Event()
+        self.wakeup = threading.Event()
+        self.thread = None
+        metrics_registry.append(Gauges(name, description, lambda: self.stats))
+
+    def run(self):
+        started = time.monotonic()
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute("SELECT GET_LOCK(%s, 0)", (self.name,))
+            if cursor.fetchone()[0] != 1:
+                self.stats["skipped"] += 1
+                return None
+            try:
+                counts = self.work(cursor, conn)
+            finally:
+                cursor.execute("SELECT RELEASE_LOCK(%s)", (self.name,))
+                cursor.fetchone()
+        except Exception:
+            self.stats["errors"] += 1
+            raise
+        finally:
+            cursor.close()
+            conn.close()
+        for key, value in counts.items():
+            self.stats[key] += value
+        self.stats["runs"] += 1
+        self.stats["last_run_at"] = datetime.datetime.now().isoformat()
+        self.stats["last_duration_seconds"] = round(time.monotonic() - started, 3)
+        if any(counts.values()):
+            app.logger.info(f"{self.label} run finished: {counts}")
+        return counts
+
+    def wake(self):
+        self.wakeup.set()
+
+    def loop(self):
+        if not self.run_at_start:
+            self.wakeup.wait(self.interval)
+            self.wakeup.clear()
+        while not self.stop_event.is_set():
+            try:
+                self.run()
+            except Exception as e:
+                app.logger.error(f"{self.label} error: {str(e)}")
+            self.wakeup.wait(self.interval)
+            self.wakeup.clear()
+
+    def start(self):
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self.loop, name=self.name.replace("_", "-"), daemon=True)
+        self.thread.start()
+
+    def stop(self, timeout=None):
+        self.stop_event.set()
+        self.wakeup.set()
+        if self.thread is not None:
+            self.thread.join(timeout)
+
+
+# ---------------- RESUME INDEX ----------------
+RESUME_PENDING, RESUME_INDEXED, RESUME_UNREADABLE = 0, 1, 2
+resume_index_pool = None
+resume_index_pool_lock = threading.Lock()
+
+def extract_resume_terms(path, max_pages=RESUME_INDEX_MAX_PAGES, max_terms=RESUME_INDEX_MAX_TERMS):
+    # Runs in a pool process: PDF parsing is CPU bound and would hold the GIL against the request threads.
+    from pypdf import PdfReader
+    counts = {}
+    for page in PdfReader(path).pages[:max_pages]:
+        for term in tokenize(page.extract_text() or ""):
+            if 1 < len(term) <= 64:
+                counts[term] = counts.get(term, 0) + 1
+    return dict(sorted(counts.items(), key=lambda item: (-item[1], item[0]))[:max_terms])
+
+def get_resume_index_pool():
+    # Spawned rather than forked: the parent has request, pool and worker threads whose locks a fork would copy.
+    global resume_index_pool
+    if resume_index_pool is None:
+        with resume_index_pool_lock:
+            if resume_index_pool is None:
+                resume_index_pool = ProcessPoolExecutor(RESUME_INDEX_PROCESSES, mp_context=multiprocessing.get_context("spawn"))
+    return resume_index_pool
+
+def close_resume_index_pool(terminate=False):
+    # terminate kills the pool's processes first: a parser stuck on a hostile PDF never returns on its own.
+    global resume_index_pool
+    with resume_index_pool_lock:
+        if resume_index_pool is not None:
+            if terminate:
+                for process in list((resume_index_pool._processes or {}).values()):
+                    process.terminate()
+            resume_index_pool.shutdown(wait=not terminate, cancel_futures=True)
+            resume_index_pool = None
+
+def parse_resumes(paths):
+    # paths maps application id -> resume path, or None when the file is gone; returns application id -> term
+    # counts, None where the resume could not be read. A parser that crashes or hangs takes the whole pool, and every
+    # resume still in it, down with it: the rest of the batch then goes through one resume at a time, so the next
+    # failure can only be the resume being parsed.
+    pool = get_resume_index_pool()
+    futures = {application_id: pool.submit(extract_resume_terms, path) for application_id, path in paths.items() if path}
+    results, one_at_a_time = {}, False
+    for application_id, path in paths.items():
+        results[application_id] = None
+        while path:
+            future = get_resume_index_pool().submit(extract_resume_terms, path) if one_at_a_time else futures[application_id]
+            try:
+                results[application_id] = future.result(timeout=RESUME_INDEX_TIMEOUT_SECONDS)
+            except (BrokenProcessPool, FutureTimeoutError):
+                close_resume_index_pool(terminate=True)
+                if not one_at_a_time:
+                    one_at_a_time = True
+                    continue
+                app.logger.warning(f"Resume of application {application_id} crashed or hung the parser")
+            except Exception as e:
+                app.logger.warning(f"Could not index resume of application {application_id}: {str(e)}")
+            break
+    return results
+
+def store_resume_terms(cursor, extracted):
+    # extracted maps application id -> (job id, term counts, or None when the file could not be parsed).
+    placeholders = ", ".join(["%s"] * len(extracted))
+    # Locks the applications against a concurrent delete; ones already gone are skipped.
+    cursor.execute(f"""
+        SELECT ID FROM JOB_APPLICATIONS 
+        WHERE ID IN ({placeholders}) 
+        FOR UPDATE
+    """, list(extracted))
+    live = {row[0] for row in cursor.fetchall()}
+    cursor.execute(f"""
+        DELETE FROM RESUME_TERMS 
+        WHERE APPLICATION_ID IN ({placeholders})
+    """, list(extracted))
+    postings, statuses = [], []
+    for application_id, (job_id, counts) in extracted.items():
+        if application_id not in live:
+            continue
+        if counts is None:
+            statuses.append((RESUME_UNREADABLE, 0, application_id))
+            continue
+        postings.extend((job_id, term, application_id, frequency) for term, frequency in counts.items())
+        statuses.append((RESUME_INDEXED, sum(counts.values()), application_id))
+    for chunk in chunked(postings, BULK_CHUNK_SIZE):
+        cursor.executemany("""
+            INSERT INTO RESUME_TERMS (JOB_ID, TERM, APPLICATION_ID, FREQUENCY) 
+            VALUES (%s, %s, %s, %s)
+        """, chunk)
+    if statuses:
+        cursor.executemany("""
+            UPDATE JOB_APPLICATIONS 
+            SET RESUME_INDEX_STATUS = %s, RESUME_TERM_COUNT = %s 
+            WHERE ID = %s
+        """, statuses)
+    return statuses
+
+def index_resumes(cursor, conn):
+    indexed = unreadable = 0
+    store = get_resume_store()
+    while not resume_indexer.stop_event.is_set():
+        # Applications still holding their resume in RESUME_DATA wait for `flask migrate-resumes`.
+        cursor.execute("""
+            SELECT ID, JOB_ID, RESUME_SHA256 FROM JOB_APPLICATIONS 
+            WHERE RESUME_INDEX_STATUS = %s AND RESUME_SHA256 IS NOT NULL 
+            ORDER BY ID 
+            LIMIT %s
+        """, (RESUME_PENDING, RESUME_INDEX_BATCH_SIZE))
+        rows = cursor.fetchall()
+        conn.commit()
+        if not rows:
+            break
+        counts = parse_resumes({application_id: store.path(resume_key) if store.exists(resume_key) else None
+                                for application_id, job_id, resume_key in rows})
+        extracted = {application_id: (job_id, counts[application_id]) for application_id, job_id, resume_key in rows}
+        statuses = store_resume_terms(cursor, extracted)
+        conn.commit()
+        failed = sum(1 for status, _, _ in statuses if status == RESUME_UNREADABLE)
+        indexed += len(statuses) - failed
+        unreadable += failed
+    return {"indexed": indexed, "unreadable": unreadable}
+
+def rank_applicants(postings, terms, documents, total_length):
+    # BM25 with the job's indexed resumes as the collection. Only applications whose resume holds every term qualify.
+    k1, b = JobSearchIndex.K1, JobSearchIndex.B
+    avgdl = total_length / documents if total_length else 1.0
+    frequencies, lengths = {}, {}
+    for application_id, term, frequency, length in postings:
+        frequencies.setdefault(term, {})[application_id] = frequency
+        lengths[application_id] = max(length, 1)
+    scores, matched = {}, {}
+    for term in terms:
+        term_postings = frequencies.get(term, {})
+        idf = math.log(1 + (documents - len(term_postings) + 0.5) / (len(term_postings) + 0.5))
+        for application_id, tf in term_postings.items():
+            weight = idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * lengths[application_id] / avgdl))
+            scores[application_id] = scores.get(application_id, 0.0) + weight
+            matched[application_id] = matched.get(application_id, 0) + 1
+    ranked = [(application_id, score) for application_id, score in scores.items() if matched[application_id] == len(terms)]
+    ranked.sort(key=lambda item: (-item[1], item[0]))
+    return ranked
+
+resume_indexer = BackgroundJob("resume_index", index_resumes, RESUME_INDEX_POLL_SECONDS, ["indexed", "unreadable"],
+                               "Resume text indexing totals.", run_at_start=True)
+
+def start_resume_indexer():
+    try:
+        import pypdf
+    except ImportError:
+        app.logger.warning("pypdf is not installed; resumes will not be indexed for applicant search.")
+        return
+    resume_indexer.start()
+
+def stop_resume_indexer(timeout=None):
+    resume_indexer.stop(timeout)
+    close_resume_index_pool()
+
+
+
+# ---------------- REAPER ----------------
+def reap_in_batches(cursor, conn, query, params):
+    # LIMIT keeps every statement, and the row locks it holds, small; the pause lets user traffic in between batches.
+    total = 0
+    while not reaper.stop_event.is_set():
+        cursor.execute(query, (*params, REAPER_BATCH_SIZE))
+        affected = cursor.rowcount
+        conn.commit()
+        total += affected
+        if affected < REAPER_BATCH_SIZE:
+            break
+        time.sleep(REAPER_BATCH_PAUSE_SECONDS)
+    return total
+
+def reap_stale_rows(cursor, conn):
+    now = datetime.datetime.now()
+    unverified_cutoff = now - datetime.timedelta(hours=REAPER_UNVERIFIED_HOURS)
+    notification_cutoff = now - datetime.timedelta(days=REAPER_NOTIFICATION_RETENTION_DAYS)
+    counts = {}
+    for table, role in (("JOBSEEKERS", "jobseekers"), ("EMPLOYERS", "employers")):
+        counts[f"deleted_unverified_{role}"] = reap_in_batches(cursor, conn, f"""
+            DELETE FROM {table} 
+            WHERE IS_VERIFIED = 0 AND CREATED_AT < %s 
+            LIMIT %s
+        """, (unverified_cutoff,))
+    counts["deleted_notifications"] = reap_in_batches(cursor, conn, """
+        DELETE FROM NOTIFICATIONS 
+        WHERE STATUS IN ('SENT', 'FAILED') AND NEXT_ATTEMPT_AT < %s 
+        LIMIT %s
+    """, (notification_cutoff,))
+    counts["deleted_resumes"] = delete_unreferenced_resumes(cursor, get_resume_store().keys(), time.time() - RESUME_SWEEP_GRACE_SECONDS)
+    return counts
+
+reaper = BackgroundJob("reaper", reap_stale_rows, REAPER_INTERVAL_SECONDS,
+                       ["deleted_unverified_jobseekers", "deleted_unverified_employers", "deleted_notifications", "deleted_resumes"],
+                       "Reaper totals.")
+
+
+# ---------------- JOB ALERTS ----------------
+def queue_job_alerts(cursor, job_ids):
+    # Part of the posting transaction, so every committed job is fanned out exactly once and a rolled back one never.
+    if JOB_ALERTS_ENABLED and job_ids:
+        cursor.executemany("""
+            INSERT INTO JOB_ALERTS (JOB_ID) 
+            VALUES (%s)
+        """, [(job_id,) for job_id in job_ids])
+
+def fan_out_job_alerts(cursor, conn):
+    # Walks the matching jobseekers of each queued job in ID order. Each page of recipients is committed together
+    # with the new checkpoint, so a restart continues where it stopped without skipping or repeating anyone.
+    matched = 0
+    while not job_alerts.stop_event.is_set():
+        cursor.execute("""
+            SELECT JA.JOB_ID, JA.LAST_JOBSEEKER_ID, J.SPEC_KEY, J.MINIMUM_WORK_EXPERIENCE 
+            FROM JOB_ALERTS JA INNER JOIN JOBS J ON J.ID = JA.JOB_ID 
+            ORDER BY JA.JOB_ID 
+            LIMIT 1
+        """)
+        alert = cursor.fetchone()
+        if alert is None:
+            break
+        job_id, last_id, spec_key, minimum_work_experience = alert
+        cursor.execute("""
+            SELECT ID FROM JOBSEEKERS 
+            WHERE SPEC_KEY = %s AND IS_VERIFIED = 1 AND ID > %s AND WORK_EXPERIENCE >= %s 
+            ORDER BY ID 
+            LIMIT %s
+        """, (spec_key, last_id, minimum_work_experience, JOB_ALERT_BATCH_SIZE))
+        jobseeker_ids = [row[0] for row in cursor.fetchall()]
+        if jobseeker_ids:
+            cursor.executemany("""
+                INSERT IGNORE INTO JOB_ALERT_RECIPIENTS (JOBSEEKER_ID, JOB_ID) 
+                VALUES (%s, %s)
+            """, [(jobseeker_id, job_id) for jobseeker_id in jobseeker_ids])
+        if len(jobseeker_ids) < JOB_ALERT_BATCH_SIZE:
+            cursor.execute("""
+                DELETE FROM JOB_ALERTS 
+                WHERE JOB_ID = %s
+            """, (job_id,))
+        else:
+            cursor.execute("""
+                UPDATE JOB_ALERTS 
+                SET LAST_JOBSEEKER_ID = %s 
+                WHERE JOB_ID = %s
+            """, (jobseeker_ids[-1], job_id))
+        conn.commit()
+        matched += len(jobseeker_ids)
+    return matched
+
+def format_job_digest(name, jobs):
+    lines = [f"Hello {name},", "", "New jobs matching your profile in JOB PORTAL SYSTEM:", ""]
+    for job_title, company_name, location, salary in jobs[:JOB_ALERT_MAX_JOBS_PER_DIGEST]:
+        lines.append(f"- {job_title} at {company_name}, {location} (salary {salary})")
+    if len(jobs) > JOB_ALERT_MAX_JOBS_PER_DIGEST:
+        lines.append(f"...and {len(jobs) - JOB_ALERT_MAX_JOBS_PER_DIGEST} more.")
+    lines += ["", "Log in to apply."]
+    return "\n".join(lines)
+
+def send_job_digests(cursor, conn):
+    # One email per jobseeker per run, however many jobs matched. Digests go through the notification outbox
+    # (and its pooled SMTP sessions) at no more than JOB_ALERT_EMAILS_PER_MINUTE, and each batch is scheduled
+    # seconds_per_email apart rather than all due at once, so a large fan-out cannot leave OTP messages queued behind it.
+    sent, last_id = 0, 0
+    seconds_per_email = 60.0 / JOB_ALERT_EMAILS_PER_MINUTE
+    while not job_alerts.stop_event.is_set():
+        started = time.monotonic()
+        cursor.execute("""
+            SELECT DISTINCT JOBSEEKER_ID FROM JOB_ALERT_RECIPIENTS 
+            WHERE JOBSEEKER_ID > %s 
+            ORDER BY JOBSEEKER_ID 
+            LIMIT %s
+        """, (last_id, JOB_ALERT_BATCH_SIZE))
+        jobseeker_ids = [row[0] for row in cursor.fetchall()]
+        if not jobseeker_ids:
+            break
+        placeholders = ", ".join(["%s"] * len(jobseeker_ids))
+        cursor.execute(f"""
+            SELECT R.JOBSEEKER_ID, JS.NAME, JS.EMAIL, J.JOB_TITLE, E.COMPANY_NAME, J.LOCATION, J.SALARY 
+            FROM JOB_ALERT_RECIPIENTS R 
+            INNER JOIN JOBSEEKERS JS ON JS.ID = R.JOBSEEKER_ID 
+            INNER JOIN JOBS J ON J.ID = R.JOB_ID 
+            INNER JOIN EMPLOYERS E ON E.ID = J.EMPLOYER_ID 
+            WHERE R.JOBSEEKER_ID IN ({placeholders}) AND JS.DELETED_AT IS NULL AND E.DELETED_AT IS NULL 
+            ORDER BY R.JOBSEEKER_ID, R.JOB_ID DESC
+        """, jobseeker_ids)
+        digests = {}
+        for jobseeker_id, name, email, job_title, company_name, location, salary in cursor.fetchall():
+            digest = digests.setdefault(jobseeker_id, (name, email, []))
+            digest[2].append((job_title, company_name, location, salary))
+        messages = [(email, "NEW JOBS FOR YOU IN JOB PORTAL SYSTEM", format_job_digest(name, jobs)) for name, email, jobs in digests.values()]
+        if messages:
+            enqueue_notifications(cursor, "email", messages, seconds_per_email)
+        cursor.execute(f"""
+            DELETE FROM JOB_ALERT_RECIPIENTS 
+            WHERE JOBSEEKER_ID IN ({placeholders})
+        """, jobseeker_ids)
+        conn.commit()
+        wake_notification_workers()
+        sent += len(messages)
+        last_id = jobseeker_ids[-1]
+        job_alerts.stop_event.wait(max(0.0, len(messages) * seconds_per_email - (time.monotonic() - started)))
+    return sent
+
+def process_job_alerts(cursor, conn):
+    counts = {"matched": fan_out_job_alerts(cursor, conn)}
+    counts["digests"] = send_job_digests(cursor, conn)
+    return counts
 
-OTP_EXPIRY_MINUTES = int(os.getenv("OTP_EXPIRY_MINUTES", 10))
-SESSION_EXPIRY_HOURS = int(os.getenv("SESSION_EXPIRY_HOURS", 2))
+job_alerts = BackgroundJob("job_alerts", process_job_alerts, JOB_ALERT_INTERVAL_SECONDS, ["matched", "digests"], "New-job alert totals.")
 
-# Twilio / Email
-TWILIO_SID, TWILIO_AUTH_TOKEN = os.getenv("TWILIO_SID"), os.getenv("TWILIO_AUTH_TOKEN")
-TWILIO_PHONE = os.getenv("TWILIO_PHONE")
-SMTP_SERVER, SMTP_PORT = os.getenv("SMTP_SERVER"), int(os.getenv("SMTP_PORT"))
-EMAIL_ADDRESS, EMAIL_PASSWORD = os.getenv("EMAIL_ADDRESS"), os.getenv("EMAIL_PASSWORD")
 
+# ---------------- APPLICANT COUNTS ----------------
+# Upper bounds of the experience brackets ("0-1", "2-4", "5-9", "10+"). Migration 011 backfilled with the same
+# ones; after changing them run `flask recount-applicants`.
+EXPERIENCE_BRACKETS = (2, 5, 10)
 
-# ---------------- HELPERS ----------------
-def send_sms(phone_number, message):
-    client = Client(TWILIO_SID, TWILIO_AUTH_TOKEN)
-    message = client.messages.create(
-        body=message,
-        from_=TWILIO_PHONE,
-        to=phone_number
-    )
+def experience_bracket(years):
+    lower = 0
+    for upper in EXPERIENCE_BRACKETS:
+        if years < upper:
+            return f"{lower}-{upper - 1}"
+        lower = upper
+    return f"{lower}+"
 
-def send_email(to_email, subject, message):
-    msg = MIMEText(message)
-    msg["Subject"] = subject
-    msg["From"] = EMAIL_ADDRESS
-    msg["To"] = to_email
-    with smtplib.SMTP(SMTP_SERVER, SMTP_PORT) as server:
-        server.starttls()
-        server.login(EMAIL_ADDRESS, EMAIL_PASSWORD)
-        server.send_message(msg)
+def degree_bucket(degree):
+    return (degree or "").strip().upper()[:100]
 
-def validate_json(required_fields):
-    if not request.is_json:
-        return None, (jsonify({"error": "Invalid JSON format!"}), 400)
-    data = request.get_json(silent=True)
-    if data is None:
-        return None, (jsonify({"error": "Malformed JSON!"}), 400)
-    for f in required_fields:
-        if f not in data:
-            return None, (jsonify({"error": f"Missing required field: {f}!"}), 400)
-    return data, None
+def count_applicants(cursor, job_ids, work_experience, highest_degree, delta):
+    # Called in the transaction that adds or removes the applications, so the counters commit or roll back with them.
+    for chunk in chunked(job_ids, BULK_CHUNK_SIZE):
+        cursor.execute(f"""
+            UPDATE JOBS 
+            SET APPLICANT_COUNT = APPLICANT_COUNT + %s 
+            WHERE ID IN ({", ".join(["%s"] * len(chunk))})
+        """, (delta, *chunk))
+    rows = []
+    for job_id in job_ids:
+        rows.append((job_id, "experience", experience_bracket(work_experience), delta))
+        rows.append((job_id, "degree", degree_bucket(highest_degree), delta))
+    for chunk in chunked(rows, BULK_CHUNK_SIZE):
+        cursor.executemany("""
+            INSERT INTO JOB_APPLICANT_SUMMARY (JOB_ID, DIMENSION, BUCKET, APPLICANTS) 
+            VALUES (%s, %s, %s, %s) 
+            ON DUPLICATE KEY UPDATE APPLICANTS = APPLICANTS + VALUES(APPLICANTS)
+        """, chunk)
 
-def generate_otp():
-    return str(random.randint(100000, 999999))
+def applicant_breakdown(rows):
+    summary = {"by_experience": {}, "by_degree": {}}
+    for dimension, bucket, applicants in rows:
+        if applicants > 0:
+            summary["by_" + dimension][bucket] = int(applicants)
+    return summary
 
-def get_server_connection():
-    return mysql.connector.connect(
-        host=db_config["host"],
-        user=db_config["user"],
-        password=db_config["password"]
-    )
 
-def get_db_connection():
-    return mysql.connector.connect(**db_config)
+# ---------------- ACCOUNT DELETION ----------------
+USER_TABLES = {"jobseeker": "JOBSEEKERS", "employer": "EMPLOYERS"}
 
-def init_db():
-    conn = get_server_connection()
-    cursor = conn.cursor()
-    cursor.execute(f"CREATE DATABASE IF NOT EXISTS {db_config['database']}")
-    cursor.close()
-    conn.close()
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    with open("schema.sql", "r") as f:
-        schema_sql = f.read()
-    for statement in schema_sql.split(";"):
-        stmt = statement.strip()
-        if stmt:
-            cursor.execute(stmt)
-    conn.commit()
-    cursor.close()
-    conn.close()
+def purge_in_batches(cursor, conn, deletion, counts, key, query, params):
+    # Like reap_in_batches, with the deletion's progress counter bumped in the same transaction as every batch.
+    # Returns False when stopped part way; the deletion stays RUNNING and carries on from there next time.
+    while not user_deletions.stop_event.is_set():
+        cursor.execute(query, (*params, USER_DELETE_BATCH_SIZE))
+        affected = cursor.rowcount
+        if key:
+            cursor.execute(f"""
+                UPDATE USER_DELETIONS 
+                SET {key.upper()}_DELETED = {key.upper()}_DELETED + %s 
+                WHERE ID = %s
+            """, (affected, deletion))
+            counts[key] += affected
+        conn.commit()
+        if affected < USER_DELETE_BATCH_SIZE:
+            return True
+        time.sleep(USER_DELETE_BATCH_PAUSE_SECONDS)
+    return False
 
-def token_required(f):
-    @wraps(f)
-    def decorated(*args, **kwargs):
-        token = None
-        if "Authorization" in request.headers:
-            try:
-                token = request.headers["Authorization"].split(" ")[1]
-            except:
-                return jsonify({"error": "Invalid token header!"}), 401
-        if not token:
-            return jsonify({"error": "Token is missing!"}), 401
+def purge_resumes(cursor, counts, keys):
+    # Files of the applications just deleted that nothing else refers to. One uploaded within the sweep's grace
+    # period is left for the reaper, as another application may be about to commit with it.
+    counts["resumes"] += delete_unreferenced_resumes(cursor, keys, time.time() - RESUME_SWEEP_GRACE_SECONDS)
+
+def purge_jobseeker(cursor, conn, deletion, jobseeker_id, counts):
+    cursor.execute("""
+        SELECT WORK_EXPERIENCE, HIGHEST_DEGREE FROM JOBSEEKERS 
+        WHERE ID = %s
+    """, (jobseeker_id,))
+    profile = cursor.fetchone()
+    if profile is None:
+        return True
+    while not user_deletions.stop_event.is_set():
+        cursor.execute("""
+            SELECT JA.ID, JA.JOB_ID, J.EMPLOYER_ID, JA.RESUME_SHA256 
+            FROM JOB_APPLICATIONS JA INNER JOIN JOBS J ON J.ID = JA.JOB_ID 
+            WHERE JA.JOBSEEKER_ID = %s 
+            ORDER BY JA.ID 
+            LIMIT %s
+        """, (jobseeker_id, USER_DELETE_BATCH_SIZE))
+        applications = cursor.fetchall()
+        if not applications:
+            cursor.execute("""
+                DELETE FROM JOBSEEKERS 
+                WHERE ID = %s
+            """, (jobseeker_id,))
+            conn.commit()
+            return True
+        conn.commit()
+        for application_id, _, _, _ in applications:
+            if not purge_in_batches(cursor, conn, deletion, counts, None, """
+                DELETE FROM RESUME_TERMS 
+                WHERE APPLICATION_ID = %s 
+                LIMIT %s
+            """, (application_id,)):
+                return False
+        # Locked, and re-read, so a job its employer deletes meanwhile is neither decremented nor left behind.
+        cursor.execute(f"""
+            SELECT JA.ID, JA.JOB_ID FROM JOB_APPLICATIONS JA 
+            WHERE JA.ID IN ({", ".join(["%s"] * len(applications))}) 
+            FOR UPDATE
+        """, [row[0] for row in applications])
+        live = cursor.fetchall()
+        count_applicants(cursor, [row[1] for row in live], profile[0], profile[1], -1)
+        if live:
+            cursor.execute(f"""
+                DELETE FROM JOB_APPLICATIONS 
+                WHERE ID IN ({", ".join(["%s"] * len(live))})
+            """, [row[0] for row in live])
+        cursor.execute("""
+            UPDATE USER_DELETIONS 
+            SET APPLICATIONS_DELETED = APPLICATIONS_DELETED + %s 
+            WHERE ID = %s
+        """, (len(live), deletion))
+        conn.commit()
+        counts["applications"] += len(live)
+        purge_resumes(cursor, counts, [row[3] for row in applications if row[3]])
+        invalidate_listings(*{f"applications:{row[1]}" for row in applications}, *{f"jobs:{row[2]}" for row in applications})
+        time.sleep(USER_DELETE_BATCH_PAUSE_SECONDS)
+    return False
+
+def purge_employer(cursor, conn, deletion, employer_id, counts):
+    while not user_deletions.stop_event.is_set():
+        cursor.execute("""
+            SELECT ID FROM JOBS 
+            WHERE EMPLOYER_ID = %s 
+            ORDER BY ID 
+            LIMIT %s
+        """, (employer_id, USER_DELETE_BATCH_SIZE))
+        job_ids = [row[0] for row in cursor.fetchall()]
+        conn.commit()
+        if not job_ids:
+            cursor.execute("""
+                DELETE FROM EMPLOYERS 
+                WHERE ID = %s
+            """, (employer_id,))
+            conn.commit()
+            return True
+        # Emptied job by job, so the final DELETE FROM JOBS cascades only into small per-job tables.
+        for job_id in job_ids:
+            cursor.execute("""
+                SELECT DISTINCT RESUME_SHA256 FROM JOB_APPLICATIONS 
+                WHERE JOB_ID = %s AND RESUME_SHA256 IS NOT NULL
+            """, (job_id,))
+            resume_keys = [row[0] for row in cursor.fetchall()]
+            conn.commit()
+            for key, query in ((None, """
+                DELETE FROM RESUME_TERMS 
+                WHERE JOB_ID = %s 
+                LIMIT %s
+            """), ("applications", """
+                DELETE FROM JOB_APPLICATIONS 
+                WHERE JOB_ID = %s 
+                LIMIT %s
+            """)):
+                if not purge_in_batches(cursor, conn, deletion, counts, key, query, (job_id,)):
+                    return False
+            purge_resumes(cursor, counts, resume_keys)
+        cursor.execute(f"""
+            DELETE FROM JOBS 
+            WHERE EMPLOYER_ID = %s AND ID IN ({", ".join(["%s"] * len(job_ids))})
+        """, (employer_id, *job_ids))
+        deleted = cursor.rowcount
+        cursor.execute("""
+            UPDATE USER_DELETIONS 
+            SET JOBS_DELETED = JOBS_DELETED + %s 
+            WHERE ID = %s
+        """, (deleted, deletion))
+        conn.commit()
+        counts["jobs"] += deleted
+        unindex_jobs(job_ids)
+        invalidate_listings(f"jobs:{employer_id}", *(f"applications:{job_id}" for job_id in job_ids))
+        time.sleep(USER_DELETE_BATCH_PAUSE_SECONDS)
+    return False
+
+def process_user_deletions(cursor, conn):
+    counts = {"users": 0, "applications": 0, "jobs": 0, "resumes": 0}
+    # Each queued deletion is tried once per run, oldest first, so one that keeps failing does not hold up the rest.
+    last_id = 0
+    while not user_deletions.stop_event.is_set():
+        cursor.execute("""
+            SELECT ID, USER_TYPE, USER_ID FROM USER_DELETIONS 
+            WHERE STATUS IN ('PENDING', 'RUNNING') AND ID > %s 
+            ORDER BY ID 
+            LIMIT 1
+        """, (last_id,))
+        deletion = cursor.fetchone()
+        if deletion is None:
+            break
+        last_id, user_type, user_id = deletion
+        cursor.execute("""
+            UPDATE USER_DELETIONS 
+            SET STATUS = 'RUNNING' 
+            WHERE ID = %s
+        """, (last_id,))
+        conn.commit()
+        purge = purge_jobseeker if user_type == "jobseeker" else purge_employer
         try:
-            data = jwt.decode(token, app.config["SECRET_KEY"], algorithms=["HS256"])
-            current_user = data["user"]
-            role = data["role"]
-        except jwt.ExpiredSignatureError:
-            return jsonify({"error": "Access denied!"}), 401
-        except Exception:
-            return jsonify({"error": "Access denied!"}), 401
-        return f(current_user, role, *args, **kwargs)
-    return decorated
+            finished = purge(cursor, conn, last_id, user_id, counts)
+        except Error as e:
+            conn.rollback()
+            # Counted as an error but not raised: the run goes on with the next deletion.
+            user_deletions.stats["errors"] += 1
+            app.logger.error(f"User deletion {last_id} failed: {str(e)}")
+            cursor.execute("""
+                UPDATE USER_DELETIONS 
+                SET LAST_ERROR = %s 
+                WHERE ID = %s
+            """, (str(e)[:255], last_id))
+            conn.commit()
+            continue
+        if finished:
+            cursor.execute("""
+                UPDATE USER_DELETIONS 
+                SET STATUS = 'DONE', LAST_ERROR = NULL, FINISHED_AT = NOW() 
+                WHERE ID = %s
+            """, (last_id,))
+            conn.commit()
+            counts["users"] += 1
+    return counts
+
+user_deletions = BackgroundJob("user_deletions", process_user_deletions, USER_DELETE_POLL_SECONDS, ["users", "applications", "jobs", "resumes"],
+                               "Background account deletion totals.", run_at_start=True)
 
 
 # ---------------- ROUTES ----------------
 @app.route('/register_jobseeker_unverified', methods=['POST'])
+@rate_limited
 def register_jobseeker_unverified():
     data, error = validate_json(["phone_number", "name", "email", "dob", "highest_degree", "specialization", "work_experience"])
     if error: return error
     phone_otp = generate_otp()
     email_otp = generate_otp()
-    expiry_time = datetime.datetime.now() + datetime.timedelta(minutes=OTP_EXPIRY_MINUTES)
     try:
         conn = get_db_connection()
         cursor = conn.cursor()
@@ -142,26 +2820,27 @@ def register_jobseeker_unverified():
             return jsonify({"error": "Jobseeker already exists!"}), 400
         cursor.execute("""
             INSERT INTO JOBSEEKERS 
-            (PHONE_NUMBER, NAME, EMAIL, DOB, HIGHEST_DEGREE, SPECIALIZATION, WORK_EXPERIENCE, PHONE_OTP, PHONE_OTP_EXPIRY, EMAIL_OTP, EMAIL_OTP_EXPIRY, IS_VERIFIED) 
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-        """, (data["phone_number"], data["name"], data["email"], data["dob"], data["highest_degree"], data["specialization"], data["work_experience"], phone_otp, expiry_time, email_otp, expiry_time, 0))
-        send_sms("+91" + data["phone_number"], "The OTP to verify your phone number for your registration in JOB PORTAL SYSTEM is " + phone_otp + ".")
-        send_email(data["email"], "VERIFY YOUR REGISTRATION IN JOB PORTAL SYSTEM", "The OTP to verify your email id for your registration in JOB PORTAL SYSTEM is " + email_otp + ".")
+            (PHONE_NUMBER, NAME, EMAIL, DOB, HIGHEST_DEGREE, SPECIALIZATION, WORK_EXPERIENCE, IS_VERIFIED) 
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+        """, (data["phone_number"], data["name"], data["email"], data["dob"], data["highest_degree"], data["specialization"], data["work_experience"], 0))
+        get_otp_store().put(registration_otp_key("jobseeker", data["phone_number"]), registration_otp_value(phone_otp, email_otp, data["email"]), OTP_EXPIRY_MINUTES * 60)
+        enqueue_notification(cursor, "sms", "+91" + data["phone_number"], "The OTP to verify your phone number for your registration in JOB PORTAL SYSTEM is " + phone_otp + ".")
+        enqueue_notification(cursor, "email", data["email"], "The OTP to verify your email id for your registration in JOB PORTAL SYSTEM is " + email_otp + ".", "VERIFY YOUR REGISTRATION IN JOB PORTAL SYSTEM")
         conn.commit()
+        wake_notification_workers()
         return jsonify({"message": f"OTPs sent successfully. They are valid for {OTP_EXPIRY_MINUTES} minutes!"}), 200
     except IntegrityError:
+        record_error()
         if 'conn' in locals() and conn:
             conn.rollback()
         return jsonify({"error": "Phone number or email already exists!"}), 409
-    except (smtplib.SMTPException, TwilioRestException) as e:
-        if 'conn' in locals() and conn:
-            conn.rollback()
-        return jsonify({"error": f"SMS/Email service error: {str(e)}"}), 502
     except Error as e:
+        record_error()
         if 'conn' in locals() and conn:
             conn.rollback()
         return jsonify({"error": f"Database/server error: {str(e)}"}), 500
     except Exception as e:
+        record_error()
         if 'conn' in locals() and conn:
             conn.rollback()
         return jsonify({"error": f"Unexpected error: {str(e)}"}), 500
@@ -172,12 +2851,12 @@ def register_jobseeker_unverified():
             conn.close()
 
 @app.route('/register_employer_unverified', methods=['POST'])
+@rate_limited
 def register_employer_unverified():
     data, error = validate_json(["phone_number", "name", "email", "company_name"])
     if error: return error
     phone_otp = generate_otp()
     email_otp = generate_otp()
-    expiry_time = datetime.datetime.now() + datetime.timedelta(minutes=OTP_EXPIRY_MINUTES)
     try:
         conn = get_db_connection()
         cursor = conn.cursor()
@@ -194,26 +2873,27 @@ def register_employer_unverified():
             return jsonify({"error": "Employer already exists!"}), 400
         cursor.execute("""
             INSERT INTO EMPLOYERS 
-            (PHONE_NUMBER, NAME, EMAIL, COMPANY_NAME, PHONE_OTP, PHONE_OTP_EXPIRY, EMAIL_OTP, EMAIL_OTP_EXPIRY, IS_VERIFIED) 
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-        """, (data["phone_number"], data["name"], data["email"], data["company_name"], phone_otp, expiry_time, email_otp, expiry_time, 0))
-        send_sms("+91" + data["phone_number"], "The OTP to verify your phone number for your registration in JOB PORTAL SYSTEM is " + phone_otp + ".")
-        send_email(data["email"], "VERIFY YOUR REGISTRATION IN JOB PORTAL SYSTEM", "The OTP to verify your email id for your registration in JOB PORTAL SYSTEM is " + email_otp + ".")
+            (PHONE_NUMBER, NAME, EMAIL, COMPANY_NAME, IS_VERIFIED) 
+            VALUES (%s, %s, %s, %s, %s)
+        """, (data["phone_number"], data["name"], data["email"], data["company_name"], 0))
+        get_otp_store().put(registration_otp_key("employer", data["phone_number"]), registration_otp_value(phone_otp, email_otp, data["email"]), OTP_EXPIRY_MINUTES * 60)
+        enqueue_notification(cursor, "sms", "+91" + data["phone_number"], "The OTP to verify your phone number for your registration in JOB PORTAL SYSTEM is " + phone_otp + ".")
+        enqueue_notification(cursor, "email", data["email"], "The OTP to verify your email id for your registration in JOB PORTAL SYSTEM is " + email_otp + ".", "VERIFY YOUR REGISTRATION IN JOB PORTAL SYSTEM")
         conn.commit()
+        wake_notification_workers()
         return jsonify({"message": f"OTPs sent successfully. They are valid for {OTP_EXPIRY_MINUTES} minutes!"}), 200
     except IntegrityError:
+        record_error()
         if 'conn' in locals() and conn:
             conn.rollback()
         return jsonify({"error": "Phone number or email already exists!"}), 409
-    except (smtplib.SMTPException, TwilioRestException) as e:
-        if 'conn' in locals() and conn:
-            conn.rollback()
-        return jsonify({"error": f"SMS/Email service error: {str(e)}"}), 502
     except Error as e:
+        record_error()
         if 'conn' in locals() and conn:
             conn.rollback()
         return jsonify({"error": f"Database/server error: {str(e)}"}), 500
     except Exception as e:
+        record_error()
         if 'conn' in locals() and conn:
             conn.rollback()
         return jsonify({"error": f"Unexpected error: {str(e)}"}), 500
@@ -231,36 +2911,36 @@ def register_jobseeker_verified():
         conn = get_db_connection()
         cursor = conn.cursor()
         cursor.execute("""
-            SELECT PHONE_OTP, PHONE_OTP_EXPIRY, EMAIL_OTP, EMAIL_OTP_EXPIRY, IS_VERIFIED FROM JOBSEEKERS 
+            SELECT IS_VERIFIED FROM JOBSEEKERS 
             WHERE PHONE_NUMBER = %s AND EMAIL = %s
         """, (data["phone_number"], data["email"]))
         result = cursor.fetchone()
         if not result:
             return jsonify({"error": "Jobseeker not found!"}), 404
-        stored_phone_otp, phone_expiry, stored_email_otp, email_expiry, is_verified = result
-        now = datetime.datetime.now()
-        if is_verified == 1:
+        if result[0] == 1:
             return jsonify({"error": "Jobseeker is already verified!"}), 400
-        if stored_phone_otp != data["phone_otp"] or now > phone_expiry or stored_email_otp != data["email_otp"] or now > email_expiry:
+        status = get_otp_store().verify(registration_otp_key("jobseeker", data["phone_number"]), registration_otp_value(data["phone_otp"], data["email_otp"], data["email"]))
+        if status == OTP_LOCKED:
+            return jsonify({"error": "Too many invalid attempts. Please register again!"}), 429
+        if status != OTP_OK:
             return jsonify({"error": "One or both OTPs are invalid or expired!"}), 400
         cursor.execute("""
             UPDATE JOBSEEKERS 
-            SET PHONE_OTP = NULL, PHONE_OTP_EXPIRY = NULL, EMAIL_OTP = NULL, EMAIL_OTP_EXPIRY = NULL, IS_VERIFIED= 1 
+            SET IS_VERIFIED = 1 
             WHERE PHONE_NUMBER = %s AND EMAIL = %s
         """, (data["phone_number"], data["email"]))
+        enqueue_notification(cursor, "sms", "+91" + data["phone_number"], "You have successfully registered in JOB PORTAL SYSTEM.")
+        enqueue_notification(cursor, "email", data["email"], "You have successfully registered in JOB PORTAL SYSTEM.", "REGISTRATION SUCCESSFUL")
         conn.commit()
-        send_sms("+91" + data["phone_number"], "You have successfully registered in JOB PORTAL SYSTEM.")
-        send_email(data["email"], "REGISTRATION SUCCESSFUL", "You have successfully registered in JOB PORTAL SYSTEM.")
+        wake_notification_workers()
         return jsonify({"message": "Registration successful!"}), 200
-    except (smtplib.SMTPException, TwilioRestException) as e:
-        if 'conn' in locals() and conn:
-            conn.rollback()
-        return jsonify({"error": f"SMS/Email service error: {str(e)}"}), 502
     except Error as e:
+        record_error()
         if 'conn' in locals() and conn:
             conn.rollback()
         return jsonify({"error": f"Database/server error: {str(e)}"}), 500
     except Exception as e:
+        record_error()
         if 'conn' in locals() and conn:
             conn.rollback()
         return jsonify({"error": f"Unexpected error: {str(e)}"}), 500
@@ -278,36 +2958,36 @@ def register_employer_verified():
         conn = get_db_connection()
         cursor = conn.cursor()
         cursor.execute("""
-            SELECT PHONE_OTP, PHONE_OTP_EXPIRY, EMAIL_OTP, EMAIL_OTP_EXPIRY, IS_VERIFIED FROM EMPLOYERS 
+            SELECT IS_VERIFIED FROM EMPLOYERS 
             WHERE PHONE_NUMBER = %s AND EMAIL = %s
         """, (data["phone_number"], data["email"]))
         result = cursor.fetchone()
         if not result:
             return jsonify({"error": "Employer not found!"}), 404
-        stored_phone_otp, phone_expiry, stored_email_otp, email_expiry, is_verified = result
-        now = datetime.datetime.now()
-        if is_verified == 1:
+        if result[0] == 1:
             return jsonify({"error": "Employer is already verified!"}), 400
-        if stored_phone_otp != data["phone_otp"] or now > phone_expiry or stored_email_otp != data["email_otp"] or now > email_expiry:
+        status = get_otp_store().verify(registration_otp_key("employer", data["phone_number"]), registration_otp_value(data["phone_otp"], data["email_otp"], data["email"]))
+        if status == OTP_LOCKED:
+            return jsonify({"error": "Too many invalid attempts. Please register again!"}), 429
+        if status != OTP_OK:
             return jsonify({"error": "One or both OTPs are invalid or expired!"}), 400
         cursor.execute("""
             UPDATE EMPLOYERS 
-            SET PHONE_OTP = NULL, PHONE_OTP_EXPIRY = NULL, EMAIL_OTP = NULL, EMAIL_OTP_EXPIRY = NULL, IS_VERIFIED= 1 
+            SET IS_VERIFIED = 1 
             WHERE PHONE_NUMBER = %s AND EMAIL = %s
         """, (data["phone_number"], data["email"]))
+        enqueue_notification(cursor, "sms", "+91" + data["phone_number"], "You have successfully registered in JOB PORTAL SYSTEM.")
+        enqueue_notification(cursor, "email", data["email"], "You have successfully registered in JOB PORTAL SYSTEM.", "REGISTRATION SUCCESSFUL")
         conn.commit()
-        send_sms("+91" + data["phone_number"], "You have successfully registered in JOB PORTAL SYSTEM.")
-        send_email(data["email"], "REGISTRATION SUCCESSFUL", "You have successfully registered in JOB PORTAL SYSTEM.")
+        wake_notification_workers()
         return jsonify({"message": "Registration successful!"}), 200
-    except (smtplib.SMTPException, TwilioRestException) as e:
-        if 'conn' in locals() and conn:
-            conn.rollback()
-        return jsonify({"error": f"SMS/Email service error: {str(e)}"}), 502
     except Error as e:
+        record_error()
         if 'conn' in locals() and conn:
             conn.rollback()
         return jsonify({"error": f"Database/server error: {str(e)}"}), 500
     except Exception as e:
+        record_error()
         if 'conn' in locals() and conn:
             conn.rollback()
         return jsonify({"error": f"Unexpected error: {str(e)}"}), 500
@@ -318,23 +2998,23 @@ def register_employer_verified():
             conn.close()
 
 @app.route('/login_unverified', methods=['PUT'])
+@rate_limited
 def login_unverified():
     data, error = validate_json(["phone_number", "role"])
     if error: return error 
     phone_otp = generate_otp()
-    expiry_time = datetime.datetime.now() + datetime.timedelta(minutes=OTP_EXPIRY_MINUTES)
     try:
         conn = get_db_connection()
         cursor = conn.cursor()
         if data["role"] == "jobseeker":
             cursor.execute("""
                 SELECT IS_VERIFIED FROM JOBSEEKERS 
-                WHERE PHONE_NUMBER = %s
+                WHERE PHONE_NUMBER = %s AND DELETED_AT IS NULL
             """, (data["phone_number"],))
         elif data["role"] == "employer":
             cursor.execute("""
                 SELECT IS_VERIFIED FROM EMPLOYERS 
-                WHERE PHONE_NUMBER = %cs
+                WHERE PHONE_NUMBER = %s AND DELETED_AT IS NULL
             """, (data["phone_number"],))
         else:
             return jsonify({"error": "Invalid role!"}), 400
@@ -343,30 +3023,18 @@ def login_unverified():
             return jsonify({"error": "User not found!"}), 404
         if result[0] != 1:
             return jsonify({"error": "User not verified yet!"}), 401
-        if data["role"] == "jobseeker":
-            cursor.execute("""
-                UPDATE JOBSEEKERS 
-                SET PHONE_OTP = %s, PHONE_OTP_EXPIRY = %s 
-                WHERE PHONE_NUMBER = %s
-            """, (phone_otp, expiry_time, data["phone_number"]))
-        else:
-            cursor.execute("""
-                UPDATE EMPLOYERS 
-                SET PHONE_OTP = %s, PHONE_OTP_EXPIRY = %s 
-                WHERE PHONE_NUMBER = %s
-            """, (phone_otp, expiry_time, data["phone_number"]))
-        send_sms("+91" + data["phone_number"], "The OTP to log into JOB PORTAL SYSTEM is " + phone_otp + ".")
+        get_otp_store().put(login_otp_key(data["role"], data["phone_number"]), phone_otp, OTP_EXPIRY_MINUTES * 60)
+        enqueue_notification(cursor, "sms", "+91" + data["phone_number"], "The OTP to log into JOB PORTAL SYSTEM is " + phone_otp + ".")
         conn.commit()
+        wake_notification_workers()
         return jsonify({"message": f"OTP sent successfully. It is valid for {OTP_EXPIRY_MINUTES} minutes!"}), 200
-    except (smtplib.SMTPException, TwilioRestException) as e:
-        if 'conn' in locals() and conn:
-            conn.rollback()
-        return jsonify({"error": f"SMS/Email service error: {str(e)}"}), 502
     except Error as e:
+        record_error()
         if 'conn' in locals() and conn:
             conn.rollback()
         return jsonify({"error": f"Database/server error: {str(e)}"}), 500
     except Exception as e:
+        record_error()
         if 'conn' in locals() and conn:
             conn.rollback()
         return jsonify({"error": f"Unexpected error: {str(e)}"}), 500
@@ -385,54 +3053,39 @@ def login_verified():
         cursor = conn.cursor()
         if data["role"] == "jobseeker":
             cursor.execute("""
-                SELECT PHONE_OTP, PHONE_OTP_EXPIRY, IS_VERIFIED FROM JOBSEEKERS
-                WHERE PHONE_NUMBER = %s
+                SELECT IS_VERIFIED, ID, SPECIALIZATION, WORK_EXPERIENCE FROM JOBSEEKERS
+                WHERE PHONE_NUMBER = %s AND DELETED_AT IS NULL
             """, (data["phone_number"],))
         elif data["role"] == "employer":
             cursor.execute("""
-                SELECT PHONE_OTP, PHONE_OTP_EXPIRY, IS_VERIFIED FROM EMPLOYERS 
-                WHERE PHONE_NUMBER = %s
+                SELECT IS_VERIFIED, ID FROM EMPLOYERS 
+                WHERE PHONE_NUMBER = %s AND DELETED_AT IS NULL
             """, (data["phone_number"],))
         else:
             return jsonify({"error": "Invalid role!"}), 400
         result = cursor.fetchone()
         if not result:
             return jsonify({"error": "User not found!"}), 404
-        if not result[0] or not result[1]:
-            return jsonify({"error": "Invalid role!"}), 404
-        stored_phone_otp, phone_expiry, is_verified = result
-        if is_verified != 1:
+        if result[0] != 1:
             return jsonify({"error": "User not verified yet!"}), 401
-        if stored_phone_otp != data["phone_otp"] or datetime.datetime.now() > phone_expiry:
+        status = get_otp_store().verify(login_otp_key(data["role"], data["phone_number"]), data["phone_otp"])
+        if status == OTP_LOCKED:
+            return jsonify({"error": "Too many invalid attempts. Please request a new OTP!"}), 429
+        if status != OTP_OK:
             return jsonify({"error": "OTP is either invalid or expired!"}), 401
-        token = jwt.encode(
-            {
-                "user": data["phone_number"],
-                "role": data["role"],
-                "exp": datetime.datetime.utcnow() + datetime.timedelta(hours=SESSION_EXPIRY_HOURS)
-            },
-            app.config["SECRET_KEY"],
-            algorithm="HS256"
-        )
+        # Routes trust these claims instead of looking the user up again; delete_user revokes them.
+        claims = {"user": data["phone_number"], "role": data["role"], "id": result[1]}
         if data["role"] == "jobseeker":
-            cursor.execute("""
-                UPDATE JOBSEEKERS 
-                SET PHONE_OTP = NULL, PHONE_OTP_EXPIRY = NULL 
-                WHERE PHONE_NUMBER = %s
-            """, (data["phone_number"],))
-        else:
-            cursor.execute("""
-                UPDATE EMPLOYERS 
-                SET PHONE_OTP = NULL, PHONE_OTP_EXPIRY = NULL 
-                WHERE PHONE_NUMBER = %s
-            """, (data["phone_number"],))
-        conn.commit()
+            claims["specialization"], claims["work_experience"] = result[2], result[3]
+        token = generate_token(claims)
         return jsonify({"message": "Login successful!", "token": token}), 200
     except Error as e:
+        record_error()
         if 'conn' in locals() and conn:
             conn.rollback()
         return jsonify({"error": f"Database/server error: {str(e)}"}), 500
     except Exception as e:
+        record_error()
         if 'conn' in locals() and conn:
             conn.rollback()
         return jsonify({"error": f"Unexpected error: {str(e)}"}), 500
@@ -447,34 +3100,38 @@ def login_verified():
 def post_jobs(current_user, role):
     data, error = validate_json(["job_title", "specialization", "minimum_work_experience", "location", "salary"])
     if error: return error
+    try:
+        minimum_work_experience, salary = int(data["minimum_work_experience"]), int(data["salary"])
+    except (TypeError, ValueError):
+        return jsonify({"error": "Work experience and salary must be integers!"}), 400
     try:
         conn = get_db_connection()
         cursor = conn.cursor()
         if role != "employer":
             return jsonify({"error": "Access denied!"}), 401
-        cursor.execute("""
-            SELECT ID FROM EMPLOYERS 
-            WHERE PHONE_NUMBER = %s
-        """, (current_user,))
-        result = cursor.fetchone()
-        if not result:
-            return jsonify({"error": "User not found!"}), 404
         cursor.execute("""
             INSERT INTO JOBS 
             (JOB_TITLE, SPECIALIZATION, MINIMUM_WORK_EXPERIENCE, LOCATION, SALARY, EMPLOYER_ID) 
             VALUES (%s, %s, %s, %s, %s, %s)
-        """, (data["job_title"], data["specialization"], data["minimum_work_experience"], data["location"], data["salary"], result[0]))
+        """, (data["job_title"], data["specialization"], minimum_work_experience, data["location"], salary, current_user["id"]))
+        job_id = cursor.lastrowid
+        queue_job_alerts(cursor, [job_id])
         conn.commit()
+        invalidate_listings(f"jobs:{current_user['id']}")
+        index_jobs([(job_id, data["job_title"], data["specialization"], data["location"], salary, minimum_work_experience)])
         return jsonify({"message": "Job posted successfully!"}), 201
     except IntegrityError:
+        record_error()
         if 'conn' in locals() and conn:
             conn.rollback()
         return jsonify({"error": "Duplicate job already exists!"}), 409
     except Error as e:
+        record_error()
         if 'conn' in locals() and conn:
             conn.rollback()
         return jsonify({"error": f"Database/server error: {str(e)}"}), 500
     except Exception as e:
+        record_error()
         if 'conn' in locals() and conn:
             conn.rollback()
         return jsonify({"error": f"Unexpected error: {str(e)}"}), 500
@@ -488,26 +3145,25 @@ def post_jobs(current_user, role):
 @token_required
 def view_posted_jobs(current_user, role):
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
         if role != "employer":
             return jsonify({"error": "Access denied!"}), 401
+        key = f"jobs:{current_user['id']}"
+        entry, token = cached_listing(key)
+        if entry is not None:
+            return listing_response(entry)
+        conn = get_db_connection()
+        cursor = conn.cursor()
         cursor.execute("""
-            SELECT ID FROM EMPLOYERS WHERE 
-            PHONE_NUMBER = %s
-        """, (current_user,))
-        result = cursor.fetchone()
-        if not result:
-            return jsonify({"error": "User not found!"}), 404
-        cursor.execute("""
-            SELECT JOB_TITLE, SPECIALIZATION, MINIMUM_WORK_EXPERIENCE, LOCATION, SALARY, EMPLOYER_ID FROM JOBS 
+            SELECT JOB_TITLE, SPECIALIZATION, MINIMUM_WORK_EXPERIENCE, LOCATION, SALARY, EMPLOYER_ID, APPLICANT_COUNT FROM JOBS 
             WHERE EMPLOYER_ID = %s 
-        """, (result[0],))
+        """, (current_user["id"],))
         result = cursor.fetchall()
-        return jsonify({"jobs": result}), 200
+        return store_listing(key, token, {"jobs": result})
     except Error as e:
+        record_error()
         return jsonify({"error": f"Database/server error: {str(e)}"}), 500
     except Exception as e:
+        record_error()
         return jsonify({"error": f"Unexpected error: {str(e)}"}), 500
     finally:
         if 'cursor' in locals() and cursor:
@@ -525,14 +3181,7 @@ def delete_job(current_user, role):
         cursor = conn.cursor()
         if role != "employer":
             return jsonify({"error": "Access denied!"}), 401
-        cursor.execute("""
-            SELECT ID FROM EMPLOYERS 
-            WHERE PHONE_NUMBER = %s
-        """, (current_user,))
-        result = cursor.fetchone()
-        if not result:
-            return jsonify({"error": "User not found!"}), 404
-        employer_id = result[0]
+        employer_id = current_user["id"]
         cursor.execute("""
             SELECT EMPLOYER_ID FROM JOBS 
             WHERE ID = %s 
@@ -547,12 +3196,180 @@ def delete_job(current_user, role):
             WHERE ID = %s 
         """, (data["job_id"],))
         conn.commit()
+        unindex_jobs([int(data["job_id"])])
+        invalidate_listings(f"jobs:{employer_id}", f"applications:{int(data['job_id'])}")
         return jsonify({"message": "Job post deleted successfully!"}), 200
     except Error as e:
+        record_error()
+        if 'conn' in locals() and conn:
+            conn.rollback()
+        return jsonify({"error": f"Database/server error: {str(e)}"}), 500
+    except Exception as e:
+        record_error()
+        if 'conn' in locals() and conn:
+            conn.rollback()
+        return jsonify({"error": f"Unexpected error: {str(e)}"}), 500
+    finally:
+        if 'cursor' in locals() and cursor:
+            cursor.close()
+        if 'conn' in locals() and conn:
+            conn.close()
+
+JOB_FIELDS = ["job_title", "specialization", "minimum_work_experience", "location", "salary"]
+
+def collation_key(text):
+    # Approximates utf8mb4_0900_ai_ci: compatibility forms folded, accents stripped, case folded.
+    text = unicodedata.normalize("NFKD", str(text))
+    return "".join(ch for ch in text if not unicodedata.combining(ch)).casefold()
+
+def job_key(job_title, specialization, minimum_work_experience, location, salary):
+    # Mirrors the JOBS unique key under MySQL's accent- and case-insensitive collation.
+    return (collation_key(job_title), collation_key(specialization), int(minimum_work_experience), collation_key(location), int(salary))
+
+@app.route("/post_jobs_bulk", methods=["POST"])
+@token_required
+def post_jobs_bulk(current_user, role):
+    if role != "employer":
+        return jsonify({"error": "Access denied!"}), 401
+    rows, error = validate_bulk_rows()
+    if error: return error
+    results = [None] * len(rows)
+    pending = {}
+    for index, row in enumerate(rows):
+        if not isinstance(row, dict) or any(f not in row for f in JOB_FIELDS):
+            results[index] = {"index": index, "status": "invalid", "error": "Missing required field!"}
+            continue
+        try:
+            key = job_key(*(row[f] for f in JOB_FIELDS))
+        except (TypeError, ValueError):
+            results[index] = {"index": index, "status": "invalid", "error": "Work experience and salary must be integers!"}
+            continue
+        if key in pending:
+            results[index] = {"index": index, "status": "duplicate"}
+            continue
+        pending[key] = index
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        employer_id = current_user["id"]
+        # Looked up as sent; the column's collation does the matching and job_key pairs the rows back up.
+        titles = list({rows[index]["job_title"] for index in pending.values()})
+        for chunk in chunked(titles, BULK_CHUNK_SIZE):
+            cursor.execute(f"""
+                SELECT JOB_TITLE, SPECIALIZATION, MINIMUM_WORK_EXPERIENCE, LOCATION, SALARY FROM JOBS 
+                WHERE EMPLOYER_ID = %s AND JOB_TITLE IN ({", ".join(["%s"] * len(chunk))})
+            """, (employer_id, *chunk))
+            for existing in cursor.fetchall():
+                index = pending.pop(job_key(*existing), None)
+                if index is not None:
+                    results[index] = {"index": index, "status": "duplicate"}
+        inserts = [(rows[i]["job_title"], rows[i]["specialization"], int(rows[i]["minimum_work_experience"]), rows[i]["location"], int(rows[i]["salary"]), employer_id) for i in pending.values()]
+        first_id = None
+        # executemany turns each chunk into a single multi-row INSERT; all chunks share one transaction.
+        for chunk in chunked(inserts, BULK_CHUNK_SIZE):
+            cursor.executemany("""
+                INSERT INTO JOBS 
+                (JOB_TITLE, SPECIALIZATION, MINIMUM_WORK_EXPERIENCE, LOCATION, SALARY, EMPLOYER_ID) 
+                VALUES (%s, %s, %s, %s, %s, %s)
+            """, chunk)
+            if first_id is None:
+                first_id = cursor.lastrowid
+        created = []
+        if inserts:
+            cursor.execute("""
+                SELECT ID, JOB_TITLE, SPECIALIZATION, MINIMUM_WORK_EXPERIENCE, LOCATION, SALARY FROM JOBS 
+                WHERE EMPLOYER_ID = %s AND ID >= %s
+            """, (employer_id, first_id))
+            for job in cursor.fetchall():
+                index = pending.get(job_key(*job[1:]))
+                if index is not None and results[index] is None:
+                    results[index] = {"index": index, "status": "created", "job_id": job[0]}
+                    created.append(job)
+        queue_job_alerts(cursor, [job[0] for job in created])
+        conn.commit()
+        if created:
+            invalidate_listings(f"jobs:{employer_id}")
+        index_jobs([(job_id, job_title, specialization, location, salary, minimum_work_experience)
+                    for job_id, job_title, specialization, minimum_work_experience, location, salary in created])
+        counts = {}
+        for result in results:
+            counts[result["status"]] = counts.get(result["status"], 0) + 1
+        return jsonify({"created": counts.get("created", 0), "duplicates": counts.get("duplicate", 0), "invalid": counts.get("invalid", 0), "results": results}), 201
+    except IntegrityError:
+        record_error()
+        if 'conn' in locals() and conn:
+            conn.rollback()
+        return jsonify({"error": "A job in this batch was posted concurrently, nothing was saved. Please retry!"}), 409
+    except Error as e:
+        record_error()
+        if 'conn' in locals() and conn:
+            conn.rollback()
+        return jsonify({"error": f"Database/server error: {str(e)}"}), 500
+    except Exception as e:
+        record_error()
+        if 'conn' in locals() and conn:
+            conn.rollback()
+        return jsonify({"error": f"Unexpected error: {str(e)}"}), 500
+    finally:
+        if 'cursor' in locals() and cursor:
+            cursor.close()
+        if 'conn' in locals() and conn:
+            conn.close()
+
+@app.route("/delete_jobs_bulk", methods=["DELETE"])
+@token_required
+def delete_jobs_bulk(current_user, role):
+    data, error = validate_json(["job_ids"])
+    if error: return error
+    if role != "employer":
+        return jsonify({"error": "Access denied!"}), 401
+    job_ids = data["job_ids"]
+    if not isinstance(job_ids, list) or not job_ids:
+        return jsonify({"error": "job_ids must be a non-empty list!"}), 400
+    if len(job_ids) > BULK_MAX_ROWS:
+        return jsonify({"error": f"At most {BULK_MAX_ROWS} rows per request!"}), 413
+    try:
+        job_ids = list(dict.fromkeys(int(job_id) for job_id in job_ids))
+    except (TypeError, ValueError):
+        record_error()
+        return jsonify({"error": "Job ids must be integers!"}), 400
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        employer_id = current_user["id"]
+        owners = {}
+        for chunk in chunked(job_ids, BULK_CHUNK_SIZE):
+            cursor.execute(f"""
+                SELECT ID, EMPLOYER_ID FROM JOBS 
+                WHERE ID IN ({", ".join(["%s"] * len(chunk))})
+            """, chunk)
+            owners.update(cursor.fetchall())
+        owned = [job_id for job_id in job_ids if owners.get(job_id) == employer_id]
+        for chunk in chunked(owned, BULK_CHUNK_SIZE):
+            cursor.execute(f"""
+                DELETE FROM JOBS 
+                WHERE EMPLOYER_ID = %s AND ID IN ({", ".join(["%s"] * len(chunk))})
+            """, (employer_id, *chunk))
+        conn.commit()
+        unindex_jobs(owned)
+        if owned:
+            invalidate_listings(f"jobs:{employer_id}", *(f"applications:{job_id}" for job_id in owned))
+        results = []
+        for job_id in job_ids:
+            if job_id not in owners:
+                results.append({"job_id": job_id, "status": "not_found"})
+            elif owners[job_id] != employer_id:
+                results.append({"job_id": job_id, "status": "access_denied"})
+            else:
+                results.append({"job_id": job_id, "status": "deleted"})
+        return jsonify({"deleted": len(owned), "results": results}), 200
+    except Error as e:
+        record_error()
         if 'conn' in locals() and conn:
             conn.rollback()
         return jsonify({"error": f"Database/server error: {str(e)}"}), 500
     except Exception as e:
+        record_error()
         if 'conn' in locals() and conn:
             conn.rollback()
         return jsonify({"error": f"Unexpected error: {str(e)}"}), 500
@@ -568,44 +3385,179 @@ def view_job_applications(current_user, role):
     data, error = validate_json(["job_id"])
     if error: return error
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
+        job_id = int(data["job_id"])
+    except (TypeError, ValueError):
+        return jsonify({"error": "Invalid job id!"}), 400
+    try:
         if role != "employer":
             return jsonify({"error": "Access denied!"}), 401
+        id = current_user["id"]
+        key = f"applications:{job_id}"
+        entry, token = cached_listing(key)
+        if entry is not None:
+            if entry["employer_id"] != id:
+                return jsonify({"error": "Acccess denied!"}), 401
+            return listing_response(entry)
+        conn = get_db_connection()
+        cursor = conn.cursor()
         cursor.execute("""
-            SELECT ID FROM EMPLOYERS 
-            WHERE PHONE_NUMBER = %s
-        """, (current_user,))
+            SELECT EMPLOYER_ID FROM JOBS 
+            WHERE ID = %s
+        """, (job_id,))
         result = cursor.fetchone()
         if not result:
-            return jsonify({"error": "User not found!"}), 404
-        id = result[0]
+            return jsonify({"error": "Job not found!"}), 404
+        if id != result[0]:
+            return jsonify({"error": "Acccess denied!"}), 401
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute("""
+            SELECT JA.ID, JS.PHONE_NUMBER, JS.NAME, JS.EMAIL, DATE_FORMAT(JS.DOB, '%Y-%m-%d') AS DOB, JS.HIGHEST_DEGREE, JS.SPECIALIZATION, JS.WORK_EXPERIENCE 
+            FROM JOBSEEKERS JS INNER JOIN JOB_APPLICATIONS JA 
+            ON JS.ID = JA.JOBSEEKER_ID 
+            WHERE JA.JOB_ID = %s AND JS.DELETED_AT IS NULL 
+        """, (job_id,))
+        result = cursor.fetchall()
+        conn.commit()
+        return store_listing(key, token, {"applications": result}, employer_id=id)
+    except Error as e:
+        record_error()
+        if 'conn' in locals() and conn:
+            conn.rollback()
+        return jsonify({"error": f"Database/server error: {str(e)}"}), 500
+    except Exception as e:
+        record_error()
+        if 'conn' in locals() and conn:
+            conn.rollback()
+        return jsonify({"error": f"Unexpected error: {str(e)}"}), 500
+    finally:
+        if 'cursor' in locals() and cursor:
+            cursor.close()
+        if 'conn' in locals() and conn:
+            conn.close()
+
+@app.route("/applicant_summary", methods=["GET"])
+@token_required
+def applicant_summary(current_user, role):
+    job_id = request.args.get("job_id")
+    if job_id is not None:
+        try:
+            job_id = int(job_id)
+        except ValueError:
+            return jsonify({"error": "Invalid job id!"}), 400
+    try:
+        if role != "employer":
+            return jsonify({"error": "Access denied!"}), 401
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        if job_id is not None:
+            cursor.execute("""
+                SELECT EMPLOYER_ID, APPLICANT_COUNT FROM JOBS 
+                WHERE ID = %s
+            """, (job_id,))
+            result = cursor.fetchone()
+            if not result:
+                return jsonify({"error": "Job not found!"}), 404
+            if result[0] != current_user["id"]:
+                return jsonify({"error": "Access denied!"}), 401
+            cursor.execute("""
+                SELECT DIMENSION, BUCKET, APPLICANTS FROM JOB_APPLICANT_SUMMARY 
+                WHERE JOB_ID = %s
+            """, (job_id,))
+            return jsonify({"job_id": job_id, "applicants": result[1], **applicant_breakdown(cursor.fetchall())}), 200
+        cursor.execute("""
+            SELECT COUNT(*), COALESCE(SUM(APPLICANT_COUNT), 0) FROM JOBS 
+            WHERE EMPLOYER_ID = %s
+        """, (current_user["id"],))
+        jobs, applications = cursor.fetchone()
+        # Someone who applied to two of the employer's jobs is counted under both.
+        cursor.execute("""
+            SELECT S.DIMENSION, S.BUCKET, SUM(S.APPLICANTS) 
+            FROM JOBS J INNER JOIN JOB_APPLICANT_SUMMARY S ON S.JOB_ID = J.ID 
+            WHERE J.EMPLOYER_ID = %s 
+            GROUP BY S.DIMENSION, S.BUCKET
+        """, (current_user["id"],))
+        return jsonify({"jobs": jobs, "applications": int(applications), **applicant_breakdown(cursor.fetchall())}), 200
+    except Error as e:
+        record_error()
+        return jsonify({"error": f"Database/server error: {str(e)}"}), 500
+    except Exception as e:
+        record_error()
+        return jsonify({"error": f"Unexpected error: {str(e)}"}), 500
+    finally:
+        if 'cursor' in locals() and cursor:
+            cursor.close()
+        if 'conn' in locals() and conn:
+            conn.close()
+
+@app.route("/search_applicants", methods=["GET"])
+@token_required
+def search_applicants(current_user, role):
+    try:
+        job_id = int(request.args.get("job_id", ""))
+        limit = int(request.args.get("limit", 20))
+        offset = int(request.args.get("offset", 0))
+    except ValueError:
+        record_error()
+        return jsonify({"error": "Invalid search parameters!"}), 400
+    if limit < 1 or limit > PAGE_MAX_LIMIT or offset < 0:
+        return jsonify({"error": "Invalid search parameters!"}), 400
+    terms = list(dict.fromkeys(tokenize(request.args.get("q", ""))))[:APPLICANT_SEARCH_MAX_TERMS]
+    if not terms:
+        return jsonify({"error": "Search keywords are required!"}), 400
+    try:
+        if role != "employer":
+            return jsonify({"error": "Access denied!"}), 401
+        conn = get_db_connection()
+        cursor = conn.cursor()
         cursor.execute("""
             SELECT EMPLOYER_ID FROM JOBS 
             WHERE ID = %s
-        """, (data["job_id"],))
+        """, (job_id,))
         result = cursor.fetchone()
         if not result:
             return jsonify({"error": "Job not found!"}), 404
-        if id != result[0]:
-            return jsonify({"error": "Acccess denied!"}), 401
-        cursor = conn.cursor(dictionary=True)
+        if result[0] != current_user["id"]:
+            return jsonify({"error": "Access denied!"}), 401
         cursor.execute("""
-            SELECT JA.ID, JS.PHONE_NUMBER, JS.NAME, JS.EMAIL, DATE_FORMAT(JS.DOB, '%Y-%m-%d') AS DOB, JS.HIGHEST_DEGREE, JS.SPECIALIZATION, JS.WORK_EXPERIENCE 
-            FROM JOBSEEKERS JS INNER JOIN JOB_APPLICATIONS JA 
-            ON JS.ID = JA.JOBSEEKER_ID 
-            WHERE JA.JOB_ID = %s 
-        """, (data["job_id"],))
-        result = cursor.fetchall()
+            SELECT RESUME_INDEX_STATUS, COUNT(*), COALESCE(SUM(RESUME_TERM_COUNT), 0) FROM JOB_APPLICATIONS 
+            WHERE JOB_ID = %s 
+            GROUP BY RESUME_INDEX_STATUS
+        """, (job_id,))
+        statuses = {status: (count, int(length)) for status, count, length in cursor.fetchall()}
+        documents, total_length = statuses.get(RESUME_INDEXED, (0, 0))
+        # The postings of every query term come off the (JOB_ID, TERM) prefix of RESUME_TERMS' primary key.
+        cursor.execute(f"""
+            SELECT T.APPLICATION_ID, T.TERM, T.FREQUENCY, JA.RESUME_TERM_COUNT 
+            FROM RESUME_TERMS T INNER JOIN JOB_APPLICATIONS JA ON JA.ID = T.APPLICATION_ID 
+            WHERE T.JOB_ID = %s AND T.TERM IN ({", ".join(["%s"] * len(terms))})
+        """, (job_id, *terms))
+        ranked = rank_applicants(cursor.fetchall(), terms, documents, total_length)
+        page = ranked[offset:offset + limit]
+        applications = []
+        if page:
+            cursor = conn.cursor(dictionary=True)
+            cursor.execute(f"""
+                SELECT JA.ID, JS.PHONE_NUMBER, JS.NAME, JS.EMAIL, DATE_FORMAT(JS.DOB, '%Y-%m-%d') AS DOB, JS.HIGHEST_DEGREE, JS.SPECIALIZATION, JS.WORK_EXPERIENCE 
+                FROM JOBSEEKERS JS INNER JOIN JOB_APPLICATIONS JA 
+                ON JS.ID = JA.JOBSEEKER_ID 
+                WHERE JA.ID IN ({", ".join(["%s"] * len(page))}) AND JS.DELETED_AT IS NULL
+            """, [application_id for application_id, _ in page])
+            profiles = {row["ID"]: row for row in cursor.fetchall()}
+            applications = [dict(profiles[application_id], SCORE=round(score, 4)) for application_id, score in page if application_id in profiles]
         conn.commit()
-        return jsonify({"applications": result}), 200
+        return jsonify({
+            "terms": terms,
+            "total": len(ranked),
+            "applications": applications,
+            "indexed": documents,
+            "pending": statuses.get(RESUME_PENDING, (0, 0))[0],
+            "unreadable": statuses.get(RESUME_UNREADABLE, (0, 0))[0]
+        }), 200
     except Error as e:
-        if 'conn' in locals() and conn:
-            conn.rollback()
+        record_error()
         return jsonify({"error": f"Database/server error: {str(e)}"}), 500
     except Exception as e:
-        if 'conn' in locals() and conn:
-            conn.rollback()
+        record_error()
         return jsonify({"error": f"Unexpected error: {str(e)}"}), 500
     finally:
         if 'cursor' in locals() and cursor:
@@ -618,53 +3570,108 @@ def view_job_applications(current_user, role):
 def view_resume(current_user, role):
     data, error = validate_json(["job_application_id"])
     if error: return error
+    if role != "employer":
+        return jsonify({"error": "Access denied!"}), 401
     try:
         conn = get_db_connection()
         cursor = conn.cursor(buffered=True)
-        if role != "employer":
-            return jsonify({"error": "Access denied!"}), 401
-        cursor.execute("""
-            SELECT ID FROM EMPLOYERS 
-            WHERE PHONE_NUMBER = %s
-        """, (current_user,))
-        result = cursor.fetchone()
-        if not result:
-            return jsonify({"error": "User not found!"}), 404
-        employer_id = result[0]
+        # Ownership and resume metadata in one round trip: every lookup is by primary key. An application whose
+        # jobseeker is being deleted is gone as far as employers are concerned.
         cursor.execute("""
-            SELECT JOB_ID FROM JOB_APPLICATIONS 
-            WHERE ID = %s
+            SELECT J.EMPLOYER_ID, JA.RESUME_NAME, JA.RESUME_SHA256 
+            FROM JOB_APPLICATIONS JA INNER JOIN JOBS J ON J.ID = JA.JOB_ID 
+            INNER JOIN JOBSEEKERS JS ON JS.ID = JA.JOBSEEKER_ID AND JS.DELETED_AT IS NULL 
+            WHERE JA.ID = %s
         """, (data["job_application_id"],))
         result = cursor.fetchone()
         if not result:
             return jsonify({"error": "Job not found!"}), 404
-        job_id = result[0]
-        cursor.execute("""
-            SELECT ID FROM JOBS 
-            WHERE EMPLOYER_ID = %s
-        """, (employer_id,))
-        result = cursor.fetchone()
-        if not result:
-            return jsonify({"error": "Job not found!"}), 404
-        if result[0] != job_id:
+        if result[0] != current_user["id"]:
             return jsonify({"error": "Access denied!"}), 401
+        filename, resume_key = result[1], result[2]
+        if resume_key:
+            return get_resume_store().send(resume_key, filename)
+        # Not yet moved out by migrate-resumes.
         cursor.execute("""
-            SELECT RESUME_NAME, RESUME_DATA FROM JOB_APPLICATIONS 
+            SELECT RESUME_DATA FROM JOB_APPLICATIONS 
             WHERE ID = %s
         """, (data["job_application_id"],))
         result = cursor.fetchone()
-        if not result:
-            return jsonify({"error": "Job not found!"}), 404
-        filename, filedata = result
+        if not result or result[0] is None:
+            return jsonify({"error": "Resume not found!"}), 404
         return send_file(
-            io.BytesIO(filedata),
+            io.BytesIO(result[0]),
             download_name=filename,
             as_attachment=True,
             mimetype="application/pdf"
         ), 200
     except Error as e:
+        record_error()
+        return jsonify({"error": f"Database/server error: {str(e)}"}), 500
+    except Exception as e:
+        record_error()
+        return jsonify({"error": f"Unexpected error: {str(e)}"}), 500
+    finally:
+        if 'cursor' in locals() and cursor:
+            cursor.close()
+        if 'conn' in locals() and conn:
+            conn.close()
+
+@app.route("/export_resumes", methods=["POST"])
+@token_required
+def export_resumes(current_user, role):
+    data, error = validate_json(["job_id"])
+    if error: return error
+    application_ids = data.get("application_ids")
+    try:
+        job_id = int(data["job_id"])
+        if application_ids is not None:
+            if not isinstance(application_ids, list) or not application_ids:
+                raise ValueError
+            application_ids = sorted({int(application_id) for application_id in application_ids})
+    except (TypeError, ValueError):
+        return jsonify({"error": "Invalid job id or application ids!"}), 400
+    if application_ids and len(application_ids) > BULK_MAX_ROWS:
+        return jsonify({"error": f"At most {BULK_MAX_ROWS} applications per export!"}), 413
+    try:
+        if role != "employer":
+            return jsonify({"error": "Access denied!"}), 401
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        # Ownership is checked once for the whole export.
+        cursor.execute("""
+            SELECT EMPLOYER_ID FROM JOBS 
+            WHERE ID = %s
+        """, (job_id,))
+        result = cursor.fetchone()
+        if not result:
+            return jsonify({"error": "Job not found!"}), 404
+        if result[0] != current_user["id"]:
+            return jsonify({"error": "Access denied!"}), 401
+        cursor.close()
+        query = """
+            SELECT JA.ID, JA.RESUME_NAME, JA.RESUME_SHA256, IF(JA.RESUME_SHA256 IS NULL, JA.RESUME_DATA, NULL), 
+            JS.NAME, JS.EMAIL, JS.PHONE_NUMBER, DATE_FORMAT(JS.DOB, '%Y-%m-%d'), JS.HIGHEST_DEGREE, JS.SPECIALIZATION, JS.WORK_EXPERIENCE 
+            FROM JOB_APPLICATIONS JA INNER JOIN JOBSEEKERS JS ON JS.ID = JA.JOBSEEKER_ID 
+            WHERE JA.JOB_ID = %s AND JS.DELETED_AT IS NULL"""
+        params = [job_id]
+        if application_ids:
+            query += f" AND JA.ID IN ({', '.join(['%s'] * len(application_ids))})"
+            params += application_ids
+        cursor = conn.cursor(buffered=False)
+        cursor.execute(query + " ORDER BY JA.ID", params)
+        release = release_once(conn, cursor)
+        response = Response(stream_resume_zip(cursor, release), mimetype="application/zip")
+        response.headers["Content-Disposition"] = f"attachment; filename=job_{job_id}_resumes.zip"
+        response.call_on_close(release)
+        # The response closes them once the archive has been sent, or skipped.
+        conn = cursor = None
+        return response
+    except Error as e:
+        record_error()
         return jsonify({"error": f"Database/server error: {str(e)}"}), 500
     except Exception as e:
+        record_error()
         return jsonify({"error": f"Unexpected error: {str(e)}"}), 500
     finally:
         if 'cursor' in locals() and cursor:
@@ -672,102 +3679,310 @@ def view_resume(current_user, role):
         if 'conn' in locals() and conn:
             conn.close()
 
+# sort -> (ORDER BY, keyset predicate, number of values in the cursor). The salary predicate binds the salary twice.
+ACTIVE_JOB_SORTS = {
+    "id": ("J.ID", "AND J.ID > %s", 1),
+    "recent": ("J.ID DESC", "AND J.ID < %s", 1),
+    "salary": ("J.SALARY DESC, J.ID DESC", "AND (J.SALARY < %s OR (J.SALARY = %s AND J.ID < %s))", 2)
+}
+
 @app.route("/view_active_jobs", methods=["GET"])
 @token_required
 def view_active_jobs(current_user, role):
+    sort = request.args.get("sort", "id")
+    if sort not in ACTIVE_JOB_SORTS:
+        return jsonify({"error": "Invalid sort!"}), 400
+    order_by, keyset, keyset_size = ACTIVE_JOB_SORTS[sort]
+    page, error = validate_page(sort, keyset_size)
+    if error: return error
+    limit, after = page
     try:
         conn = get_db_connection()
         cursor = conn.cursor()
         if role != "jobseeker":
             return jsonify({"error": "Access denied!"}), 401
-        cursor.execute("""
-            SELECT ID, SPECIALIZATION, WORK_EXPERIENCE FROM JOBSEEKERS 
-            WHERE PHONE_NUMBER = %s
-        """, (current_user,))
-        result = cursor.fetchone()
-        if not result:
-            return jsonify({"error": "User not found!"}), 404
-        id, specialization, work_experience = result
-        cursor.execute("""
+        id, specialization, work_experience = current_user["id"], current_user["specialization"], current_user["work_experience"]
+        params = [id, specialization.upper(), work_experience]
+        if after:
+            params.extend(after[0:1] * (keyset_size - 1) + after)
+        cursor.execute(f"""
             SELECT E.COMPANY_NAME, J.ID, J.JOB_TITLE, J.SPECIALIZATION, J.MINIMUM_WORK_EXPERIENCE, J.LOCATION, J.SALARY
-            FROM EMPLOYERS E INNER JOIN JOBS J 
-            ON E.ID = J.EMPLOYER_ID 
-            WHERE UPPER(J.SPECIALIZATION) = %s 
+            FROM JOBS J INNER JOIN EMPLOYERS E 
+            ON E.ID = J.EMPLOYER_ID AND E.DELETED_AT IS NULL 
+            LEFT JOIN JOB_APPLICATIONS JA 
+            ON JA.JOB_ID = J.ID AND JA.JOBSEEKER_ID = %s 
+            WHERE J.SPEC_KEY = %s 
             AND J.MINIMUM_WORK_EXPERIENCE <= %s 
-            AND J.ID NOT IN (
-                SELECT JOB_ID FROM JOB_APPLICATIONS 
-                WHERE JOBSEEKER_ID = %s
-            )
-        """, (specialization.upper(), work_experience, id))
+            AND JA.ID IS NULL 
+            {keyset if after else ""}
+            ORDER BY {order_by} 
+            LIMIT %s
+        """, (*params, limit + 1))
         result = cursor.fetchall()
-        return jsonify({"jobs": result}), 200
+        next_cursor = None
+        if len(result) > limit:
+            result = result[:limit]
+            last = result[-1]
+            next_cursor = encode_cursor([sort, last[6], last[1]] if sort == "salary" else [sort, last[1]])
+        return jsonify({"jobs": result, "next_cursor": next_cursor}), 200
     except Error:
+        record_error()
         return jsonify({"error": "Database error!"}), 500
     except Exception:
+        record_error()
         return jsonify({"error": "Invalid request!"}), 400
     finally:
         if 'cursor' in locals(): cursor.close()
         if 'conn' in locals(): conn.close()
 
-@app.route("/job_apply", methods=["POST"])
-@token_required
-def job_apply(current_user, role):
-    if "resume" not in request.files:
-        return jsonify({"error": "Resume file is required!"}), 400
-    if "job_id" not in request.form:
-        return jsonify({"error": "Job id is required!"}), 400
-    resume = request.files["resume"]
-    job_id = request.form.get("job_id")
-    if resume.filename == "":
-        return jsonify({"error": "No file selected"}), 404
-    if not resume.filename.lower().endswith(".pdf"):
-        return jsonify({"error": "Only PDF files are allowed"}), 400 
+SEARCH_RESULT_FIELDS = ["id", "job_title", "specialization", "location", "salary", "minimum_work_experience"]
+
+def browse_jobs(location, min_salary, max_salary):
+    # /search_jobs without a query has nothing to rank. Jobs are listed off the primary key with an "after" cursor
+    # instead of walking every document in the index; there is no total or facets, which would need every row.
+    page, error = validate_page("id", 1)
+    if error: return error
+    limit, after = page
+    conditions, params = ["E.DELETED_AT IS NULL"], []
+    if after:
+        conditions.append("J.ID > %s")
+        params.append(after[0])
+    if location:
+        conditions.append("J.LOCATION = %s")
+        params.append(location)
+    if min_salary is not None:
+        conditions.append("J.SALARY >= %s")
+        params.append(min_salary)
+    if max_salary is not None:
+        conditions.append("J.SALARY <= %s")
+        params.append(max_salary)
     try:
         conn = get_db_connection()
         cursor = conn.cursor()
+        cursor.execute(f"""
+            SELECT J.ID, J.JOB_TITLE, J.SPECIALIZATION, J.LOCATION, J.SALARY, J.MINIMUM_WORK_EXPERIENCE 
+            FROM JOBS J INNER JOIN EMPLOYERS E ON E.ID = J.EMPLOYER_ID 
+            WHERE {" AND ".join(conditions)} 
+            ORDER BY J.ID 
+            LIMIT %s
+        """, (*params, limit + 1))
+        result = cursor.fetchall()
+        next_cursor = None
+        if len(result) > limit:
+            result = result[:limit]
+            next_cursor = encode_cursor(["id", result[-1][0]])
+        return jsonify({"jobs": [dict(zip(SEARCH_RESULT_FIELDS, row)) for row in result], "next_cursor": next_cursor}), 200
+    except Error as e:
+        record_error()
+        return jsonify({"error": f"Database/server error: {str(e)}"}), 500
+    except Exception as e:
+        record_error()
+        return jsonify({"error": f"Unexpected error: {str(e)}"}), 500
+    finally:
+        if 'cursor' in locals() and cursor:
+            cursor.close()
+        if 'conn' in locals() and conn:
+            conn.close()
+
+@app.route("/search_jobs", methods=["GET"])
+@token_required
+def search_jobs(current_user, role):
+    try:
+        limit = int(request.args.get("limit", 20))
+        offset = int(request.args.get("offset", 0))
+        min_salary = request.args.get("min_salary", type=int)
+        max_salary = request.args.get("max_salary", type=int)
+    except ValueError:
+        record_error()
+        return jsonify({"error": "Invalid search parameters!"}), 400
+    if limit < 1 or limit > PAGE_MAX_LIMIT or offset < 0:
+        return jsonify({"error": "Invalid search parameters!"}), 400
+    query = request.args.get("q", "")
+    if not tokenize(query):
+        return browse_jobs(request.args.get("location"), min_salary, max_salary)
+    try:
+        result = get_job_search_index().search(
+            query,
+            location=request.args.get("location"),
+            min_salary=min_salary,
+            max_salary=max_salary,
+            limit=limit,
+            offset=offset
+        )
+        return jsonify(result), 200
+    except Error as e:
+        record_error()
+        return jsonify({"error": f"Database/server error: {str(e)}"}), 500
+    except Exception as e:
+        record_error()
+        return jsonify({"error": f"Unexpected error: {str(e)}"}), 500
+
+@app.route("/recommended_jobs", methods=["GET"])
+@token_required
+def recommended_jobs(current_user, role):
+    try:
+        limit = int(request.args.get("limit", 20))
+        offset = int(request.args.get("offset", 0))
+    except ValueError:
+        record_error()
+        return jsonify({"error": "Invalid parameters!"}), 400
+    if limit < 1 or limit > PAGE_MAX_LIMIT or offset < 0:
+        return jsonify({"error": "Invalid parameters!"}), 400
+    try:
         if role != "jobseeker":
             return jsonify({"error": "Access denied!"}), 401
+        conn = get_db_connection()
+        cursor = conn.cursor()
         cursor.execute("""
-            SELECT ID, WORK_EXPERIENCE, SPECIALIZATION FROM JOBSEEKERS 
-            WHERE PHONE_NUMBER = %s
-        """, (current_user,))
-        result = cursor.fetchone()
-        if not result:
+            SELECT JS.HIGHEST_DEGREE, JA.JOB_ID 
+            FROM JOBSEEKERS JS LEFT JOIN JOB_APPLICATIONS JA 
+            ON JA.JOBSEEKER_ID = JS.ID 
+            WHERE JS.ID = %s
+        """, (current_user["id"],))
+        rows = cursor.fetchall()
+        if not rows:
             return jsonify({"error": "User not found!"}), 404
-        id, work_experience, specialization = result
+        result = get_job_match_index().recommend(
+            current_user["specialization"],
+            rows[0][0],
+            current_user["work_experience"],
+            location=request.args.get("location"),
+            exclude={row[1] for row in rows if row[1] is not None},
+            limit=limit,
+            offset=offset
+        )
+        return jsonify(result), 200
+    except Error as e:
+        record_error()
+        return jsonify({"error": f"Database/server error: {str(e)}"}), 500
+    except Exception as e:
+        record_error()
+        return jsonify({"error": f"Unexpected error: {str(e)}"}), 500
+    finally:
+        if 'cursor' in locals() and cursor:
+            cursor.close()
+        if 'conn' in locals() and conn:
+            conn.close()
+
+def check_application(current_user, job_id):
+    # Job, applicant profile and any earlier application in one round trip, so a repeat is turned away before
+    # the resume is received. The unique key still catches two applications racing each other. It borrows its own
+    # connection and hands it straight back: none is held, and no transaction is open, while the resume streams in.
+    try:
+        job_id = int(job_id)
+    except (TypeError, ValueError):
+        return None, (jsonify({"error": "Invalid job id!"}), 400)
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
         cursor.execute("""
-            SELECT MINIMUM_WORK_EXPERIENCE, SPECIALIZATION FROM JOBS 
-            WHERE ID = %s
-        """, (job_id,))
+            SELECT J.MINIMUM_WORK_EXPERIENCE, J.SPEC_KEY = %s, J.ID, J.EMPLOYER_ID, JS.WORK_EXPERIENCE, JS.HIGHEST_DEGREE, JA.ID 
+            FROM JOBS J INNER JOIN JOBSEEKERS JS ON JS.ID = %s AND JS.DELETED_AT IS NULL 
+            INNER JOIN EMPLOYERS E ON E.ID = J.EMPLOYER_ID AND E.DELETED_AT IS NULL 
+            LEFT JOIN JOB_APPLICATIONS JA ON JA.JOB_ID = J.ID AND JA.JOBSEEKER_ID = JS.ID 
+            WHERE J.ID = %s
+        """, (current_user["specialization"].upper(), current_user["id"], job_id))
         result = cursor.fetchone()
-        if not result:
-            return jsonify({"error": "Job not found!"}), 404
-        if result[0] > work_experience or result[1].upper() != specialization.upper():
-            return jsonify({"error": "You cannot apply for this job position!"}), 404
+    finally:
+        cursor.close()
+        conn.close()
+    if not result:
+        return None, (jsonify({"error": "Job not found!"}), 404)
+    if result[0] > current_user["work_experience"] or not result[1]:
+        return None, (jsonify({"error": "You cannot apply for this job position!"}), 404)
+    if result[6] is not None:
+        return None, (jsonify({"error": "You have already applied for this job position!"}), 400)
+    return result, None
+
+@app.route("/job_apply", methods=["POST"])
+@token_required
+def job_apply(current_user, role):
+    # The body is read off the socket only after the cheap checks pass. job_id can come in the query string or as a
+    # form field ahead of the resume; sent after it, the resume is still streamed to disk but checked afterwards.
+    if role != "jobseeker":
+        return jsonify({"error": "Access denied!"}), 401
+    boundary = request.mimetype_params.get("boundary")
+    if request.mimetype != "multipart/form-data" or not boundary:
+        return jsonify({"error": "Resume file is required!"}), 400
+    if request.content_length is not None and request.content_length > RESUME_MAX_BYTES + RESUME_FORM_OVERHEAD_BYTES:
+        return jsonify({"error": f"Resume must not be larger than {RESUME_MAX_BYTES // 1024} KB!"}), 413
+    job_id = request.args.get("job_id")
+    try:
+        id = current_user["id"]
+        result, upload, filename, receiving, orphan = None, None, None, False, None
+        for kind, name, value in multipart_events(request.stream, boundary.encode()):
+            if kind == "field":
+                if name == "job_id" and job_id is None:
+                    job_id = value
+            elif kind == "file":
+                receiving = name == "resume" and upload is None
+                if not receiving:
+                    continue
+                filename = value
+                if filename == "":
+                    return jsonify({"error": "No file selected"}), 404
+                if not filename.lower().endswith(".pdf"):
+                    return jsonify({"error": "Only PDF files are allowed"}), 400
+                if job_id is not None:
+                    result, error = check_application(current_user, job_id)
+                    if error: return error
+                upload = get_resume_store().open_upload(RESUME_MAX_BYTES, ResumeUpload.PDF_MAGIC)
+            elif receiving:
+                upload.write(name)
+                receiving = value
+        if upload is None:
+            return jsonify({"error": "Resume file is required!"}), 400
+        if job_id is None:
+            return jsonify({"error": "Job id is required!"}), 400
+        if result is None:
+            result, error = check_application(current_user, job_id)
+            if error: return error
+        resume_key, resume_size = upload.finish()
+        conn = get_db_connection()
+        cursor = conn.cursor()
         cursor.execute("""
             INSERT INTO JOB_APPLICATIONS
-            (RESUME_NAME, RESUME_DATA, JOB_ID, JOBSEEKER_ID) 
-            VALUES (%s, %s, %s, %s)
-        """, (resume.filename, Binary(resume.read()), job_id, id))
+            (RESUME_NAME, RESUME_SHA256, RESUME_SIZE, JOB_ID, JOBSEEKER_ID) 
+            VALUES (%s, %s, %s, %s, %s)
+        """, (filename, resume_key, resume_size, result[2], id))
+        count_applicants(cursor, [result[2]], result[4], result[5], 1)
+        # Published only once the row is in, so an application that loses the race to the unique key leaves no file
+        # behind; and before the commit, so the indexer never sees a committed row whose file is not there yet. If the
+        # commit fails, a file this upload created is deleted again unless another application refers to it.
+        upload.publish()
+        orphan = upload if upload.created else None
         conn.commit()
+        orphan = None
+        invalidate_listings(f"applications:{result[2]}", f"jobs:{result[3]}")
+        resume_indexer.wake()
         return jsonify({"message": "Job application successful!"}), 201
+    except UploadRejected as e:
+        record_error()
+        return jsonify({"error": str(e)}), e.status
     except IntegrityError:
+        record_error()
         if 'conn' in locals() and conn:
             conn.rollback()
         return jsonify({"error": "You have already applied for this job position!"}), 400
     except Error as e:
+        record_error()
         if 'conn' in locals() and conn:
             conn.rollback()
         return jsonify({"error": f"Database/server error: {str(e)}"}), 500
     except Exception as e:
+        record_error()
         if 'conn' in locals() and conn:
             conn.rollback()
         return jsonify({"error": f"Unexpected error: {str(e)}"}), 500
     finally:
+        if 'upload' in locals() and upload:
+            upload.discard()
         if 'cursor' in locals() and cursor:
             cursor.close()
         if 'conn' in locals() and conn:
             conn.close()
+        if 'orphan' in locals() and orphan:
+            delete_orphaned_upload(orphan)
 
 @app.route('/admin_login', methods=['POST'])
 def admin_login():
@@ -776,45 +3991,93 @@ def admin_login():
     if(data["id"] != ADMIN_ID or data["password"] != ADMIN_PASSWORD):
         return jsonify({"error": "Invalid id or/and password!"}), 401
     try:
-        token = jwt.encode(
-            {
-                "user": data["id"],
-                "role": "admin",
-                "exp": datetime.datetime.utcnow() + datetime.timedelta(hours=SESSION_EXPIRY_HOURS)
-            },
-            app.config["SECRET_KEY"],
-            algorithm="HS256"
-        )
+        token = generate_token({"user": data["id"], "role": "admin"})
         return jsonify({"message": "Login successful!", "token": token}), 200
     except Error as e:
+        record_error()
         return jsonify({"error": f"Database/server error: {str(e)}"}), 500
     except Exception as e:
+        record_error()
         return jsonify({"error": f"Unexpected error: {str(e)}"}), 500
 
+USER_EXPORT_COLUMNS = {
+    "jobseeker": ("JOBSEEKERS", ["ID", "PHONE_NUMBER", "NAME", "EMAIL", "DOB", "HIGHEST_DEGREE", "SPECIALIZATION", "WORK_EXPERIENCE", "IS_VERIFIED", "CREATED_AT"]),
+    "employer": ("EMPLOYERS", ["ID", "PHONE_NUMBER", "NAME", "EMAIL", "COMPANY_NAME", "IS_VERIFIED", "CREATED_AT"])
+}
+
 @app.route("/view_users", methods=["GET"])
 @token_required
 def view_users(current_user, role):
-    data, error = validate_json(["user_type"])
-    if error: return error
+    if role != "admin":
+        return jsonify({"error": "Access denied!"}), 401
+    body = request.get_json(silent=True) if request.is_json else None
+    user_type = request.args.get("user_type") or (body or {}).get("user_type")
+    if not user_type:
+        return jsonify({"error": "Missing required field: user_type!"}), 400
+    if user_type not in USER_EXPORT_COLUMNS:
+        return jsonify({"error": "Invalid user type!"}), 400
+    export_format = request.args.get("format", "json")
+    if export_format not in ("json", "ndjson", "csv"):
+        return jsonify({"error": "Invalid format!"}), 400
+    table, columns = USER_EXPORT_COLUMNS[user_type]
+    conditions, params = [], []
+    try:
+        if request.args.get("verified") is not None:
+            conditions.append("IS_VERIFIED = %s")
+            params.append(int(request.args["verified"]))
+        if request.args.get("registered_from"):
+            conditions.append("CREATED_AT >= %s")
+            params.append(datetime.date.fromisoformat(request.args["registered_from"]))
+        if request.args.get("registered_to"):
+            conditions.append("CREATED_AT < %s")
+            params.append(datetime.date.fromisoformat(request.args["registered_to"]) + datetime.timedelta(days=1))
+    except ValueError:
+        record_error()
+        return jsonify({"error": "Invalid filter!"}), 400
+    if request.args.get("specialization"):
+        if user_type != "jobseeker":
+            return jsonify({"error": "Specialization filter applies to jobseekers only!"}), 400
+        conditions.append("SPECIALIZATION = %s")
+        params.append(request.args["specialization"])
+    limit = None
+    if export_format == "json":
+        page, error = validate_page(user_type, 1)
+        if error: return error
+        limit, after = page
+        if after:
+            conditions.append("ID > %s")
+            params.append(after[0])
+    query = f"SELECT {', '.join(columns)} FROM {table}"
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    query += " ORDER BY ID"
+    if limit:
+        query += " LIMIT %s"
+        params.append(limit + 1)
     try:
         conn = get_db_connection()
-        cursor = conn.cursor()
-        if role != "admin":
-            return jsonify({"error": "Access denied!"}), 401
-        if data["user_type"] == "jobseeker":
-            cursor.execute("""
-                SELECT ID, PHONE_NUMBER, NAME, EMAIL, DOB, HIGHEST_DEGREE, SPECIALIZATION, WORK_EXPERIENCE FROM JOBSEEKERS
-            """,)
-        elif data["user_type"] == "employer":
-            cursor.execute("""SELECT ID, PHONE_NUMBER, NAME, EMAIL, COMPANY_NAME FROM EMPLOYERS
-            """,)
-        else:
-            return jsonify({"error": "Invalid user type!"}), 400
+        cursor = conn.cursor(buffered=False)
+        cursor.execute(query, params)
+        if export_format != "json":
+            mimetype = "text/csv" if export_format == "csv" else "application/x-ndjson"
+            release = release_once(conn, cursor)
+            response = Response(stream_rows(cursor, release, columns, export_format), mimetype=mimetype)
+            response.headers["Content-Disposition"] = f"attachment; filename={table.lower()}.{export_format}"
+            response.call_on_close(release)
+            # The response closes them once the body has been sent, or skipped.
+            conn = cursor = None
+            return response
         result = cursor.fetchall()
-        return jsonify({"users": result}), 200
+        next_cursor = None
+        if len(result) > limit:
+            result = result[:limit]
+            next_cursor = encode_cursor([user_type, result[-1][0]])
+        return jsonify({"users": result, "next_cursor": next_cursor}), 200
     except Error as e:
+        record_error()
         return jsonify({"error": f"Database/server error: {str(e)}"}), 500
     except Exception as e:
+        record_error()
         return jsonify({"error": f"Unexpected error: {str(e)}"}), 500
     finally:
         if 'cursor' in locals() and cursor:
@@ -822,49 +4085,96 @@ def view_users(current_user, role):
         if 'conn' in locals() and conn:
             conn.close()
 
+@app.route("/rebuild_search_index", methods=["POST"])
+@token_required
+def rebuild_search_index(current_user, role):
+    if role != "admin":
+        return jsonify({"error": "Access denied!"}), 401
+    try:
+        with job_search_rebuilding:
+            job_search_index.rebuild()
+        if job_match_index is not None:
+            with job_match_rebuilding:
+                job_match_index.rebuild()
+        return jsonify({"message": "Search index rebuilt successfully!", "jobs": len(job_search_index.docs)}), 200
+    except Error as e:
+        record_error()
+        return jsonify({"error": f"Database/server error: {str(e)}"}), 500
+    except Exception as e:
+        record_error()
+        return jsonify({"error": f"Unexpected error: {str(e)}"}), 500
+
 @app.route("/delete_user", methods=["DELETE"])
 @token_required
 def delete_user(current_user, role):
     data, error = validate_json(["user_id", "user_type"])
     if error: return error
+    if role != "admin":
+        return jsonify({"error": "Access denied!"}), 401
+    table = USER_TABLES.get(data["user_type"])
+    if table is None:
+        return jsonify({"error": "Invalid user type!"}), 400
     try:
         conn = get_db_connection()
         cursor = conn.cursor()
-        if role != "admin":
-            return jsonify({"error": "Access denied!"}), 401
+        cursor.execute(f"""
+            SELECT ID, DELETED_AT FROM {table} 
+            WHERE ID = %s 
+            FOR UPDATE
+        """, (data["user_id"],))
+        result = cursor.fetchone()
+        if not result:
+            return jsonify({"error": "User not found!"}), 404
+        if result[1] is not None:
+            return jsonify({"error": "User deletion already in progress!"}), 409
+        # Only the soft delete happens here: the account can no longer log in and drops out of listings and search
+        # straight away. Its applications, jobs and the account row itself are removed by the background deleter.
+        cursor.execute(f"""
+            UPDATE {table} 
+            SET DELETED_AT = NOW() 
+            WHERE ID = %s
+        """, (result[0],))
+        cursor.execute("""
+            INSERT INTO USER_DELETIONS (USER_TYPE, USER_ID) 
+            VALUES (%s, %s)
+        """, (data["user_type"], result[0]))
+        deletion_id = cursor.lastrowid
+        revoked_at = revoke_tokens(cursor, data["user_type"], result[0])
         if data["user_type"] == "jobseeker":
             cursor.execute("""
-                SELECT ID FROM JOBSEEKERS 
-                WHERE ID = %s
-            """, (data["user_id"],))
-            result = cursor.fetchone()
-            if not result:
-                return jsonify({"error": "User not found!"}), 404
-            cursor.execute("""
-                DELETE FROM JOBSEEKERS 
-                WHERE ID = %s 
-            """, (data["user_id"],))
-        elif data["user_type"] == "employer":
-            cursor.execute("""
-                SELECT ID FROM EMPLOYERS 
-                WHERE ID = %s
-            """, (data["user_id"],))
-            result = cursor.fetchone()
-            if not result:
-                return jsonify({"error": "User not found!"}), 404
-            cursor.execute("""
-                DELETE FROM EMPLOYERS 
-                WHERE ID = %s 
-            """, (data["user_id"],))
+                SELECT JOB_ID FROM JOB_APPLICATIONS 
+                WHERE JOBSEEKER_ID = %s
+            """, (result[0],))
+            hidden_jobs = []
+            stale = [f"applications:{row[0]}" for row in cursor.fetchall()]
         else:
-            return jsonify({"error": "Invalid user type!"}), 400
+            cursor.execute("""
+                SELECT ID FROM JOBS 
+                WHERE EMPLOYER_ID = %s
+            """, (result[0],))
+            hidden_jobs = [row[0] for row in cursor.fetchall()]
+            stale = [f"jobs:{result[0]}"] + [f"applications:{job_id}" for job_id in hidden_jobs]
         conn.commit()
-        return jsonify({"message": "User deleted successfully!"}), 200
+        with token_revocations_lock:
+            key = (data["user_type"], result[0])
+            token_revocations[key] = max(revoked_at, token_revocations.get(key, 0))
+        unindex_jobs(hidden_jobs)
+        invalidate_listings(*stale)
+        user_deletions.wake()
+        return jsonify({"message": "User deletion started!", "deletion_id": deletion_id}), 202
+    except IntegrityError:
+        # USER_DELETIONS allows one unfinished deletion per user; finished ones no longer count.
+        record_error()
+        if 'conn' in locals() and conn:
+            conn.rollback()
+        return jsonify({"error": "User deletion already in progress!"}), 409
     except Error as e:
+        record_error()
         if 'conn' in locals() and conn:
             conn.rollback()
         return jsonify({"error": f"Database/server error: {str(e)}"}), 500
     except Exception as e:
+        record_error()
         if 'conn' in locals() and conn:
             conn.rollback()
         return jsonify({"error": f"Unexpected error: {str(e)}"}), 500
@@ -873,10 +4183,487 @@ def delete_user(current_user, role):
             cursor.close()
         if 'conn' in locals() and conn:
             conn.close()
-        
+
+@app.route("/user_deletion_status", methods=["GET"])
+@token_required
+def user_deletion_status(current_user, role):
+    if role != "admin":
+        return jsonify({"error": "Access denied!"}), 401
+    try:
+        deletion_id = request.args.get("deletion_id")
+        deletion_id = int(deletion_id) if deletion_id is not None else None
+    except ValueError:
+        return jsonify({"error": "Invalid deletion id!"}), 400
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor(dictionary=True)
+        columns = "ID, USER_TYPE, USER_ID, STATUS, APPLICATIONS_DELETED, JOBS_DELETED, LAST_ERROR, CREATED_AT, UPDATED_AT, FINISHED_AT"
+        if deletion_id is None:
+            cursor.execute(f"""
+                SELECT {columns} FROM USER_DELETIONS 
+                WHERE STATUS IN ('PENDING', 'RUNNING') 
+                ORDER BY ID
+            """)
+            return jsonify({"deletions": cursor.fetchall()}), 200
+        cursor.execute(f"""
+            SELECT {columns} FROM USER_DELETIONS 
+            WHERE ID = %s
+        """, (deletion_id,))
+        result = cursor.fetchone()
+        if not result:
+            return jsonify({"error": "Deletion not found!"}), 404
+        if result["STATUS"] != "DONE":
+            if result["USER_TYPE"] == "jobseeker":
+                cursor.execute("""
+                    SELECT COUNT(*) AS APPLICATIONS FROM JOB_APPLICATIONS 
+                    WHERE JOBSEEKER_ID = %s
+                """, (result["USER_ID"],))
+            else:
+                cursor.execute("""
+                    SELECT COUNT(DISTINCT J.ID) AS JOBS, COUNT(JA.ID) AS APPLICATIONS 
+                    FROM JOBS J LEFT JOIN JOB_APPLICATIONS JA ON JA.JOB_ID = J.ID 
+                    WHERE J.EMPLOYER_ID = %s
+                """, (result["USER_ID"],))
+            result["REMAINING"] = cursor.fetchone()
+        return jsonify(result), 200
+    except Error as e:
+        record_error()
+        return jsonify({"error": f"Database/server error: {str(e)}"}), 500
+    except Exception as e:
+        record_error()
+        return jsonify({"error": f"Unexpected error: {str(e)}"}), 500
+    finally:
+        if 'cursor' in locals() and cursor:
+            cursor.close()
+        if 'conn' in locals() and conn:
+            conn.close()
+
+
+# ---------------- CLI COMMANDS ----------------
+@app.cli.command("migrate-resumes")
+@click.option("--batch-size", default=50, show_default=True, help="Applications moved per transaction.")
+def migrate_resumes(batch_size):
+    """Move JOB_APPLICATIONS.RESUME_DATA blobs into the resume store."""
+    store = get_resume_store()
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        moved, last_id = 0, 0
+        while True:
+            cursor.execute("""
+                SELECT ID FROM JOB_APPLICATIONS 
+                WHERE ID > %s AND RESUME_SHA256 IS NULL AND RESUME_DATA IS NOT NULL 
+                ORDER BY ID 
+                LIMIT %s
+            """, (last_id, batch_size))
+            ids = [row[0] for row in cursor.fetchall()]
+            if not ids:
+                break
+            for application_id in ids:
+                # One blob in memory at a time.
+                cursor.execute("""
+                    SELECT RESUME_DATA FROM JOB_APPLICATIONS 
+                    WHERE ID = %s
+                """, (application_id,))
+                resume_key, resume_size = store.save(io.BytesIO(cursor.fetchone()[0]))
+                cursor.execute("""
+                    UPDATE JOB_APPLICATIONS 
+                    SET RESUME_SHA256 = %s, RESUME_SIZE = %s, RESUME_DATA = NULL 
+                    WHERE ID = %s
+                """, (resume_key, resume_size, application_id))
+            conn.commit()
+            moved += len(ids)
+            last_id = ids[-1]
+            click.echo(f"Moved {moved} resumes.")
+        click.echo(f"Resume migration complete. {moved} resumes moved.")
+    finally:
+        cursor.close()
+        conn.close()
+
+
+@app.cli.command("migrate")
+def migrate():
+    """Apply pending schema migrations."""
+    init_db()
+    click.echo("Database migrated successfully.")
+
+# Every query a route runs on a request path, with sample binds. view_users is an admin listing and scans by design.
+QUERY_PLAN_CHECKS = [
+    ("register_unverified.delete", "DELETE FROM JOBSEEKERS WHERE IS_VERIFIED = 0 AND (PHONE_NUMBER = %s OR EMAIL = %s)", ("0000000000", "a@b.c")),
+    ("register_unverified.select", "SELECT IS_VERIFIED FROM JOBSEEKERS WHERE PHONE_NUMBER = %s AND EMAIL = %s", ("0000000000", "a@b.c")),
+    ("register_verified.select", "SELECT IS_VERIFIED FROM EMPLOYERS WHERE PHONE_NUMBER = %s AND EMAIL = %s", ("0000000000", "a@b.c")),
+    ("login.jobseeker", "SELECT IS_VERIFIED, ID, SPECIALIZATION, WORK_EXPERIENCE FROM JOBSEEKERS WHERE PHONE_NUMBER = %s", ("0000000000",)),
+    ("login.employer", "SELECT IS_VERIFIED, ID FROM EMPLOYERS WHERE PHONE_NUMBER = %s", ("0000000000",)),
+    ("view_posted_jobs.jobs", "SELECT JOB_TITLE, SPECIALIZATION, MINIMUM_WORK_EXPERIENCE, LOCATION, SALARY, EMPLOYER_ID FROM JOBS WHERE EMPLOYER_ID = %s", (1,)),
+    ("delete_job.owner", "SELECT EMPLOYER_ID FROM JOBS WHERE ID = %s", (1,)),
+    ("view_job_applications.applicants", "SELECT JA.ID, JS.PHONE_NUMBER, JS.NAME FROM JOBSEEKERS JS INNER JOIN JOB_APPLICATIONS JA ON JS.ID = JA.JOBSEEKER_ID WHERE JA.JOB_ID = %s", (1,)),
+    ("view_resume.owner", "SELECT J.EMPLOYER_ID, JA.RESUME_NAME, JA.RESUME_SHA256 FROM JOB_APPLICATIONS JA INNER JOIN JOBS J ON J.ID = JA.JOB_ID INNER JOIN JOBSEEKERS JS ON JS.ID = JA.JOBSEEKER_ID AND JS.DELETED_AT IS NULL WHERE JA.ID = %s", (1,)),
+    ("view_active_jobs.jobs", """
+        SELECT E.COMPANY_NAME, J.ID, J.JOB_TITLE FROM JOBS J INNER JOIN EMPLOYERS E ON E.ID = J.EMPLOYER_ID 
+        LEFT JOIN JOB_APPLICATIONS JA ON JA.JOB_ID = J.ID AND JA.JOBSEEKER_ID = %s 
+        WHERE J.SPEC_KEY = %s AND J.MINIMUM_WORK_EXPERIENCE <= %s AND JA.ID IS NULL AND J.ID > %s 
+        ORDER BY J.ID LIMIT 51
+    """, (1, "COMPUTER SCIENCE", 5, 0)),
+    ("view_active_jobs.jobs_by_salary", """
+        SELECT E.COMPANY_NAME, J.ID, J.JOB_TITLE FROM JOBS J INNER JOIN EMPLOYERS E ON E.ID = J.EMPLOYER_ID 
+        LEFT JOIN JOB_APPLICATIONS JA ON JA.JOB_ID = J.ID AND JA.JOBSEEKER_ID = %s 
+        WHERE J.SPEC_KEY = %s AND J.MINIMUM_WORK_EXPERIENCE <= %s AND JA.ID IS NULL 
+        AND (J.SALARY < %s OR (J.SALARY = %s AND J.ID < %s)) 
+        ORDER BY J.SALARY DESC, J.ID DESC LIMIT 51
+    """, (1, "COMPUTER SCIENCE", 5, 100000, 100000, 10)),
+    ("job_apply.job", """
+        SELECT J.MINIMUM_WORK_EXPERIENCE, J.SPEC_KEY = %s, J.ID, J.EMPLOYER_ID, JS.WORK_EXPERIENCE, JS.HIGHEST_DEGREE, JA.ID 
+        FROM JOBS J INNER JOIN JOBSEEKERS JS ON JS.ID = %s AND JS.DELETED_AT IS NULL 
+        INNER JOIN EMPLOYERS E ON E.ID = J.EMPLOYER_ID AND E.DELETED_AT IS NULL 
+        LEFT JOIN JOB_APPLICATIONS JA ON JA.JOB_ID = J.ID AND JA.JOBSEEKER_ID = JS.ID 
+        WHERE J.ID = %s
+    """, ("COMPUTER SCIENCE", 1, 1)),
+    ("resume_index.pending", "SELECT ID, JOB_ID, RESUME_SHA256 FROM JOB_APPLICATIONS WHERE RESUME_INDEX_STATUS = %s AND RESUME_SHA256 IS NOT NULL ORDER BY ID LIMIT %s", (0, 20)),
+    ("search_applicants.postings", "SELECT T.APPLICATION_ID, T.TERM, T.FREQUENCY, JA.RESUME_TERM_COUNT FROM RESUME_TERMS T INNER JOIN JOB_APPLICATIONS JA ON JA.ID = T.APPLICATION_ID WHERE T.JOB_ID = %s AND T.TERM IN (%s, %s)", (1, "python", "sql")),
+    ("applicant_summary.employer", "SELECT S.DIMENSION, S.BUCKET, SUM(S.APPLICANTS) FROM JOBS J INNER JOIN JOB_APPLICANT_SUMMARY S ON S.JOB_ID = J.ID WHERE J.EMPLOYER_ID = %s GROUP BY S.DIMENSION, S.BUCKET", (1,)),
+    ("recommended_jobs.profile", "SELECT JS.HIGHEST_DEGREE, JA.JOB_ID FROM JOBSEEKERS JS LEFT JOIN JOB_APPLICATIONS JA ON JA.JOBSEEKER_ID = JS.ID WHERE JS.ID = %s", (1,)),
+    ("job_alerts.jobseekers", "SELECT ID FROM JOBSEEKERS WHERE SPEC_KEY = %s AND IS_VERIFIED = 1 AND ID > %s AND WORK_EXPERIENCE >= %s ORDER BY ID LIMIT 500", ("COMPUTER SCIENCE", 0, 2)),
+    ("job_alerts.digest", "SELECT DISTINCT JOBSEEKER_ID FROM JOB_ALERT_RECIPIENTS WHERE JOBSEEKER_ID > %s ORDER BY JOBSEEKER_ID LIMIT 500", (0,)),
+    ("delete_user.applications", "SELECT JOB_ID FROM JOB_APPLICATIONS WHERE JOBSEEKER_ID = %s", (1,)),
+    ("user_deletions.applications", "SELECT JA.ID, JA.JOB_ID, J.EMPLOYER_ID FROM JOB_APPLICATIONS JA INNER JOIN JOBS J ON J.ID = JA.JOB_ID WHERE JA.JOBSEEKER_ID = %s ORDER BY JA.ID LIMIT 200", (1,)),
+    ("user_deletions.jobs", "SELECT ID FROM JOBS WHERE EMPLOYER_ID = %s ORDER BY ID LIMIT 200", (1,)),
+    ("user_deletions.queue", "SELECT ID, USER_TYPE, USER_ID FROM USER_DELETIONS WHERE STATUS IN ('PENDING', 'RUNNING') AND ID > %s ORDER BY ID LIMIT 1", (0,)),
+    ("search_jobs.browse", "SELECT J.ID, J.JOB_TITLE FROM JOBS J INNER JOIN EMPLOYERS E ON E.ID = J.EMPLOYER_ID WHERE E.DELETED_AT IS NULL AND J.ID > %s ORDER BY J.ID LIMIT 21", (0,)),
+    ("search_index.rebuild", "SELECT J.ID, J.JOB_TITLE FROM JOBS J INNER JOIN EMPLOYERS E ON E.ID = J.EMPLOYER_ID WHERE J.ID > %s AND E.DELETED_AT IS NULL ORDER BY J.ID LIMIT 10000", (0,)),
+    ("token_revocations.refresh", "SELECT ID, ROLE, USER_ID, REVOKED_AT FROM TOKEN_REVOCATIONS WHERE ID > %s AND REVOKED_AT > %s ORDER BY ID", (0, 0)),
+    ("view_users.page", "SELECT ID, PHONE_NUMBER, NAME FROM JOBSEEKERS WHERE ID > %s ORDER BY ID LIMIT 51", (0,)),
+    ("reaper.unverified", "DELETE FROM JOBSEEKERS WHERE IS_VERIFIED = 0 AND CREATED_AT < NOW() LIMIT 500", ()),
+    ("reaper.resumes", "SELECT DISTINCT RESUME_SHA256 FROM JOB_APPLICATIONS WHERE RESUME_SHA256 IN (%s, %s)", ("0" * 64, "1" * 64)),
+    ("notifications.claim", "SELECT ID FROM NOTIFICATIONS WHERE STATUS IN ('PENDING', 'SENDING') AND NEXT_ATTEMPT_AT <= NOW() ORDER BY NEXT_ATTEMPT_AT LIMIT 20", ()),
+]
+
+@app.cli.command("check-query-plans")
+def check_query_plans():
+    """EXPLAIN every route query and fail if any of them scans a whole table."""
+    conn = get_db_connection()
+    cursor = conn.cursor(dictionary=True)
+    failures = []
+    try:
+        for name, query, params in QUERY_PLAN_CHECKS:
+            cursor.execute("EXPLAIN " + query, params)
+            for row in cursor.fetchall():
+                # ALL is a full table scan, index a full index scan; both grow linearly with the table.
+                if row.get("type") in ("ALL", "index"):
+                    failures.append(f"{name}: {row['type']} scan on {row.get('table')}")
+        conn.rollback()
+    finally:
+        cursor.close()
+        conn.close()
+    for failure in failures:
+        click.echo(failure, err=True)
+    if failures:
+        raise SystemExit(1)
+    click.echo(f"{len(QUERY_PLAN_CHECKS)} query plans checked, no full scans.")
+
+@app.cli.command("reap")
+def reap():
+    """Delete stale unverified registrations and old notifications once."""
+    counts = reaper.run()
+    if counts is None:
+        click.echo("Another reaper is running, nothing done.")
+        return
+    for key, value in counts.items():
+        click.echo(f"{key}: {value}")
+
+@app.cli.command("send-job-alerts")
+def send_job_alerts():
+    """Fan out queued job postings and send the digest emails once."""
+    counts = job_alerts.run()
+    if counts is None:
+        click.echo("Another job alert run is in progress, nothing done.")
+        return
+    for key, value in counts.items():
+        click.echo(f"{key}: {value}")
+
+@app.cli.command("index-resumes")
+@click.option("--reindex", is_flag=True, help="Extract every stored resume again, not only those never indexed.")
+def index_resumes_command(reindex):
+    """Extract and index the text of uploaded resumes once, for applicant search."""
+    if reindex:
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        try:
+            while True:
+                cursor.execute("""
+                    UPDATE JOB_APPLICATIONS 
+                    SET RESUME_INDEX_STATUS = %s 
+                    WHERE RESUME_INDEX_STATUS <> %s 
+                    LIMIT %s
+                """, (RESUME_PENDING, RESUME_PENDING, BULK_CHUNK_SIZE))
+                conn.commit()
+                if cursor.rowcount < BULK_CHUNK_SIZE:
+                    break
+        finally:
+            cursor.close()
+            conn.close()
+    try:
+        counts = resume_indexer.run()
+    finally:
+        close_resume_index_pool()
+    if counts is None:
+        click.echo("Another process is indexing resumes, nothing done.")
+        return
+    for key, value in counts.items():
+        click.echo(f"{key}: {value}")
+
+@app.cli.command("purge-deleted-users")
+def purge_deleted_users():
+    """Run queued account deletions to completion once."""
+    counts = user_deletions.run()
+    if counts is None:
+        click.echo("Another process is deleting accounts, nothing done.")
+        return
+    for key, value in counts.items():
+        click.echo(f"{key}: {value}")
+
+@app.cli.command("recount-applicants")
+@click.option("--batch-size", default=1000, show_default=True, help="Jobs recounted per transaction.")
+def recount_applicants(batch_size):
+    """Rebuild APPLICANT_COUNT and JOB_APPLICANT_SUMMARY from JOB_APPLICATIONS."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        recounted, last_id = 0, 0
+        while True:
+            # Locking the job rows first makes concurrent applications wait for this batch, so none of their
+            # increments is lost or counted twice.
+            cursor.execute("""
+                SELECT ID FROM JOBS 
+                WHERE ID > %s 
+                ORDER BY ID 
+                LIMIT %s 
+                FOR UPDATE
+            """, (last_id, batch_size))
+            job_ids = [row[0] for row in cursor.fetchall()]
+            if not job_ids:
+                conn.commit()
+                break
+            placeholders = ", ".join(["%s"] * len(job_ids))
+            cursor.execute(f"""
+                SELECT JA.JOB_ID, JS.WORK_EXPERIENCE, JS.HIGHEST_DEGREE 
+                FROM JOB_APPLICATIONS JA INNER JOIN JOBSEEKERS JS ON JS.ID = JA.JOBSEEKER_ID 
+                WHERE JA.JOB_ID IN ({placeholders})
+            """, job_ids)
+            totals, summary = dict.fromkeys(job_ids, 0), {}
+            for job_id, work_experience, highest_degree in cursor.fetchall():
+                totals[job_id] += 1
+                for key in ((job_id, "experience", experience_bracket(work_experience)), (job_id, "degree", degree_bucket(highest_degree))):
+                    summary[key] = summary.get(key, 0) + 1
+            cursor.execute(f"""
+                DELETE FROM JOB_APPLICANT_SUMMARY 
+                WHERE JOB_ID IN ({placeholders})
+            """, job_ids)
+            if summary:
+                cursor.executemany("""
+                    INSERT INTO JOB_APPLICANT_SUMMARY (JOB_ID, DIMENSION, BUCKET, APPLICANTS) 
+                    VALUES (%s, %s, %s, %s)
+                """, [(*key, applicants) for key, applicants in summary.items()])
+            cursor.executemany("""
+                UPDATE JOBS 
+                SET APPLICANT_COUNT = %s 
+                WHERE ID = %s
+            """, [(total, job_id) for job_id, total in totals.items()])
+            conn.commit()
+            recounted += len(job_ids)
+            last_id = job_ids[-1]
+        click.echo(f"Recounted applicants for {recounted} jobs.")
+    finally:
+        cursor.close()
+        conn.close()
+
+
+# ---------------- SERVER ----------------
+background_workers_pid = None
+background_workers_lock = threading.Lock()
+
+def start_background_workers():
+    # Once per process: a forked worker has none of its parent's threads, so it starts its own.
+    global background_workers_pid
+    with background_workers_lock:
+        if background_workers_pid == os.getpid():
+            return
+        background_workers_pid = os.getpid()
+    start_notification_workers()
+    if REAPER_ENABLED:
+        reaper.start()
+    if JOB_ALERTS_ENABLED:
+        job_alerts.start()
+    if RESUME_INDEX_ENABLED:
+        start_resume_indexer()
+    user_deletions.start()
+    atexit.register(stop_background_workers, SERVE_DRAIN_SECONDS)
+
+def stop_background_workers(timeout=None):
+    stop_notification_workers(timeout)
+    reaper.stop(timeout)
+    job_alerts.stop(timeout)
+    stop_resume_indexer(timeout)
+    user_deletions.stop(timeout)
+
+@app.before_request
+def ensure_background_workers():
+    if BACKGROUND_WORKERS_ENABLED and background_workers_pid != os.getpid():
+        start_background_workers()
+
+class WorkerServer(BaseWSGIServer):
+    # Serves requests on a fixed pool of threads and can drain them before exiting.
+    def __init__(self, host, port, threads, fd=None):
+        super().__init__(host, port, app, fd=fd)
+        self.executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="http")
+        self.in_flight = 0
+        self.idle = threading.Condition()
+
+    def process_request(self, request, client_address):
+        with self.idle:
+            self.in_flight += 1
+        self.executor.submit(self.process_request_thread, request, client_address)
+
+    def process_request_thread(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+            with self.idle:
+                self.in_flight -= 1
+                self.idle.notify_all()
+
+    def drain(self, timeout):
+        # serve_forever() has returned, so nothing new is accepted; wait for what was already taken.
+        deadline = time.monotonic() + timeout
+        with self.idle:
+            while self.in_flight and time.monotonic() < deadline:
+                self.idle.wait(deadline - time.monotonic())
+            left = self.in_flight
+        self.executor.shutdown(wait=not left)
+        self.server_close()
+        return left
+
+def run_worker(host, port, threads, drain_seconds, fd=None):
+    server = WorkerServer(host, port, threads, fd=fd)
+    stopping = threading.Event()
+
+    def handle_stop(signum, frame):
+        # shutdown() blocks until serve_forever() returns, and that loop runs on this thread.
+        if not stopping.is_set():
+            stopping.set()
+            threading.Thread(target=server.shutdown, daemon=True).start()
+
+    signal.signal(signal.SIGTERM, handle_stop)
+    signal.signal(signal.SIGINT, handle_stop)
+    if DB_POOL_ENABLED:
+        get_db_pool().warm_up()
+    if BACKGROUND_WORKERS_ENABLED:
+        start_background_workers()
+    print(f"Worker {os.getpid()} serving on {host}:{port} with {threads} threads.")
+    try:
+        server.serve_forever()
+    finally:
+        left = server.drain(drain_seconds)
+        if left:
+            app.logger.warning(f"Worker {os.getpid()} stopped with {left} requests still running.")
+        stop_background_workers(drain_seconds)
+        close_db_pool()
+
+def run_server(host, port, workers, threads, drain_seconds):
+    if workers > 1 and OTP_STORE == "memory":
+        # An OTP sent by one worker could never be verified by another. Checked here so `python app.py` gets it too.
+        raise ValueError("OTP_STORE=memory only works with one worker; set OTP_STORE=redis.")
+    if workers == 1:
+        run_worker(host, port, threads, drain_seconds)
+        return
+    # The socket is bound once here and inherited, so every worker accepts from the same queue.
+    sock = socket.create_server((host, port), family=socket.AF_INET6 if ":" in host else socket.AF_INET, backlog=128)
+    sock.set_inheritable(True)
+    # Connections opened by init_db() must not be shared with the children.
+    close_db_pool()
+    children = set()
+    stopping = threading.Event()
+
+    def spawn():
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                run_worker(host, port, threads, drain_seconds, fd=sock.fileno())
+            except Exception as e:
+                app.logger.error(f"Worker {os.getpid()} failed: {str(e)}")
+                code = 1
+            finally:
+                os._exit(code)
+        children.add(pid)
+
+    def kill_stragglers():
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+
+    def handle_stop(signum, frame):
+        if stopping.is_set():
+            return
+        stopping.set()
+        sock.close()
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        timer = threading.Timer(drain_seconds + 5, kill_stragglers)
+        timer.daemon = True
+        timer.start()
+
+    signal.signal(signal.SIGTERM, handle_stop)
+    signal.signal(signal.SIGINT, handle_stop)
+    for _ in range(workers):
+        spawn()
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        children.discard(pid)
+        if not stopping.is_set():
+            app.logger.error(f"Worker {pid} exited with status {status}, restarting.")
+            time.sleep(1)
+            spawn()
+    sock.close()
+
+@app.cli.command("serve")
+@click.option("--host", default=SERVE_HOST, show_default=True)
+@click.option("--port", default=SERVE_PORT, show_default=True)
+@click.option("--workers", default=SERVE_WORKERS, show_default=True, help="Worker processes (pre-forked).")
+@click.option("--threads", default=SERVE_THREADS, show_default=True, help="Request threads per worker.")
+@click.option("--drain-seconds", default=SERVE_DRAIN_SECONDS, show_default=True, help="How long shutdown waits for in-flight requests.")
+@click.option("--migrate/--no-migrate", default=False, help="Apply schema migrations once before the workers start.")
+def serve(host, port, workers, threads, drain_seconds, migrate):
+    """Run the production server."""
+    if workers < 1 or threads < 1:
+        raise click.UsageError("--workers and --threads must be at least 1.")
+    if workers > 1 and not hasattr(os, "fork"):
+        raise click.UsageError("Multiple workers need os.fork(); use --workers 1 with more --threads instead.")
+    if workers > 1 and RATE_LIMIT_ENABLED and RATE_LIMIT_STORE == "memory":
+        click.echo("Warning: RATE_LIMIT_STORE=memory limits each worker separately.")
+    if workers > 1 and LISTING_CACHE_ENABLED and LISTING_CACHE_STORE == "memory":
+        click.echo("Warning: LISTING_CACHE_STORE=memory can serve listings up to LISTING_CACHE_SECONDS stale across workers.")
+    if migrate:
+        init_db()
+        click.echo("Database migrated successfully.")
+    try:
+        run_server(host, port, workers, threads, drain_seconds)
+    except ValueError as e:
+        raise click.UsageError(str(e))
+
 
 # ---------------- MAIN FUNCTION ----------------
 if __name__ == '__main__':
     init_db()
     print("Database initiated successfully.")
-    app.run(debug=True)
\ No newline at end of file
+    run_server(SERVE_HOST, SERVE_PORT, SERVE_WORKERS, SERVE_THREADS, SERVE_DRAIN_SECONDS)
\ No newline at end of file
@@ -0,0 +1,632 @@
+import argparse, statistics, threading, time, os, io, json, random, subprocess, platform, datetime
+import mysql.connector
+
+# The route benchmark must never reach Twilio, a real mailbox or the rate limits, and runs without the
+# background threads. app reads its configuration at import time, so the stand-ins are chosen before it is imported.
+os.environ.setdefault("NOTIFY_TRANSPORT", "fake")
+os.environ.setdefault("RATE_LIMIT_ENABLED", "0")
+os.environ.setdefault("BACKGROUND_WORKERS_ENABLED", "0")
+import app as portal
+from app import db_config, ConnectionPool, MemoryRateLimiter, RedisRateLimiter, deliver_batch, new_delivery_loop
+
+
+# ---------------- HELPERS ----------------
+def percentile(samples, p):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+def run_query(conn, query):
+    cursor = conn.cursor()
+    cursor.execute(query)
+    cursor.fetchall()
+    cursor.close()
+
+def drive(get_connection, query, iterations, threads):
+    latencies = []
+    lock = threading.Lock()
+    def worker(n):
+        local = []
+        for _ in range(n):
+            start = time.perf_counter()
+            conn = get_connection()
+            try:
+                run_query(conn, query)
+            finally:
+                conn.close()
+            local.append((time.perf_counter() - start) * 1000)
+        with lock:
+            latencies.extend(local)
+    per_thread = max(1, iterations // threads)
+    workers = [threading.Thread(target=worker, args=(per_thread,)) for _ in range(threads)]
+    start = time.perf_counter()
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    return summarize(latencies, time.perf_counter() - start)
+
+def summarize(latencies, elapsed):
+    return {
+        "requests": len(latencies),
+        "throughput": len(latencies) / elapsed if elapsed else 0.0,
+        "mean_ms": statistics.fmean(latencies) if latencies else 0.0,
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95),
+        "p99_ms": percentile(latencies, 99)
+    }
+
+def report(name, result):
+    print(f"{name:<28} {result['requests']:>8} req  {result['throughput']:>9.1f} req/s  "
+          f"mean {result['mean_ms']:.3f} ms  p50 {result['p50_ms']:.3f} ms  "
+          f"p95 {result['p95_ms']:.3f} ms  p99 {result['p99_ms']:.3f} ms")
+
+BENCH_OTP = "123456"
+BENCH_PDF = b"%PDF-1.4\n1 0 obj << /Type /Catalog >> endobj\ntrailer << /Root 1 0 R >>\n%%EOF\n"
+SPECIALIZATIONS = ["Computer Science", "Mechanical", "Civil", "Electrical", "Information Technology",
+                   "Data Science", "Electronics and Communication", "Chemical", "Finance", "Marketing"]
+LOCATIONS = ["Bangalore", "Pune", "Hyderabad", "Chennai", "Delhi", "Mumbai", "Kolkata", "Noida", "Gurgaon", "Remote"]
+TITLES = ["Engineer", "Senior Engineer", "Analyst", "Developer", "Consultant", "Manager", "Intern", "Architect"]
+DEGREES = ["B.Tech", "M.Tech", "B.Sc", "M.Sc", "MBA", "PhD"]
+
+def insert_rows(conn, query, rows, chunk_size):
+    inserted = 0
+    cursor = conn.cursor()
+    try:
+        for chunk in portal.chunked(rows, chunk_size):
+            cursor.executemany(query, chunk)
+            inserted += cursor.rowcount
+            conn.commit()
+    finally:
+        cursor.close()
+    return inserted
+
+def count_rows(conn):
+    cursor = conn.cursor()
+    counts = {}
+    try:
+        for table in ("EMPLOYERS", "JOBSEEKERS", "JOBS", "JOB_APPLICATIONS"):
+            cursor.execute(f"SELECT COUNT(*) FROM {table}")
+            counts[table.lower()] = cursor.fetchone()[0]
+    finally:
+        cursor.close()
+    return counts
+
+def query_counts():
+    # Statements executed so far per route, from the app's own db_query_duration_seconds histogram.
+    counts = {}
+    with portal.db_query_latency.lock:
+        for (route, statement), series in portal.db_query_latency.values.items():
+            counts[route] = counts.get(route, 0) + series[2]
+    return counts
+
+class RouteContext:
+    # Sample users and rows read from the seeded database, plus the tokens the routes expect.
+    def __init__(self, conn, sample_size):
+        cursor = conn.cursor()
+        try:
+            cursor.execute("""
+                SELECT ID, PHONE_NUMBER, SPECIALIZATION, WORK_EXPERIENCE FROM JOBSEEKERS 
+                WHERE IS_VERIFIED = 1 
+                ORDER BY RAND() LIMIT %s
+            """, (sample_size,))
+            self.jobseekers = cursor.fetchall()
+            cursor.execute("""
+                SELECT E.ID, E.PHONE_NUMBER FROM EMPLOYERS E 
+                WHERE E.IS_VERIFIED = 1 AND EXISTS (SELECT 1 FROM JOBS J WHERE J.EMPLOYER_ID = E.ID) 
+                ORDER BY RAND() LIMIT %s
+            """, (sample_size,))
+            self.employers = cursor.fetchall()
+            cursor.execute("""
+                SELECT J.ID, J.EMPLOYER_ID, J.SPEC_KEY, J.MINIMUM_WORK_EXPERIENCE FROM JOBS J 
+                ORDER BY RAND() LIMIT %s
+            """, (sample_size,))
+            self.jobs = cursor.fetchall()
+            cursor.execute("""
+                SELECT JA.ID, JA.JOB_ID, J.EMPLOYER_ID FROM JOB_APPLICATIONS JA INNER JOIN JOBS J ON J.ID = JA.JOB_ID 
+                ORDER BY RAND() LIMIT %s
+            """, (sample_size,))
+            self.applications = cursor.fetchall()
+        finally:
+            cursor.close()
+        if not (self.jobseekers and self.employers and self.jobs and self.applications):
+            raise SystemExit("The database has no benchmark data; run `benchmark.py seed` first.")
+        # Same claims login_verified puts in its tokens.
+        self.jobseeker_tokens = {row[0]: portal.generate_token({"user": row[1], "role": "jobseeker", "id": row[0],
+                                                                "specialization": row[2], "work_experience": row[3]})
+                                 for row in self.jobseekers}
+        self.employer_tokens = {row[0]: portal.generate_token({"user": row[1], "role": "employer", "id": row[0]})
+                                for row in self.employers}
+        self.admin_token = portal.generate_token({"user": portal.ADMIN_ID, "role": "admin"})
+        self.bench_jobs = []
+        self.endpoints = {}
+        self.lock = threading.Lock()
+        self.counter = 0
+
+    def employer_token(self, employer_id):
+        token = self.employer_tokens.get(employer_id)
+        if token is None:
+            token = self.employer_tokens[employer_id] = portal.generate_token({"role": "employer", "id": employer_id})
+        return token
+
+    def next_number(self):
+        with self.lock:
+            self.counter += 1
+            return self.counter
+
+class RouteDriver:
+    def __init__(self, ctx, rng, run_id):
+        self.ctx = ctx
+        self.rng = rng
+        self.run_id = run_id
+        self.client = portal.app.test_client()
+        self.samples = {}
+
+    def call(self, name, method, path, token=None, **kwargs):
+        headers = {"Authorization": f"Bearer {token}"} if token else {}
+        start = time.perf_counter()
+        response = self.client.open(path, method=method, headers=headers, **kwargs)
+        response.get_data()
+        elapsed = (time.perf_counter() - start) * 1000
+        self.samples.setdefault(name, []).append((elapsed, response.status_code))
+        if name not in self.ctx.endpoints:
+            # Query counts are labelled by view function, which is not always the URL (/post_job is post_jobs).
+            self.ctx.endpoints[name] = portal.app.url_map.bind("localhost").match(path.split("?")[0], method=method)[0]
+        return response
+
+    def jobseeker(self):
+        row = self.rng.choice(self.ctx.jobseekers)
+        return row, self.ctx.jobseeker_tokens[row[0]]
+
+    def employer(self):
+        row = self.rng.choice(self.ctx.employers)
+        return row, self.ctx.employer_tokens[row[0]]
+
+    def unique_phone(self):
+        # 7xxxxxxxxx never collides with the seeded 8/9 prefixed numbers.
+        return f"7{self.run_id % 1000:03d}{self.ctx.next_number():06d}"
+
+    def view_active_jobs(self):
+        self.call("view_active_jobs", "GET", "/view_active_jobs?limit=20&sort=" + self.rng.choice(["id", "salary"]), self.jobseeker()[1])
+
+    def search_jobs(self):
+        query = self.rng.choice(TITLES).split()[0].lower()[:self.rng.randint(3, 6)]
+        self.call("search_jobs", "GET", f"/search_jobs?q={query}&location={self.rng.choice(LOCATIONS)}", self.jobseeker()[1])
+
+    def recommended_jobs(self):
+        self.call("recommended_jobs", "GET", "/recommended_jobs?limit=20", self.jobseeker()[1])
+
+    def view_posted_jobs(self):
+        self.call("view_posted_jobs", "GET", "/view_posted_jobs", self.employer()[1])
+
+    def view_job_applications(self):
+        application_id, job_id, employer_id = self.rng.choice(self.ctx.applications)
+        self.call("view_job_applications", "POST", "/view_job_applications", self.ctx.employer_token(employer_id), json={"job_id": job_id})
+
+    def view_resume(self):
+        application_id, job_id, employer_id = self.rng.choice(self.ctx.applications)
+        self.call("view_resume", "POST", "/view_resume", self.ctx.employer_token(employer_id), json={"job_application_id": application_id})
+
+    def view_resume_denied(self):
+        # Another employer asking for the resume: must be turned away before anything is read from storage.
+        application_id, job_id, employer_id = self.rng.choice(self.ctx.applications)
+        employer = next((row for row in self.ctx.employers if row[0] != employer_id), None)
+        if employer is None:
+            return self.view_resume()
+        self.call("view_resume_denied", "POST", "/view_resume", self.ctx.employer_tokens[employer[0]], json={"job_application_id": application_id})
+
+    def export_resumes(self):
+        application_id, job_id, employer_id = self.rng.choice(self.ctx.applications)
+        self.call("export_resumes", "POST", "/export_resumes", self.ctx.employer_token(employer_id), json={"job_id": job_id})
+
+    def job_apply(self):
+        seeker, token = self.jobseeker()
+        matching = [job for job in self.ctx.jobs if job[2] == seeker[2].upper() and job[3] <= seeker[3]]
+        job = self.rng.choice(matching or self.ctx.jobs)
+        self.call("job_apply", "POST", "/job_apply", token, content_type="multipart/form-data",
+                  data={"job_id": str(job[0]), "resume": (io.BytesIO(BENCH_PDF), "resume.pdf")})
+
+    def post_job(self):
+        employer, token = self.employer()
+        self.call("post_job", "POST", "/post_job", token, json={
+            "job_title": f"Bench {self.run_id} {self.ctx.next_number()}", "specialization": self.rng.choice(SPECIALIZATIONS),
+            "minimum_work_experience": self.rng.randint(0, 10), "location": self.rng.choice(LOCATIONS),
+            "salary": self.rng.randrange(200000, 3000000, 10000)})
+
+    def post_jobs_bulk(self):
+        employer, token = self.employer()
+        rows = [{"job_title": f"Bench {self.run_id} {self.ctx.next_number()}", "specialization": self.rng.choice(SPECIALIZATIONS),
+                 "minimum_work_experience": self.rng.randint(0, 10), "location": self.rng.choice(LOCATIONS),
+                 "salary": self.rng.randrange(200000, 3000000, 10000)} for _ in range(20)]
+        response = self.call("post_jobs_bulk", "POST", "/post_jobs_bulk", token, json=rows)
+        if response.status_code == 201:
+            created = [result["job_id"] for result in response.get_json()["results"] if result["status"] == "created"]
+            with self.ctx.lock:
+                self.ctx.bench_jobs.append((employer[0], token, created))
+
+    def delete_job(self):
+        with self.ctx.lock:
+            batch = next((batch for batch in self.ctx.bench_jobs if batch[2]), None)
+            job_id = batch[2].pop() if batch else None
+        if job_id is None:
+            return self.post_jobs_bulk()
+        self.call("delete_job", "DELETE", "/delete_job", batch[1], json={"job_id": job_id})
+
+    def delete_jobs_bulk(self):
+        with self.ctx.lock:
+            batch = self.ctx.bench_jobs.pop() if self.ctx.bench_jobs else None
+        if batch is None or not batch[2]:
+            return self.post_jobs_bulk()
+        self.call("delete_jobs_bulk", "DELETE", "/delete_jobs_bulk", batch[1], json={"job_ids": batch[2]})
+
+    def login(self):
+        seeker, _ = self.jobseeker()
+        self.call("login_unverified", "PUT", "/login_unverified", json={"phone_number": seeker[1], "role": "jobseeker"})
+        self.call("login_verified", "PUT", "/login_verified", json={"phone_number": seeker[1], "phone_otp": BENCH_OTP, "role": "jobseeker"})
+
+    def register_jobseeker(self):
+        phone = self.unique_phone()
+        email = f"bench{phone}@bench.test"
+        self.call("register_jobseeker_unverified", "POST", "/register_jobseeker_unverified", json={
+            "phone_number": phone, "name": "Bench Seeker", "email": email, "dob": "1999-01-01",
+            "highest_degree": self.rng.choice(DEGREES), "specialization": self.rng.choice(SPECIALIZATIONS),
+            "work_experience": self.rng.randint(0, 15)})
+        self.call("register_jobseeker_verified", "PUT", "/register_jobseeker_verified", json={
+            "phone_number": phone, "email": email, "phone_otp": BENCH_OTP, "email_otp": BENCH_OTP})
+
+    def register_employer(self):
+        phone = self.unique_phone()
+        email = f"bench{phone}@bench.test"
+        self.call("register_employer_unverified", "POST", "/register_employer_unverified", json={
+            "phone_number": phone, "name": "Bench Employer", "email": email, "company_name": "Bench Ltd"})
+        self.call("register_employer_verified", "PUT", "/register_employer_verified", json={
+            "phone_number": phone, "email": email, "phone_otp": BENCH_OTP, "email_otp": BENCH_OTP})
+
+    def admin_login(self):
+        self.call("admin_login", "POST", "/admin_login", json={"id": portal.ADMIN_ID, "password": portal.ADMIN_PASSWORD})
+
+    def view_users(self):
+        user_type = self.rng.choice(["jobseeker", "employer"])
+        self.call("view_users", "GET", f"/view_users?user_type={user_type}&limit=50", self.ctx.admin_token)
+
+    def metrics(self):
+        self.call("metrics", "GET", "/metrics", token=portal.METRICS_TOKEN)
+
+    def rebuild_search_index(self):
+        self.call("rebuild_search_index", "POST", "/rebuild_search_index", self.ctx.admin_token)
+
+# Relative weights of the default mix: mostly dashboard reads, a steady trickle of writes and logins.
+# delete_user is left out because it removes seeded users; put it in --mix to measure it anyway.
+ROUTE_MIX = {
+    "view_active_jobs": 25, "search_jobs": 15, "recommended_jobs": 5, "view_posted_jobs": 15,
+    "view_job_applications": 10, "view_resume": 5, "view_resume_denied": 1, "export_resumes": 1, "job_apply": 4, "post_job": 3, "post_jobs_bulk": 1,
+    "delete_job": 2, "delete_jobs_bulk": 1, "login": 4, "register_jobseeker": 2, "register_employer": 1,
+    "admin_login": 1, "view_users": 2, "metrics": 1, "rebuild_search_index": 0
+}
+
+
+# ---------------- BENCHMARKS ----------------
+def bench_connect(args):
+    query = args.query
+    direct = drive(lambda: mysql.connector.connect(**db_config), query, args.iterations, args.threads)
+    pool = ConnectionPool(lambda: mysql.connector.connect(**db_config),
+                          min_size=args.pool_min, max_size=args.pool_max)
+    pool.warm_up()
+    pooled = drive(pool.acquire, query, args.iterations, args.threads)
+    report("connect", direct)
+    report("pool", pooled)
+    print(f"pool stats: {pool.get_stats()}")
+    pool.close_all()
+
+def bench_ratelimit(args):
+    limiter = RedisRateLimiter(args.redis_url) if args.redis_url else MemoryRateLimiter()
+    keys = [f"login_unverified:phone:{i:010d}" for i in range(args.keys)]
+    latencies = []
+    for i in range(args.iterations):
+        start = time.perf_counter()
+        limiter.hit(keys[i % len(keys)], 5, 600)
+        latencies.append((time.perf_counter() - start) * 1000)
+    report("ratelimit", {
+        "requests": len(latencies),
+        "throughput": len(latencies) / (sum(latencies) / 1000) if latencies else 0.0,
+        "mean_ms": statistics.fmean(latencies),
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95),
+        "p99_ms": percentile(latencies, 99)
+    })
+
+def bench_notify(args):
+    # Stand-in for Twilio/SMTP: a fixed network round trip per message, no real sends.
+    def slow_send(channel, recipient, subject, message):
+        time.sleep(args.latency_ms / 1000)
+    portal.deliver_notification = slow_send
+    batches = [[(i, "email" if i % 2 else "sms", "recipient", "subject", "message", 0)
+                for i in range(start, min(start + args.batch_size, args.messages))]
+               for start in range(0, args.messages, args.batch_size)]
+
+    # Completion time of each message measured from the start of its batch, as the outbox worker sees it.
+    latencies = []
+    start = time.perf_counter()
+    for batch in batches:
+        batch_start = time.perf_counter()
+        for row in batch:
+            slow_send(*row[1:5])
+            latencies.append((time.perf_counter() - batch_start) * 1000)
+    report("sync", summarize(latencies, time.perf_counter() - start))
+
+    loop = new_delivery_loop(args.concurrency)
+    latencies = []
+    start = time.perf_counter()
+    for batch in batches:
+        batch_start = time.perf_counter()
+        loop.run_until_complete(deliver_batch(batch))
+        latencies.extend([(time.perf_counter() - batch_start) * 1000] * len(batch))
+    report("gather", summarize(latencies, time.perf_counter() - start))
+    loop.run_until_complete(loop.shutdown_default_executor())
+    loop.close()
+
+def bench_otp(args):
+    # Route-level: concurrent /register_jobseeker_unverified requests against the configured database, with Twilio and
+    # SMTP replaced by a fixed round trip. "inline" sends the SMS and then the email on the request thread, as the
+    # routes did before the outbox; "outbox" is the route as it is, with the outbox workers delivering meanwhile.
+    def slow_send(channel, recipient, subject, message):
+        time.sleep(args.latency_ms / 1000)
+    def send_inline(cursor, channel, recipient, message, subject=None):
+        slow_send(channel, recipient, subject, message)
+    portal.deliver_notification = slow_send
+    portal.generate_otp = lambda: BENCH_OTP
+    enqueue_notification = portal.enqueue_notification
+    client = portal.app.test_client()
+    run_id = random.randrange(100)
+    conn = mysql.connector.connect(**db_config, autocommit=True)
+    try:
+        for mode_index, mode in enumerate(("inline", "outbox")):
+            cursor = conn.cursor()
+            cursor.execute("SELECT COALESCE(MAX(ID), 0) FROM NOTIFICATIONS")
+            last_notification_id = cursor.fetchone()[0]
+            cursor.close()
+            portal.enqueue_notification = send_inline if mode == "inline" else enqueue_notification
+            if mode == "outbox":
+                portal.start_notification_workers()
+            latencies, statuses, lock = [], {}, threading.Lock()
+            def worker(thread_index):
+                for i in range(args.requests // args.threads):
+                    n = thread_index * args.requests + i
+                    start = time.perf_counter()
+                    response = client.post("/register_jobseeker_unverified", json={
+                        "phone_number": f"7{run_id:02d}{mode_index}{n:06d}", "name": f"Otp {n}",
+                        "email": f"otp{run_id}-{mode}-{n}@bench.test", "dob": "1995-01-01", "highest_degree": "B.Tech",
+                        "specialization": "Computer Science", "work_experience": 1
+                    })
+                    with lock:
+                        latencies.append((time.perf_counter() - start) * 1000)
+                        statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+            threads = [threading.Thread(target=worker, args=(i,)) for i in range(args.threads)]
+            start = time.perf_counter()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            elapsed = time.perf_counter() - start
+            report(mode, summarize(latencies, elapsed))
+            print(f"{'':<12} statuses {statuses}")
+            if mode == "outbox":
+                # The requests return before the messages go out; report when the last of them was delivered.
+                cursor = conn.cursor()
+                while True:
+                    cursor.execute("""
+                        SELECT COUNT(*) FROM NOTIFICATIONS 
+                        WHERE ID > %s AND STATUS IN ('PENDING', 'SENDING')
+                    """, (last_notification_id,))
+                    if cursor.fetchone()[0] == 0:
+                        break
+                    time.sleep(0.05)
+                cursor.close()
+                print(f"{'':<12} all {2 * len(latencies)} messages delivered {time.perf_counter() - start:.2f} s after the first request")
+                portal.stop_notification_workers()
+    finally:
+        portal.enqueue_notification = enqueue_notification
+        conn.close()
+
+def bench_seed(args):
+    portal.init_db()
+    conn = mysql.connector.connect(**db_config)
+    try:
+        existing = count_rows(conn)
+        if any(existing.values()) and not args.append:
+            raise SystemExit(f"Database {db_config['database']} already has data {existing}; pass --append to add to it.")
+        rng = random.Random(args.seed)
+        now = datetime.datetime.now()
+        # Employers, jobseekers and jobs continue numbering after any existing rows, so --append never collides.
+        base = max(existing.values()) + 1
+        started = time.perf_counter()
+        employers = insert_rows(conn, """
+            INSERT INTO EMPLOYERS (PHONE_NUMBER, NAME, EMAIL, COMPANY_NAME, IS_VERIFIED, CREATED_AT) 
+            VALUES (%s, %s, %s, %s, 1, %s)
+        """, [(f"8{base + i:09d}", f"Employer {base + i}", f"employer{base + i}@bench.test", f"Company {base + i}", now)
+              for i in range(args.employers)], args.chunk_size)
+        jobseekers = insert_rows(conn, """
+            INSERT INTO JOBSEEKERS 
+            (PHONE_NUMBER, NAME, EMAIL, DOB, HIGHEST_DEGREE, SPECIALIZATION, WORK_EXPERIENCE, IS_VERIFIED, CREATED_AT) 
+            VALUES (%s, %s, %s, %s, %s, %s, %s, 1, %s)
+        """, [(f"9{base + i:09d}", f"Seeker {base + i}", f"seeker{base + i}@bench.test", datetime.date(1985 + rng.randrange(20), 1 + rng.randrange(12), 1),
+               f"{rng.choice(DEGREES)} {rng.choice(SPECIALIZATIONS)}", rng.choice(SPECIALIZATIONS), rng.randint(0, 20), now)
+              for i in range(args.jobseekers)], args.chunk_size)
+        cursor = conn.cursor()
+        cursor.execute("SELECT ID FROM EMPLOYERS WHERE EMAIL LIKE '%%@bench.test'")
+        employer_ids = [row[0] for row in cursor.fetchall()]
+        jobs = insert_rows(conn, """
+            INSERT IGNORE INTO JOBS (JOB_TITLE, SPECIALIZATION, MINIMUM_WORK_EXPERIENCE, LOCATION, SALARY, EMPLOYER_ID) 
+            VALUES (%s, %s, %s, %s, %s, %s)
+        """, [(f"{rng.choice(TITLES)} {base + i}", rng.choice(SPECIALIZATIONS), rng.randint(0, 10), rng.choice(LOCATIONS),
+               rng.randrange(200000, 5000000, 10000), rng.choice(employer_ids)) for i in range(args.jobs)], args.chunk_size)
+        # Every seeded application points at the same stored resume; view_resume still reads it per request.
+        resume_key, resume_size = portal.get_resume_store().save(io.BytesIO(BENCH_PDF))
+        cursor.execute("SELECT ID FROM JOBS")
+        job_ids = [row[0] for row in cursor.fetchall()]
+        cursor.execute("SELECT ID FROM JOBSEEKERS WHERE IS_VERIFIED = 1")
+        jobseeker_ids = [row[0] for row in cursor.fetchall()]
+        cursor.close()
+        # Random pairs; the few that repeat an existing (job, jobseeker) pair are skipped by INSERT IGNORE.
+        applications = insert_rows(conn, """
+            INSERT IGNORE INTO JOB_APPLICATIONS (RESUME_NAME, RESUME_SHA256, RESUME_SIZE, JOB_ID, JOBSEEKER_ID) 
+            VALUES (%s, %s, %s, %s, %s)
+        """, [("resume.pdf", resume_key, resume_size, rng.choice(job_ids), rng.choice(jobseeker_ids))
+              for _ in range(args.applications)], args.chunk_size)
+        print(f"seeded {employers} employers, {jobseekers} jobseekers, {jobs} jobs, {applications} applications "
+              f"in {time.perf_counter() - started:.1f} s")
+        print(f"database now holds {count_rows(conn)}")
+    finally:
+        conn.close()
+
+def bench_routes(args):
+    mix = json.loads(args.mix) if args.mix else ROUTE_MIX
+    unknown = [name for name in mix if not hasattr(RouteDriver, name)]
+    if unknown:
+        raise SystemExit(f"Unknown scenarios in --mix: {unknown}")
+    # Deterministic OTPs stand in for reading the fake SMS/email outbox.
+    portal.generate_otp = lambda: BENCH_OTP
+    conn = mysql.connector.connect(**db_config)
+    try:
+        ctx = RouteContext(conn, args.sample_size)
+        dataset = count_rows(conn)
+    finally:
+        conn.close()
+    if portal.DB_POOL_ENABLED:
+        portal.get_db_pool().warm_up()
+    names = [name for name, weight in mix.items() if weight > 0]
+    weights = [mix[name] for name in names]
+    run_id = random.Random(args.seed).randrange(1000)
+    drivers = [RouteDriver(ctx, random.Random(args.seed * 1000 + i), run_id) for i in range(args.threads)]
+    for driver in drivers:
+        # Warm-up builds the in-process indexes and caches before anything is measured.
+        for name in names:
+            getattr(driver, name)()
+        driver.samples.clear()
+    queries_before = query_counts()
+    deadline = time.perf_counter() + args.duration
+    def worker(driver):
+        while time.perf_counter() < deadline:
+            getattr(driver, driver.rng.choices(names, weights)[0])()
+    threads = [threading.Thread(target=worker, args=(driver,)) for driver in drivers]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    queries_after = query_counts()
+
+    samples = {}
+    for driver in drivers:
+        for name, values in driver.samples.items():
+            samples.setdefault(name, []).extend(values)
+    # Statements are counted per view function, so scenarios hitting the same one (view_resume and
+    # view_resume_denied) share its average.
+    requests_per_endpoint = {}
+    for name, values in samples.items():
+        endpoint = ctx.endpoints.get(name, name)
+        requests_per_endpoint[endpoint] = requests_per_endpoint.get(endpoint, 0) + len(values)
+    routes = {}
+    for name in sorted(samples):
+        latencies = [value[0] for value in samples[name]]
+        statuses = {}
+        for _, status in samples[name]:
+            statuses[str(status)] = statuses.get(str(status), 0) + 1
+        result = summarize(latencies, elapsed)
+        result["statuses"] = statuses
+        endpoint = ctx.endpoints.get(name, name)
+        result["queries_per_request"] = round((queries_after.get(endpoint, 0) - queries_before.get(endpoint, 0)) / requests_per_endpoint[endpoint], 2)
+        routes[name] = result
+        report(name, result)
+        print(f"{'':<12} statuses {statuses}  queries/request {result['queries_per_request']}")
+    all_latencies = [value[0] for values in samples.values() for value in values]
+    total = summarize(all_latencies, elapsed)
+    report("total", total)
+    if args.output:
+        try:
+            commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+        except Exception:
+            commit = None
+        with open(args.output, "w") as f:
+            json.dump({
+                "started_at": datetime.datetime.now().isoformat(), "commit": commit, "python": platform.python_version(),
+                "threads": args.threads, "duration_seconds": round(elapsed, 3), "seed": args.seed, "mix": mix,
+                "dataset": dataset, "db_pool": portal.get_db_pool().get_stats() if portal.DB_POOL_ENABLED else None,
+                "total": total, "routes": routes
+            }, f, indent=2)
+        print(f"results written to {args.output}")
+
+def bench_compare(args):
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.candidate) as f:
+        candidate = json.load(f)
+    def change(old, new):
+        return f"{(new - old) / old * 100:+.1f}%" if old else "n/a"
+    if baseline["dataset"] != candidate["dataset"]:
+        print(f"warning: datasets differ {baseline['dataset']} vs {candidate['dataset']}")
+    print(f"{'route':<30} {'req/s':>16} {'p50 ms':>16} {'p95 ms':>16} {'p99 ms':>16} {'queries':>10}")
+    rows = [(name, baseline["routes"][name], candidate["routes"][name]) for name in sorted(baseline["routes"]) if name in candidate["routes"]]
+    rows.append(("total", baseline["total"], candidate["total"]))
+    for name, old, new in rows:
+        line = f"{name:<30}"
+        for key in ("throughput", "p50_ms", "p95_ms", "p99_ms"):
+            line += f" {new[key]:>8.1f} {change(old[key], new[key]):>7}"
+        if "queries_per_request" in new:
+            line += f" {old['queries_per_request']:>4}->{new['queries_per_request']:<4}"
+        print(line)
+
+
+# ---------------- MAIN FUNCTION ----------------
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="JOB PORTAL SYSTEM benchmarks")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("connect", help="Per-request connect vs pooled connections")
+    p.add_argument("--iterations", type=int, default=2000)
+    p.add_argument("--threads", type=int, default=8)
+    p.add_argument("--pool-min", type=int, default=2)
+    p.add_argument("--pool-max", type=int, default=8)
+    p.add_argument("--query", default="SELECT JOB_TITLE, SPECIALIZATION, MINIMUM_WORK_EXPERIENCE, LOCATION, SALARY, EMPLOYER_ID FROM JOBS WHERE EMPLOYER_ID = 1")
+    p.set_defaults(func=bench_connect)
+    p = sub.add_parser("ratelimit", help="Per-check overhead of the OTP rate limiter")
+    p.add_argument("--iterations", type=int, default=200000)
+    p.add_argument("--keys", type=int, default=10000)
+    p.add_argument("--redis-url", help="Measure the Redis backend instead of the in-memory one")
+    p.set_defaults(func=bench_ratelimit)
+    p = sub.add_parser("notify", help="Serial vs asyncio.gather delivery of outbox batches")
+    p.add_argument("--messages", type=int, default=400)
+    p.add_argument("--batch-size", type=int, default=20)
+    p.add_argument("--concurrency", type=int, default=10)
+    p.add_argument("--latency-ms", type=float, default=100, help="Simulated Twilio/SMTP round trip")
+    p.set_defaults(func=bench_notify)
+    p = sub.add_parser("otp", help="OTP registrations with the sends on the request thread vs through the outbox")
+    p.add_argument("--requests", type=int, default=400)
+    p.add_argument("--threads", type=int, default=50)
+    p.add_argument("--latency-ms", type=float, default=100, help="Simulated Twilio/SMTP round trip")
+    p.set_defaults(func=bench_otp)
+    p = sub.add_parser("seed", help="Fill the configured database with benchmark users, jobs and applications")
+    p.add_argument("--employers", type=int, default=100)
+    p.add_argument("--jobseekers", type=int, default=10000)
+    p.add_argument("--jobs", type=int, default=1000)
+    p.add_argument("--applications", type=int, default=10000)
+    p.add_argument("--chunk-size", type=int, default=5000)
+    p.add_argument("--seed", type=int, default=1)
+    p.add_argument("--append", action="store_true", help="Add to a database that already holds rows")
+    p.set_defaults(func=bench_seed)
+    p = sub.add_parser("routes", help="Drive every route with a weighted mix against the seeded database")
+    p.add_argument("--duration", type=float, default=30)
+    p.add_argument("--threads", type=int, default=8)
+    p.add_argument("--sample-size", type=int, default=500, help="Users and rows sampled from the database to drive requests")
+    p.add_argument("--mix", help='JSON object of scenario weights, e.g. \'{"view_active_jobs": 1}\'')
+    p.add_argument("--seed", type=int, default=1)
+    p.add_argument("--output", help="Write machine-readable results to this JSON file")
+    p.set_defaults(func=bench_routes)
+    p = sub.add_parser("compare", help="Compare two result files written by routes --output")
+    p.add_argument("baseline")
+    p.add_argument("candidate")
+    p.set_defaults(func=bench_compare)
+    args = parser.parse_args()
+    args.func(args)
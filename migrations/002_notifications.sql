@@ -0,0 +1,13 @@
+CREATE TABLE IF NOT EXISTS NOTIFICATIONS (
+    ID BIGINT AUTO_INCREMENT PRIMARY KEY,
+    CHANNEL VARCHAR(10) NOT NULL,
+    RECIPIENT VARCHAR(255) NOT NULL,
+    SUBJECT VARCHAR(255),
+    BODY TEXT NOT NULL,
+    STATUS VARCHAR(10) NOT NULL,
+    ATTEMPTS INT NOT NULL DEFAULT 0,
+    NEXT_ATTEMPT_AT DATETIME NOT NULL,
+    LAST_ERROR VARCHAR(255),
+    CREATED_AT DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    INDEX (STATUS, NEXT_ATTEMPT_AT)
+);
@@ -0,0 +1,5 @@
+ALTER TABLE JOB_APPLICATIONS
+    ADD COLUMN RESUME_SHA256 CHAR(64) AFTER RESUME_NAME,
+    ADD COLUMN RESUME_SIZE BIGINT AFTER RESUME_SHA256,
+    MODIFY RESUME_DATA LONGBLOB,
+    ADD INDEX IDX_JOB_APPLICATIONS_RESUME_SHA256 (RESUME_SHA256);
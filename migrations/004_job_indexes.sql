@@ -0,0 +1,6 @@
+ALTER TABLE JOBS
+    ADD COLUMN SPEC_KEY VARCHAR(100) GENERATED ALWAYS AS (UPPER(SPECIALIZATION)) STORED,
+    ADD INDEX IDX_JOBS_SPEC_KEY_EXPERIENCE (SPEC_KEY, MINIMUM_WORK_EXPERIENCE);
+
+ALTER TABLE JOB_APPLICATIONS
+    ADD INDEX IDX_JOB_APPLICATIONS_JOBSEEKER_JOB (JOBSEEKER_ID, JOB_ID);
@@ -0,0 +1,2 @@
+ALTER TABLE JOBS
+    ADD INDEX IDX_JOBS_SPEC_KEY_SALARY (SPEC_KEY, SALARY);
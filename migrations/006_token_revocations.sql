@@ -0,0 +1,6 @@
+CREATE TABLE IF NOT EXISTS TOKEN_REVOCATIONS (
+    ID BIGINT AUTO_INCREMENT PRIMARY KEY,
+    ROLE VARCHAR(20) NOT NULL,
+    USER_ID INT NOT NULL,
+    REVOKED_AT DOUBLE NOT NULL
+);
@@ -0,0 +1,7 @@
+ALTER TABLE JOBSEEKERS
+    ADD COLUMN CREATED_AT DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    ADD INDEX IDX_JOBSEEKERS_CREATED_AT (CREATED_AT);
+
+ALTER TABLE EMPLOYERS
+    ADD COLUMN CREATED_AT DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    ADD INDEX IDX_EMPLOYERS_CREATED_AT (CREATED_AT);
@@ -0,0 +1,5 @@
+ALTER TABLE JOBSEEKERS
+    ADD INDEX IDX_JOBSEEKERS_VERIFIED_CREATED_AT (IS_VERIFIED, CREATED_AT);
+
+ALTER TABLE EMPLOYERS
+    ADD INDEX IDX_EMPLOYERS_VERIFIED_CREATED_AT (IS_VERIFIED, CREATED_AT);
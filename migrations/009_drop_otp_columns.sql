@@ -0,0 +1,11 @@
+ALTER TABLE JOBSEEKERS
+    DROP COLUMN PHONE_OTP,
+    DROP COLUMN PHONE_OTP_EXPIRY,
+    DROP COLUMN EMAIL_OTP,
+    DROP COLUMN EMAIL_OTP_EXPIRY;
+
+ALTER TABLE EMPLOYERS
+    DROP COLUMN PHONE_OTP,
+    DROP COLUMN PHONE_OTP_EXPIRY,
+    DROP COLUMN EMAIL_OTP,
+    DROP COLUMN EMAIL_OTP_EXPIRY;
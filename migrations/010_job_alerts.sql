@@ -0,0 +1,18 @@
+ALTER TABLE JOBSEEKERS
+    ADD COLUMN SPEC_KEY VARCHAR(100) GENERATED ALWAYS AS (UPPER(SPECIALIZATION)) STORED,
+    ADD INDEX IDX_JOBSEEKERS_SPEC_KEY_VERIFIED (SPEC_KEY, IS_VERIFIED, ID, WORK_EXPERIENCE);
+
+CREATE TABLE IF NOT EXISTS JOB_ALERTS (
+    JOB_ID INT PRIMARY KEY,
+    LAST_JOBSEEKER_ID INT NOT NULL DEFAULT 0,
+    CREATED_AT DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (JOB_ID) REFERENCES JOBS(ID) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS JOB_ALERT_RECIPIENTS (
+    JOBSEEKER_ID INT NOT NULL,
+    JOB_ID INT NOT NULL,
+    PRIMARY KEY (JOBSEEKER_ID, JOB_ID),
+    FOREIGN KEY (JOBSEEKER_ID) REFERENCES JOBSEEKERS(ID) ON DELETE CASCADE,
+    FOREIGN KEY (JOB_ID) REFERENCES JOBS(ID) ON DELETE CASCADE
+);
@@ -0,0 +1,27 @@
+ALTER TABLE JOBS
+    ADD COLUMN APPLICANT_COUNT INT NOT NULL DEFAULT 0;
+
+UPDATE JOBS J
+    SET APPLICANT_COUNT = (SELECT COUNT(*) FROM JOB_APPLICATIONS JA WHERE JA.JOB_ID = J.ID);
+
+CREATE TABLE IF NOT EXISTS JOB_APPLICANT_SUMMARY (
+    JOB_ID INT NOT NULL,
+    DIMENSION VARCHAR(20) NOT NULL,
+    BUCKET VARCHAR(100) NOT NULL,
+    APPLICANTS INT NOT NULL,
+    PRIMARY KEY (JOB_ID, DIMENSION, BUCKET),
+    FOREIGN KEY (JOB_ID) REFERENCES JOBS(ID) ON DELETE CASCADE
+);
+
+INSERT INTO JOB_APPLICANT_SUMMARY (JOB_ID, DIMENSION, BUCKET, APPLICANTS)
+    SELECT JA.JOB_ID, 'experience',
+        CASE WHEN JS.WORK_EXPERIENCE < 2 THEN '0-1' WHEN JS.WORK_EXPERIENCE < 5 THEN '2-4'
+             WHEN JS.WORK_EXPERIENCE < 10 THEN '5-9' ELSE '10+' END AS BUCKET,
+        COUNT(*)
+    FROM JOB_APPLICATIONS JA INNER JOIN JOBSEEKERS JS ON JS.ID = JA.JOBSEEKER_ID
+    GROUP BY JA.JOB_ID, BUCKET;
+
+INSERT INTO JOB_APPLICANT_SUMMARY (JOB_ID, DIMENSION, BUCKET, APPLICANTS)
+    SELECT JA.JOB_ID, 'degree', UPPER(TRIM(JS.HIGHEST_DEGREE)) AS BUCKET, COUNT(*)
+    FROM JOB_APPLICATIONS JA INNER JOIN JOBSEEKERS JS ON JS.ID = JA.JOBSEEKER_ID
+    GROUP BY JA.JOB_ID, BUCKET;
@@ -0,0 +1,14 @@
+ALTER TABLE JOB_APPLICATIONS
+    ADD COLUMN RESUME_INDEX_STATUS TINYINT NOT NULL DEFAULT 0,
+    ADD COLUMN RESUME_TERM_COUNT INT NOT NULL DEFAULT 0,
+    ADD INDEX IDX_JOB_APPLICATIONS_INDEX_STATUS (RESUME_INDEX_STATUS, ID);
+
+CREATE TABLE IF NOT EXISTS RESUME_TERMS (
+    JOB_ID INT NOT NULL,
+    TERM VARCHAR(64) NOT NULL,
+    APPLICATION_ID INT NOT NULL,
+    FREQUENCY INT NOT NULL,
+    PRIMARY KEY (JOB_ID, TERM, APPLICATION_ID),
+    INDEX IDX_RESUME_TERMS_APPLICATION (APPLICATION_ID),
+    FOREIGN KEY (APPLICATION_ID) REFERENCES JOB_APPLICATIONS(ID) ON DELETE CASCADE
+);
@@ -0,0 +1,21 @@
+ALTER TABLE JOBSEEKERS
+    ADD COLUMN DELETED_AT DATETIME;
+
+ALTER TABLE EMPLOYERS
+    ADD COLUMN DELETED_AT DATETIME;
+
+CREATE TABLE IF NOT EXISTS USER_DELETIONS (
+    ID INT AUTO_INCREMENT PRIMARY KEY,
+    USER_TYPE VARCHAR(10) NOT NULL,
+    USER_ID INT NOT NULL,
+    STATUS VARCHAR(10) NOT NULL DEFAULT 'PENDING',
+    OPEN_USER_ID INT GENERATED ALWAYS AS (IF(STATUS = 'DONE', NULL, USER_ID)) STORED,
+    APPLICATIONS_DELETED INT NOT NULL DEFAULT 0,
+    JOBS_DELETED INT NOT NULL DEFAULT 0,
+    LAST_ERROR VARCHAR(255),
+    CREATED_AT DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    UPDATED_AT DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    FINISHED_AT DATETIME,
+    UNIQUE INDEX UQ_USER_DELETIONS_OPEN (USER_TYPE, OPEN_USER_ID),
+    INDEX IDX_USER_DELETIONS_STATUS (STATUS, ID)
+);
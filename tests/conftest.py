@@ -0,0 +1,13 @@
+import os
+import sys
+import tempfile
+
+# app reads its configuration at import time: no database pool, no background threads, no real sends.
+os.environ.setdefault("SECRET_KEY", "test-secret-key-" + "x" * 32)
+os.environ.setdefault("SMTP_PORT", "25")
+os.environ.setdefault("DB_POOL_ENABLED", "0")
+os.environ.setdefault("BACKGROUND_WORKERS_ENABLED", "0")
+os.environ.setdefault("NOTIFY_TRANSPORT", "fake")
+os.environ.setdefault("RESUME_STORAGE_DIR", tempfile.mkdtemp(prefix="resumes-"))
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,48 @@
+import pytest
+
+import app
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(app.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_otp_is_consumed_on_success(clock):
+    store = app.MemoryOtpStore(shards=2, wheel_slots=8)
+    store.put("login:1", "123456", 60)
+    assert store.verify("login:1", "123456") == app.OTP_OK
+    assert store.verify("login:1", "123456") == app.OTP_MISSING
+
+
+def test_otp_expires(clock):
+    store = app.MemoryOtpStore(shards=2, wheel_slots=8)
+    store.put("login:1", "123456", 60)
+    clock[0] += 61
+    assert store.verify("login:1", "123456") == app.OTP_MISSING
+
+
+def test_sweep_drops_expired_entries_and_keeps_long_ttls(clock):
+    store = app.MemoryOtpStore(shards=1, wheel_slots=8)
+    store.put("short", "1", 2)
+    store.put("long", "2", 20)
+    clock[0] += 3
+    store.sweep()
+    assert set(store.shards[0][0]) == {"long"}
+    # Longer than one turn of the wheel: rescheduled rather than dropped early.
+    clock[0] += 8
+    store.sweep()
+    assert set(store.shards[0][0]) == {"long"}
+    clock[0] += 10
+    store.sweep()
+    assert store.shards[0][0] == {}
+
+
+def test_otp_locks_after_max_attempts(clock):
+    store = app.MemoryOtpStore(shards=2, wheel_slots=8)
+    store.put("login:1", "123456", 60)
+    results = [store.verify("login:1", "000000") for _ in range(app.OTP_MAX_ATTEMPTS)]
+    assert results == [app.OTP_INVALID] * (app.OTP_MAX_ATTEMPTS - 1) + [app.OTP_LOCKED]
+    assert store.verify("login:1", "123456") == app.OTP_MISSING
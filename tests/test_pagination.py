@@ -0,0 +1,27 @@
+import pytest
+
+import app
+
+
+def test_cursor_round_trip():
+    values = ["salary", 250000, 42]
+    cursor = app.encode_cursor(values)
+    assert "=" not in cursor
+    assert app.decode_cursor(cursor) == values
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("", ((app.PAGE_DEFAULT_LIMIT, None), None)),
+    ("?limit=5&after=" + app.encode_cursor(["id", 7]), ((5, [7]), None)),
+])
+def test_validate_page(query, expected):
+    with app.app.test_request_context("/view_active_jobs" + query):
+        assert app.validate_page("id", 1) == expected
+
+
+@pytest.mark.parametrize("after", ["not-base64!", app.encode_cursor(["recent", 7]), app.encode_cursor(["id", 7, 8])])
+def test_validate_page_rejects_foreign_cursors(after):
+    with app.app.test_request_context("/view_active_jobs?after=" + after):
+        page, error = app.validate_page("id", 1)
+    assert page is None
+    assert error[1] == 400
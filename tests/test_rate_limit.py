@@ -0,0 +1,29 @@
+import app
+
+
+def test_bucket_empties_then_refills(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(app.time, "monotonic", lambda: now[0])
+    limiter = app.MemoryRateLimiter()
+    assert limiter.hit("otp:1", 2, 60) == (True, 0)
+    assert limiter.hit("otp:1", 2, 60) == (True, 0)
+    assert limiter.hit("otp:1", 2, 60) == (False, 30)
+    now[0] += 30
+    assert limiter.hit("otp:1", 2, 60) == (True, 0)
+
+
+def test_denied_request_charges_no_bucket(monkeypatch):
+    monkeypatch.setattr(app.time, "monotonic", lambda: 1000.0)
+    limiter = app.MemoryRateLimiter()
+    assert limiter.hit("ip", 1, 60) == (True, 0)
+    allowed, retry_after = limiter.hit_all([("phone", 1, 60), ("ip", 1, 60)])
+    assert not allowed and retry_after == 60
+    # The phone bucket was checked but not charged.
+    assert limiter.hit("phone", 1, 60) == (True, 0)
+
+
+def test_least_recently_hit_bucket_is_evicted():
+    limiter = app.MemoryRateLimiter(shards=1, max_keys=2)
+    for key in ("a", "b", "c"):
+        limiter.hit(key, 1, 60)
+    assert list(limiter.shards[0][0]) == ["b", "c"]
@@ -0,0 +1,52 @@
+import csv
+import io
+import zipfile
+
+import app
+
+
+class Cursor:
+    def __init__(self, rows):
+        self.rows = list(rows)
+
+    def fetchone(self):
+        return self.rows.pop(0) if self.rows else None
+
+
+PROFILE = ("Asha", "asha@example.com", "9000000000", "1995-01-01", "B.Tech", "Computer Science", 2)
+
+
+def test_zip_sink_drains_what_was_written():
+    sink = app.ZipSink()
+    assert sink.drain() == []
+    sink.write(b"ab")
+    sink.write(memoryview(b"cd"))
+    assert sink.drain() == [b"abcd"]
+    assert sink.drain() == []
+
+
+def test_stream_resume_zip_builds_archive_and_manifest():
+    key, _ = app.get_resume_store().save(io.BytesIO(b"%PDF-stored"))
+    rows = [
+        (1, "cv.pdf", key, None, *PROFILE),
+        (2, "../old.pdf", None, b"%PDF-legacy", *PROFILE),
+        (3, "missing.pdf", None, None, *PROFILE),
+    ]
+    released = []
+    body = b"".join(app.stream_resume_zip(Cursor(rows), lambda drained=False: released.append(drained)))
+    archive = zipfile.ZipFile(io.BytesIO(body))
+    assert archive.read("resumes/1_cv.pdf") == b"%PDF-stored"
+    assert archive.read("resumes/2_old.pdf") == b"%PDF-legacy"
+    manifest = list(csv.reader(io.StringIO(archive.read("manifest.csv").decode())))
+    assert manifest[0] == app.RESUME_EXPORT_COLUMNS
+    assert [row[-1] for row in manifest[1:]] == ["resumes/1_cv.pdf", "resumes/2_old.pdf", ""]
+    assert released == [True]
+
+
+def test_abandoned_export_is_not_drained():
+    rows = [(1, "a.pdf", None, b"%PDF-a", *PROFILE), (2, "b.pdf", None, b"%PDF-b", *PROFILE)]
+    released = []
+    stream = app.stream_resume_zip(Cursor(rows), lambda drained=False: released.append(drained))
+    next(stream)
+    stream.close()
+    assert released == [False]
@@ -0,0 +1,81 @@
+import pytest
+
+import app
+
+JOBS = [
+    (1, "Python Developer", "Computer Science", "Pune", 600000, 2),
+    (2, "Senior Python Engineer", "Computer Science", "Bangalore", 1500000, 5),
+    (3, "Java Developer", "Information Technology", "Pune", 800000, 3),
+]
+
+
+@pytest.fixture
+def index():
+    index = app.JobSearchIndex()
+    for job in JOBS:
+        index.add(*job)
+    return index
+
+
+def test_every_token_has_to_match(index):
+    result = index.search("python pune")
+    assert [job["id"] for job in result["jobs"]] == [1]
+
+
+def test_prefix_expansion_and_ranking(index):
+    result = index.search("dev")
+    assert {job["id"] for job in result["jobs"]} == {1, 3}
+    scores = [job["score"] for job in result["jobs"]]
+    assert scores == sorted(scores, reverse=True)
+
+
+def test_facets_leave_out_their_own_filter(index):
+    result = index.search("developer", location="pune", min_salary=700000)
+    assert [job["id"] for job in result["jobs"]] == [3]
+    assert result["facets"]["location"] == {"Pune": 1}
+    assert sum(bucket["count"] for bucket in result["facets"]["salary"]) == 2
+
+
+def test_remove_drops_the_terms_no_job_uses(index):
+    index.remove(3)
+    assert "java" not in index.terms
+    assert index.search("java")["total"] == 0
+
+
+def test_rebuild_keeps_writes_made_while_reading(index, monkeypatch):
+    # A job deleted and another posted while the rebuild reads JOBS must not be undone by the swap.
+    class Cursor:
+        def execute(self, query, params):
+            self.rows = [job for job in JOBS if job[0] > params[0]]
+            if params[0] == 0:
+                index.remove(2)
+                index.add(4, "Rust Developer", "Computer Science", "Remote", 900000, 1)
+
+        def fetchall(self):
+            return self.rows
+
+        def close(self):
+            pass
+
+    class Connection:
+        def cursor(self):
+            return Cursor()
+
+        def close(self):
+            pass
+
+    monkeypatch.setattr(app, "get_db_connection", Connection)
+    index.rebuild()
+    assert sorted(index.docs) == [1, 3, 4]
+    assert index.pending is None
+
+
+def test_rank_applicants_needs_every_term():
+    postings = [
+        (10, "python", 3, 100), (10, "sql", 1, 100),
+        (11, "python", 1, 50), (11, "sql", 2, 50),
+        (12, "python", 5, 80),
+    ]
+    ranked = app.rank_applicants(postings, ["python", "sql"], documents=3, total_length=230)
+    # 12 never mentions sql; 11's shorter resume outweighs 10's extra python.
+    assert [application_id for application_id, _ in ranked] == [11, 10]
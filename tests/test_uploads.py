@@ -0,0 +1,62 @@
+import io
+
+import pytest
+
+import app
+
+BOUNDARY = b"----boundary"
+
+
+def multipart(*parts):
+    body = b""
+    for headers, content in parts:
+        body += b"--" + BOUNDARY + b"\r\n" + headers + b"\r\n\r\n" + content + b"\r\n"
+    return io.BytesIO(body + b"--" + BOUNDARY + b"--\r\n")
+
+
+def test_fields_and_file_chunks_in_order():
+    stream = multipart(
+        (b'Content-Disposition: form-data; name="job_id"', b"42"),
+        (b'Content-Disposition: form-data; name="resume"; filename="cv.pdf"\r\nContent-Type: application/pdf', b"%PDF-" + b"x" * 100),
+    )
+    events = list(app.multipart_events(stream, BOUNDARY, chunk_size=16))
+    assert events[0] == ("field", "job_id", "42")
+    assert events[1] == ("file", "resume", "cv.pdf")
+    data = [event for event in events[2:] if event[0] == "data"]
+    assert b"".join(chunk for _, chunk, _ in data) == b"%PDF-" + b"x" * 100
+    assert data[-1][2] is False
+
+
+def test_oversized_field_is_rejected(monkeypatch):
+    monkeypatch.setattr(app, "RESUME_FORM_OVERHEAD_BYTES", 10)
+    stream = multipart((b'Content-Disposition: form-data; name="job_id"', b"1" * 50))
+    with pytest.raises(app.UploadRejected) as error:
+        list(app.multipart_events(stream, BOUNDARY, chunk_size=8))
+    assert error.value.status == 413
+
+
+def test_malformed_body_is_rejected():
+    with pytest.raises(app.UploadRejected):
+        list(app.multipart_events(io.BytesIO(b"not a multipart body" * 10), BOUNDARY))
+
+
+def test_upload_checks_magic_and_size():
+    store = app.get_resume_store()
+    upload = store.open_upload(max_bytes=10, magic=app.ResumeUpload.PDF_MAGIC)
+    with pytest.raises(app.UploadRejected):
+        upload.write(b"GIF89a")
+    upload.discard()
+    upload = store.open_upload(max_bytes=10, magic=app.ResumeUpload.PDF_MAGIC)
+    upload.write(b"%PDF-")
+    with pytest.raises(app.UploadRejected) as error:
+        upload.write(b"123456")
+    assert error.value.status == 413
+    upload.discard()
+
+
+def test_identical_uploads_share_one_file():
+    store = app.get_resume_store()
+    first = store.save(io.BytesIO(b"%PDF-same"))
+    second = store.save(io.BytesIO(b"%PDF-same"))
+    assert first == second
+    assert store.exists(first[0])